@@ -0,0 +1,93 @@
+"""Benchmark de concorrência do POST /api/reservations/.
+
+Vários clientes (threads, cada uma com sua conexão ao banco) disputam o mesmo horário ao mesmo
+tempo, rodada após rodada. Ao final confere que nenhum horário ficou com mais de uma reserva ativa
+e mostra a vazão.
+
+    python -m benchmarks.booking_contention --clients 16 --rounds 20
+"""
+import argparse
+import sys
+import threading
+from collections import Counter
+from datetime import date, timedelta
+
+from benchmarks.common import setup_django, percentile, Timer
+
+
+def run(clients, rounds):
+    from django.contrib.auth.models import User
+    from django.db import connection
+    from rest_framework.test import APIClient
+    from reservas.models import Location, Reservation
+
+    owner = User.objects.create(username='bench-owner')
+    location = Location.objects.create(
+        owner=owner, name='Quadra', description='Benchmark', address='Rua 1',
+        operating_hours_start='08:00', operating_hours_end='22:00', max_duration=2,
+    )
+    users = [User.objects.create(username=f'bench-client-{n}') for n in range(clients)]
+    first_day = date.today() + timedelta(days=2)
+
+    statuses = Counter()
+    latencies = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(clients)
+
+    def client(user):
+        api = APIClient()
+        api.force_authenticate(user)
+        try:
+            for round_number in range(rounds):
+                # Todas as threads pedem o mesmo horário na mesma rodada
+                day = first_day + timedelta(days=round_number // 12)
+                hour = 8 + round_number % 12
+                payload = {
+                    'location': location.id,
+                    'date': day.isoformat(),
+                    'start_time': f'{hour:02d}:00',
+                    'end_time': f'{hour + 1:02d}:00',
+                    'payment_method': 'pix',
+                }
+                barrier.wait()
+                with Timer() as timer:
+                    response = api.post('/api/reservations/', payload, format='json')
+                with lock:
+                    statuses[response.status_code] += 1
+                    latencies.append(timer.elapsed)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=client, args=(user,)) for user in users]
+    with Timer() as total:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    active = Reservation.objects.filter(location=location).exclude(status=Reservation.Status.CANCELADA)
+    per_slot = Counter(active.values_list('date', 'start_time'))
+    double_bookings = sum(count - 1 for count in per_slot.values() if count > 1)
+    requests = sum(statuses.values())
+
+    print(f"clientes={clients} rodadas={rounds} requisições={requests}")
+    print(f"status: {dict(sorted(statuses.items()))}")
+    print(f"reservas criadas={active.count()} (esperado {rounds}) reservas duplicadas={double_bookings}")
+    print(f"vazão={requests / total.elapsed:.1f} req/s "
+          f"p50={percentile(latencies, 50) * 1000:.1f}ms p99={percentile(latencies, 99) * 1000:.1f}ms")
+    return double_bookings == 0 and active.count() == rounds and not statuses.get(500)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--db', help="Arquivo SQLite a usar (padrão: um banco temporário novo)")
+    args = parser.parse_args()
+
+    setup_django(args.db)
+    sys.exit(0 if run(args.clients, args.rounds) else 1)
+
+
+if __name__ == '__main__':
+    main()
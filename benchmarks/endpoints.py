@@ -0,0 +1,242 @@
+"""Suíte de benchmark dos endpoints /api/ em vários tamanhos de dados, com comparação de regressão.
+
+Para cada tamanho (`--sizes`), um processo separado cria um banco descartável, gera o dataset com
+reservas.dataset.DatasetGenerator (o mesmo do comando generate_dataset) e chama cada endpoint pela
+pilha completa do Django (middlewares, JWT, DRF) com o test Client: uma chamada de aquecimento que
+conta as consultas SQL e `--repeat` chamadas cronometradas (p50/p95/p99).
+
+Os resultados vão para um JSON (`--output`, padrão benchmarks/results/endpoints-<data>.json); com
+`--baseline` cada endpoint é comparado ao arquivo anterior e a execução falha (código 1) se o p95
+piorar mais que `--threshold` ou se o número de consultas aumentar.
+
+Uploads de imagens e pagamentos ficam de fora (têm benchmarks próprios ou efeitos externos).
+Por padrão o cache fica desligado (DummyCache) para medir o caminho até o banco; --cache o mantém.
+
+    python -m benchmarks.endpoints --sizes small,medium --repeat 50
+    python -m benchmarks.endpoints --sizes small --baseline benchmarks/results/endpoints-anterior.json
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from benchmarks.common import BASE_DIR, setup_django, percentile, Timer
+
+# nome: (usuários, locais, reservas)
+SIZES = {
+    'tiny': (200, 50, 2000),
+    'small': (2000, 400, 20000),
+    'medium': (20000, 4000, 200000),
+    'large': (200000, 40000, 2000000),
+}
+
+
+def sample(owner_id=None):
+    """Ids representativos do dataset: o owner com mais locais, um customer com reservas, etc."""
+    from django.contrib.auth.models import User
+    from django.db.models import Count
+    from reservas.models import Location, Reservation
+
+    owner = User.objects.filter(groups__name='owners').annotate(total=Count('location')).order_by('-total').first()
+    customer_id = (
+        Reservation.objects.filter(user__groups__name='customers').values('user').annotate(total=Count('id'))
+        .order_by('-total').values_list('user', flat=True).first()
+    )
+    locations = list(Location.objects.filter(is_active=True, latitude__isnull=False).order_by('id').values_list('id', flat=True)[:5])
+    reservation = Reservation.objects.filter(user_id=customer_id).order_by('-date').first()
+    admin = User.objects.create(username='bench-admin', is_staff=True, is_superuser=True)
+    return {
+        'owner': owner, 'customer': User.objects.get(id=customer_id), 'admin': admin,
+        'locations': locations, 'reservation': reservation.id,
+    }
+
+
+def endpoints(ids):
+    """(nome, método, url, papel, corpo) de cada endpoint medido"""
+    day = date.today() + timedelta(days=7)
+    week = f'from={day}&to={day + timedelta(days=6)}'
+    location = ids['locations'][0]
+    bulk = ','.join(str(pk) for pk in ids['locations'])
+    rng = random.Random(3)
+
+    def new_reservation():
+        # Horário aleatório: parte vira 201, parte 400 por conflito (as duas medem a validação)
+        start = rng.randrange(8, 20)
+        return {
+            'location': rng.choice(ids['locations']), 'date': str(day + timedelta(days=rng.randrange(30))),
+            'start_time': f'{start:02d}:00', 'end_time': f'{start + 1:02d}:00', 'payment_method': 'pix',
+        }
+
+    return [
+        ('locations.list', 'get', '/api/locations/', None, None),
+        ('locations.list[owner]', 'get', '/api/locations/', 'owner', None),
+        ('locations.list[fields]', 'get', '/api/locations/?fields=id,name,price_per_hour', None, None),
+        ('locations.detail', 'get', f'/api/locations/{location}/', None, None),
+        ('locations.available_slots', 'get', f'/api/locations/{location}/available-slots/?date={day}', None, None),
+        ('locations.available_slots[week]', 'get', f'/api/locations/{location}/available-slots/?{week}', None, None),
+        ('locations.available_slots_bulk', 'get', f'/api/locations/available-slots/?locations={bulk}&{week}', 'customer', None),
+        ('locations.free', 'get', f'/api/locations/free/?date={day}&start=18:00&end=19:00', None, None),
+        ('locations.search', 'get', '/api/locations/search/?q=quadra&max_price=120', None, None),
+        ('locations.search[facets]', 'get', '/api/locations/search/?q=quadra&facets=1', None, None),
+        ('locations.near', 'get', '/api/locations/?near=-23.5505,-46.6333&radius=5', None, None),
+        ('reservations.list[customer]', 'get', '/api/reservations/', 'customer', None),
+        ('reservations.list[owner]', 'get', '/api/reservations/', 'owner', None),
+        ('reservations.detail', 'get', f"/api/reservations/{ids['reservation']}/", 'customer', None),
+        ('customer.reservations', 'get', '/api/customer/reservations/', 'customer', None),
+        ('owner.dashboard', 'get', '/api/owner/dashboard/', 'owner', None),
+        ('auth.user_type', 'get', '/api/auth/user-type/', 'customer', None),
+        ('cache.stats', 'get', '/api/cache/stats/', 'admin', None),
+        ('auth.login', 'post', '/api/auth/login/', None,
+         lambda: {'username': ids['customer'].username, 'password': 'password123'}),
+        ('reservations.create', 'post', '/api/reservations/', 'customer', new_reservation),
+    ]
+
+
+def measure(repeat):
+    """Mede todos os endpoints no banco já populado: {nome: {p50, p95, p99, queries, status}}"""
+    from django.db import connection
+    from django.test import Client
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    ids = sample()
+    headers = {
+        role: {'Authorization': f'Bearer {RefreshToken.for_user(ids[role]).access_token}'}
+        for role in ('owner', 'customer', 'admin')
+    }
+    client = Client()
+    results = {}
+    for name, method, url, role, body in endpoints(ids):
+        def call():
+            kwargs = {'headers': headers[role]} if role else {}
+            if body is not None:
+                kwargs.update(data=json.dumps(body()), content_type='application/json')
+            return getattr(client, method)(url, **kwargs)
+
+        # Conta pelo execute_wrapper: o log de consultas é zerado a cada request_started
+        queries = []
+
+        def count(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count):
+            warmup = call()
+        statuses, latencies = {warmup.status_code}, []
+        for _ in range(repeat):
+            with Timer() as timer:
+                response = call()
+            latencies.append(timer.elapsed * 1000)
+            statuses.add(response.status_code)
+        results[name] = {
+            'p50': round(percentile(latencies, 50), 3),
+            'p95': round(percentile(latencies, 95), 3),
+            'p99': round(percentile(latencies, 99), 3),
+            'queries': len(queries),
+            'status': sorted(statuses),
+        }
+    return results
+
+
+def worker(size, repeat, output, cache):
+    if not cache:
+        # core.settings lê o backend do ambiente
+        os.environ['CACHE_BACKEND'] = 'django.core.cache.backends.dummy.DummyCache'
+    setup_django(None)
+    from reservas.dataset import DatasetGenerator
+
+    users, locations, reservations = SIZES[size]
+    with Timer() as timer:
+        counts = DatasetGenerator(users, locations, reservations, prefix='bench').run()
+    print(f"[{size}] dataset: " + ", ".join(f"{count} {name}" for name, count in counts.items())
+          + f" em {timer.elapsed:.1f}s", flush=True)
+    result = {'dataset': counts, 'endpoints': measure(repeat)}
+    Path(output).write_text(json.dumps(result))
+
+
+def report(size, result, baseline, threshold):
+    """Imprime a tabela de um tamanho e devolve as regressões em relação ao baseline"""
+    previous = (baseline or {}).get('sizes', {}).get(size, {}).get('endpoints', {})
+    regressions = []
+    print(f"\n[{size}] {'endpoint':34} {'p50':>9} {'p95':>9} {'p99':>9} {'SQL':>4}  status  vs. baseline (p95)")
+    for name, row in result['endpoints'].items():
+        line = (f"{'':{len(size) + 2}} {name:34} {row['p50']:7.2f}ms {row['p95']:7.2f}ms {row['p99']:7.2f}ms "
+                f"{row['queries']:4d}  {','.join(map(str, row['status'])):6}")
+        before = previous.get(name)
+        if before:
+            change = row['p95'] / before['p95'] - 1 if before['p95'] else 0.0
+            line += f"  {change:+.0%}"
+            if change > threshold:
+                regressions.append(f"{size} {name}: p95 {before['p95']:.2f} -> {row['p95']:.2f} ms")
+            if row['queries'] > before['queries']:
+                line += f"  SQL {before['queries']} -> {row['queries']}"
+                regressions.append(f"{size} {name}: {before['queries']} -> {row['queries']} consultas")
+        if any(status >= 500 for status in row['status']):
+            regressions.append(f"{size} {name}: status {row['status']}")
+        print(line)
+    return regressions
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='small,medium', help=f"Tamanhos separados por vírgula: {', '.join(SIZES)}")
+    parser.add_argument('--repeat', type=int, default=30, help="Chamadas cronometradas por endpoint")
+    parser.add_argument('--output', help="Arquivo JSON de resultados (padrão: benchmarks/results/endpoints-<data>.json)")
+    parser.add_argument('--baseline', help="JSON de uma execução anterior para comparar")
+    parser.add_argument('--threshold', type=float, default=0.25, help="Piora de p95 tolerada (0.25 = 25%%)")
+    parser.add_argument('--cache', action='store_true', help="Mantém o cache configurado (padrão: DummyCache)")
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        worker(args.worker, args.repeat, args.output, args.cache)
+        return 0
+
+    sizes = [size.strip() for size in args.sizes.split(',') if size.strip()]
+    unknown = [size for size in sizes if size not in SIZES]
+    if unknown:
+        parser.error(f"tamanhos desconhecidos: {', '.join(unknown)}")
+    baseline = json.loads(Path(args.baseline).read_text()) if args.baseline else None
+    output = Path(args.output or BASE_DIR / 'benchmarks' / 'results' / f"endpoints-{datetime.now():%Y%m%d-%H%M%S}.json")
+
+    results = {'created_at': datetime.now().isoformat(timespec='seconds'), 'commit': git_commit(),
+               'repeat': args.repeat, 'cache': args.cache, 'sizes': {}}
+    regressions = []
+    for size in sizes:
+        # Um processo por tamanho: banco e configuração do Django novos a cada um
+        with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as handle:
+            partial = handle.name
+        command = [sys.executable, '-m', 'benchmarks.endpoints', '--worker', size, '--repeat', str(args.repeat), '--output', partial]
+        if args.cache:
+            command.append('--cache')
+        subprocess.run(command, cwd=BASE_DIR, check=True)
+        results['sizes'][size] = json.loads(Path(partial).read_text())
+        os.unlink(partial)
+        regressions += report(size, results['sizes'][size], baseline, args.threshold)
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2, ensure_ascii=False))
+    print(f"\nResultados gravados em {output}")
+    if regressions:
+        print("Regressões:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
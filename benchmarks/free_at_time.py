@@ -0,0 +1,134 @@
+"""Benchmark da busca "livre neste horário" (GET /api/locations/free/).
+
+Popula um banco descartável com `--locations` locais e `--reservations` reservas (inserção direta em
+lote, sem signals) e mede, para janelas aleatórias:
+
+- a primeira página do endpoint (free_locations + KeysetPagination: um NOT EXISTS com LIMIT);
+- a contagem de todos os locais livres (o anti-join completo sobre a tabela de locais);
+- a alternativa antiga, uma consulta de agenda por local, medida numa amostra e extrapolada.
+
+    python -m benchmarks.free_at_time --locations 100000 --reservations 10000000
+"""
+import argparse
+import random
+import sys
+from datetime import date, datetime, time, timedelta
+
+from benchmarks.common import setup_django, percentile, Timer
+
+BATCH = 50000
+
+
+def populate(locations, reservations, days, seed):
+    from django.db import connection, transaction
+
+    rng = random.Random(seed)
+    now = datetime.now().isoformat(sep=' ')
+    first_day = date.today() + timedelta(days=1)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO auth_user (password, is_superuser, username, first_name, last_name, email, is_staff, is_active, date_joined) "
+            "VALUES ('', 0, 'bench-owner', '', '', '', 0, 1, %s)", [now]
+        )
+        owner_id = cursor.lastrowid
+        rows = []
+        for n in range(locations):
+            opens, closes = rng.choice(((8, 22), (6, 23), (10, 20), (8, 18)))
+            rows.append((
+                owner_id, f'Local {n}', 'Benchmark', f'Rua {n}', rng.randrange(20, 300),
+                f'{opens:02d}:00:00', f'{closes:02d}:00:00', 24, rng.randrange(2, 6), rng.random() > 0.05, now,
+            ))
+            if len(rows) == BATCH or n == locations - 1:
+                cursor.executemany(
+                    "INSERT INTO reservas_location (owner_id, name, description, address, price_per_hour, "
+                    "operating_hours_start, operating_hours_end, cancellation_hours, max_duration, is_active, created_at) "
+                    "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)", rows
+                )
+                rows = []
+        cursor.execute("SELECT MIN(id), MAX(id) FROM reservas_location")
+        first_location, last_location = cursor.fetchone()
+
+        statuses = ('pendente', 'confirmed', 'confirmed', 'cancelled')
+        for n in range(reservations):
+            start = rng.randrange(8, 21)
+            rows.append((
+                owner_id, rng.randint(first_location, last_location),
+                (first_day + timedelta(days=rng.randrange(days))).isoformat(),
+                f'{start:02d}:00:00', f'{min(start + rng.randrange(1, 3), 23):02d}:00:00', now, rng.choice(statuses),
+            ))
+            if len(rows) == BATCH or n == reservations - 1:
+                cursor.executemany(
+                    "INSERT INTO reservas_reservation (user_id, location_id, date, start_time, end_time, created_at, status) "
+                    "VALUES (%s, %s, %s, %s, %s, %s, %s)", rows
+                )
+                rows = []
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+    return first_day
+
+
+def windows(count, first_day, days, seed):
+    rng = random.Random(seed + 1)
+    result = []
+    for _ in range(count):
+        start = rng.randrange(8, 21)
+        result.append((first_day + timedelta(days=rng.randrange(days)), time(start), time(start + rng.choice((1, 2)))))
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--locations', type=int, default=100000)
+    parser.add_argument('--reservations', type=int, default=10000000)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--sample', type=int, default=500, help="Locais na amostra da alternativa por local")
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--db', help="Caminho do banco SQLite (padrão: arquivo temporário)")
+    args = parser.parse_args(argv)
+
+    setup_django(args.db)
+    from django.db import connection
+    from reservas.availability import DayAgenda, free_locations
+    from reservas.models import Location
+
+    with Timer() as timer:
+        first_day = populate(args.locations, args.reservations, args.days, args.seed)
+    print(f"{args.locations} locais, {args.reservations} reservas em {args.days} dias (carga em {timer.elapsed:.1f}s)")
+
+    active = Location.objects.filter(is_active=True)
+    sample = windows(args.queries, first_day, args.days, args.seed)
+
+    page, full = [], []
+    for day, start, end in sample:
+        queryset = free_locations(active, day, start, end).order_by('created_at', 'id')
+        with Timer() as timer:
+            list(queryset[:51])
+        page.append(timer.elapsed * 1000)
+        with Timer() as timer:
+            queryset.count()
+        full.append(timer.elapsed * 1000)
+
+    day, start, end = sample[0]
+    sql, params = free_locations(active, day, start, end).order_by('created_at', 'id')[:51].query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        plan = [row[-1] for row in cursor.fetchall()]
+
+    ids = list(active.values_list('id', flat=True)[:args.sample])
+    with Timer() as timer:
+        for location_id in ids:
+            DayAgenda.for_day(location_id, day).conflicts_with(start, end)
+    per_location = timer.elapsed / max(len(ids), 1)
+
+    print(f"primeira página (NOT EXISTS + LIMIT 51): p50 {percentile(page, 50):8.2f} ms  p95 {percentile(page, 95):8.2f} ms")
+    print(f"todos os livres (COUNT do anti-join):   p50 {percentile(full, 50):8.2f} ms  p95 {percentile(full, 95):8.2f} ms")
+    print(f"uma consulta por local (extrapolado):   {per_location * args.locations * 1000:10.0f} ms")
+    print("plano:")
+    for line in plan:
+        print(f"  {line}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
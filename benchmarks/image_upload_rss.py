@@ -0,0 +1,144 @@
+"""Benchmark de memória do upload em lote de imagens (POST /api/locations/images/batch-upload/).
+
+Monta em disco um corpo multipart com N imagens de X MB e o entrega ao WSGIHandler lendo direto
+do arquivo, como faria o servidor. Cada modo roda num processo novo e mede o pico de RSS
+(ru_maxrss) acima da linha de base:
+
+- streaming: configuração do projeto (uploads grandes vão para temporários em disco);
+- buffered: FILE_UPLOAD_MAX_MEMORY_SIZE acima do corpo inteiro, todos os arquivos em memória.
+
+    python -m benchmarks.image_upload_rss --files 20 --size-mb 10
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+from benchmarks.common import setup_django
+
+MODES = ('streaming', 'buffered')
+
+
+def peak_rss_mb():
+    # Linux reporta ru_maxrss em KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def noise_png(size_mb):
+    """PNG de ruído (incompressível) com aproximadamente `size_mb` MB"""
+    from io import BytesIO
+    from PIL import Image
+
+    side = int((size_mb * 1024 * 1024 * 0.95 / 3) ** 0.5)
+    buffer = BytesIO()
+    Image.frombytes('RGB', (side, side), os.urandom(side * side * 3)).save(buffer, 'PNG', compress_level=0)
+    return buffer.getvalue()
+
+
+def write_body(path, files, size_mb):
+    """Corpo multipart gravado em disco (o local é sempre o id 1, o primeiro do banco novo)"""
+    boundary = uuid.uuid4().hex
+    image = noise_png(size_mb)
+    with open(path, 'wb') as body:
+        body.write(f'--{boundary}\r\nContent-Disposition: form-data; name="location"\r\n\r\n1\r\n'.encode())
+        for n in range(files):
+            body.write(
+                f'--{boundary}\r\nContent-Disposition: form-data; name="images"; filename="foto{n}.png"\r\n'
+                f'Content-Type: image/png\r\n\r\n'.encode()
+            )
+            body.write(image)
+            body.write(b'\r\n')
+        body.write(f'--{boundary}--\r\n'.encode())
+    return boundary, len(image)
+
+
+def child(mode, body_path, boundary, image_size):
+    workdir = tempfile.mkdtemp(prefix='reserva-bench-upload-')
+    setup_django(os.path.join(workdir, 'bench.sqlite3'))
+
+    from django.conf import settings
+    from django.contrib.auth.models import User
+    from django.core.handlers.wsgi import WSGIHandler
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from reservas import images
+    from reservas.models import Location, LocationImage
+
+    settings.MEDIA_ROOT = os.path.join(workdir, 'media')
+    settings.ALLOWED_HOSTS = ['*']
+    # Mede só o caminho do upload, sem a geração de variantes
+    images.schedule_variants = lambda image_id: None
+
+    owner = User.objects.create(username='bench-owner')
+    Location.objects.create(
+        owner=owner, name='Quadra', description='Benchmark', address='Rua 1',
+        operating_hours_start='08:00', operating_hours_end='22:00', max_duration=2,
+    )
+    body_size = os.path.getsize(body_path)
+    if mode == 'buffered':
+        settings.FILE_UPLOAD_MAX_MEMORY_SIZE = body_size
+    settings.RESERVAS_MAX_IMAGE_SIZE = max(settings.RESERVAS_MAX_IMAGE_SIZE, image_size)
+    settings.RESERVAS_MAX_UPLOAD_SIZE = max(settings.RESERVAS_MAX_UPLOAD_SIZE, body_size)
+
+    handler = WSGIHandler()
+    token = str(RefreshToken.for_user(owner).access_token)
+    statuses = []
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    with open(body_path, 'rb') as body:
+        environ = {
+            'REQUEST_METHOD': 'POST',
+            'PATH_INFO': '/api/locations/images/batch-upload/',
+            'SERVER_NAME': 'localhost',
+            'SERVER_PORT': '80',
+            'wsgi.url_scheme': 'http',
+            'wsgi.input': body,
+            'CONTENT_TYPE': f'multipart/form-data; boundary={boundary}',
+            'CONTENT_LENGTH': str(body_size),
+            'HTTP_AUTHORIZATION': f'Bearer {token}',
+        }
+        response = handler(environ, lambda status, headers: statuses.append(status))
+        b''.join(response)
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{mode:<10} status={statuses[0]:<12} corpo={body_size / 2 ** 20:7.1f} MB  "
+        f"pico RSS +{peak_rss_mb() - baseline:7.1f} MB  linhas={LocationImage.objects.count()}  {elapsed:.2f}s"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--files', type=int, default=20)
+    parser.add_argument('--size-mb', type=float, default=10)
+    # Uso interno: cada modo roda num processo novo sobre o corpo já gravado
+    parser.add_argument('--mode', choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument('--body', help=argparse.SUPPRESS)
+    parser.add_argument('--boundary', help=argparse.SUPPRESS)
+    parser.add_argument('--image-size', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.mode:
+        child(args.mode, args.body, args.boundary, args.image_size)
+        return 0
+
+    body_path = os.path.join(tempfile.mkdtemp(prefix='reserva-bench-upload-'), 'body.multipart')
+    boundary, image_size = write_body(body_path, args.files, args.size_mb)
+    print(f"{args.files} imagens de ~{image_size / 2 ** 20:.1f} MB por requisição")
+    try:
+        for mode in MODES:
+            subprocess.run(
+                [sys.executable, '-m', 'benchmarks.image_upload_rss', '--mode', mode, '--body', body_path,
+                 '--boundary', boundary, '--image-size', str(image_size)],
+                check=True,
+            )
+    finally:
+        os.remove(body_path)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
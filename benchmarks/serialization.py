@@ -0,0 +1,116 @@
+"""Microbenchmark da serialização de listagens de reservas.
+
+Compara, para `--rows` reservas (padrão 1000, com 2 imagens por local):
+
+- ReservationSerializer sobre instâncias (select_related + prefetch_related) + JSONRenderer do DRF;
+- ReservationValues sobre .values() (reservas.projections) + FastJSONRenderer (orjson).
+
+Mede separadamente consulta+serialização e renderização, e confere que os bytes são idênticos.
+
+    python -m benchmarks.serialization --rows 1000 --repeat 30
+"""
+import argparse
+import sys
+from datetime import date, datetime, timedelta
+
+from benchmarks.common import setup_django, percentile, Timer
+
+
+def populate(rows, locations):
+    from django.db import connection, transaction
+
+    now = datetime.now().isoformat(sep=' ')
+    first_day = date.today() + timedelta(days=1)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO auth_user (password, is_superuser, username, first_name, last_name, email, is_staff, is_active, date_joined) "
+            "VALUES ('', 0, 'bench-customer', '', '', '', 0, 1, %s)", [now]
+        )
+        user_id = cursor.lastrowid
+        location_ids = []
+        for n in range(locations):
+            cursor.execute(
+                "INSERT INTO reservas_location (owner_id, name, description, address, price_per_hour, "
+                "operating_hours_start, operating_hours_end, cancellation_hours, max_duration, is_active, created_at) "
+                "VALUES (%s, %s, %s, %s, 50, '08:00:00', '22:00:00', 24, 4, %s, %s)",
+                [user_id, f'Quadra {n}', 'Quadra coberta com vestiário', f'Rua {n}, 100', n % 10 != 0, now]
+            )
+            location_ids.append(cursor.lastrowid)
+        cursor.executemany(
+            "INSERT INTO reservas_locationimage (location_id, image, uploaded_at, variants) VALUES (%s, %s, %s, %s)",
+            [
+                (location_id, f'location_images/{location_id}-{k}.jpg', now,
+                 f'{{"thumb": "location_images/variants/{location_id}/thumb.jpg"}}' if k else '{}')
+                for location_id in location_ids for k in range(2)
+            ]
+        )
+        cursor.executemany(
+            "INSERT INTO reservas_reservation (user_id, location_id, date, start_time, end_time, created_at, status) "
+            "VALUES (%s, %s, %s, '10:00:00', '11:00:00', %s, %s)",
+            [
+                (user_id, location_ids[n % locations], (first_day + timedelta(days=n)).isoformat(), now,
+                 ('pendente', 'confirmed', 'cancelled')[n % 3])
+                for n in range(rows)
+            ]
+        )
+    return user_id
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--locations', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=30)
+    parser.add_argument('--db', help="Caminho do banco SQLite (padrão: arquivo temporário)")
+    args = parser.parse_args(argv)
+
+    setup_django(args.db)
+    from rest_framework.renderers import JSONRenderer
+    from reservas.models import Reservation
+    from reservas.projections import ReservationValues
+    from reservas.renderers import FastJSONRenderer
+    from reservas.serializers import ReservationSerializer
+
+    user_id = populate(args.rows, args.locations)
+    queryset = Reservation.objects.filter(user_id=user_id).order_by('-date', '-start_time', 'id')
+
+    def serializer_data():
+        return ReservationSerializer(
+            queryset.select_related('location').prefetch_related('location__images'), many=True
+        ).data
+
+    def values_data():
+        values = ReservationValues()
+        return values.serialize(list(values.project(queryset)))
+
+    slow_data, fast_data = serializer_data(), values_data()
+    slow_bytes, fast_bytes = JSONRenderer().render(slow_data), FastJSONRenderer().render(fast_data)
+    assert slow_bytes == fast_bytes, "saídas diferentes"
+
+    results = {}
+    for label, build, renderer, data in (
+        ('ReservationSerializer + JSONRenderer', serializer_data, JSONRenderer(), slow_data),
+        ('ReservationValues + FastJSONRenderer', values_data, FastJSONRenderer(), fast_data),
+    ):
+        build_ms, render_ms = [], []
+        for _ in range(args.repeat):
+            with Timer() as timer:
+                build()
+            build_ms.append(timer.elapsed * 1000)
+            with Timer() as timer:
+                renderer.render(data)
+            render_ms.append(timer.elapsed * 1000)
+        results[label] = (percentile(build_ms, 50), percentile(render_ms, 50))
+
+    print(f"{args.rows} reservas, {len(fast_bytes)} bytes de JSON (idênticos nos dois caminhos)")
+    print(f"{'':40} {'consulta+serialização':>22} {'render':>10} {'total':>10}")
+    for label, (build, render) in results.items():
+        print(f"{label:40} {build:19.2f} ms {render:7.2f} ms {build + render:7.2f} ms")
+    (slow_build, slow_render), (fast_build, fast_render) = results.values()
+    print(f"ganho: serialização {slow_build / fast_build:.1f}x, render {slow_render / fast_render:.1f}x, "
+          f"total {(slow_build + slow_render) / (fast_build + fast_render):.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
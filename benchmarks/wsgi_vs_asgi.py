@@ -0,0 +1,182 @@
+"""Benchmark WSGI x ASGI das leituras quentes (listagem/detalhe de locais, available-slots e
+reservas do customer).
+
+Os dois handlers do Django são chamados em processo, sem servidor HTTP na frente: o WSGIHandler por
+um pool de `--concurrency` threads e o ASGIHandler com `--concurrency` requisições simultâneas no
+event loop (caindo nos handlers de reservas.async_views). Mostra vazão e latências p50/p99.
+Por padrão o cache fica desligado (DummyCache) para medir o caminho até o banco; --cache usa o
+LocMemCache do projeto.
+
+    python -m benchmarks.wsgi_vs_asgi --requests 4000 --concurrency 64
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, time as dtime, timedelta
+from io import BytesIO
+
+from benchmarks.common import setup_django, percentile, Timer
+
+
+def seed(locations, customers):
+    from django.contrib.auth.models import Group, User
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from reservas.models import Location, Reservation
+
+    owner = User.objects.create(username='bench-owner')
+    owner.groups.add(Group.objects.get_or_create(name='owners')[0])
+    created = [
+        Location.objects.create(
+            owner=owner, name=f'Quadra {n}', description='Benchmark', address=f'Rua {n}',
+            operating_hours_start='08:00', operating_hours_end='22:00', max_duration=2,
+        )
+        for n in range(locations)
+    ]
+    customers_group = Group.objects.get_or_create(name='customers')[0]
+    tokens = []
+    first_day = date.today() + timedelta(days=2)
+    for n in range(customers):
+        user = User.objects.create(username=f'bench-customer-{n}')
+        user.groups.add(customers_group)
+        tokens.append(str(RefreshToken.for_user(user).access_token))
+        for day in range(5):
+            Reservation.objects.create(
+                user=user, location=created[(n + day) % locations], date=first_day + timedelta(days=day),
+                start_time=dtime(8 + n % 12, 0), end_time=dtime(9 + n % 12, 0),
+            )
+    return [location.id for location in created], tokens, first_day
+
+
+def request_mix(total, location_ids, tokens, first_day):
+    """(path, query string, token ou None) em proporções fixas e ordem reproduzível"""
+    rng = random.Random(42)
+    requests = []
+    for n in range(total):
+        kind = n % 4
+        if kind == 0:
+            requests.append(('/api/locations/', 'page_size=20', None))
+        elif kind == 1:
+            requests.append((f'/api/locations/{rng.choice(location_ids)}/', '', None))
+        elif kind == 2:
+            day = first_day + timedelta(days=rng.randrange(5))
+            requests.append((f'/api/locations/{rng.choice(location_ids)}/available-slots/', f'date={day}', None))
+        else:
+            requests.append(('/api/customer/reservations/', '', rng.choice(tokens)))
+    return requests
+
+
+def run_wsgi(requests, concurrency):
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.db import connection
+
+    handler = WSGIHandler()
+
+    def call(request):
+        path, query, token = request
+        environ = {
+            'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query,
+            'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'wsgi.url_scheme': 'http',
+            'wsgi.input': BytesIO(b''),
+        }
+        if token:
+            environ['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+        statuses = []
+        start = time.perf_counter()
+        response = handler(environ, lambda status, headers: statuses.append(status))
+        b''.join(response)
+        response.close()
+        elapsed = time.perf_counter() - start
+        connection.close()
+        return int(statuses[0].split()[0]), elapsed
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor, Timer() as timer:
+        results = list(executor.map(call, requests))
+    return results, timer.elapsed
+
+
+def run_asgi(requests, concurrency):
+    from django.core.asgi import get_asgi_application
+
+    application = get_asgi_application()
+
+    async def call(request, semaphore):
+        path, query, token = request
+        headers = [(b'host', b'localhost')]
+        if token:
+            headers.append((b'authorization', f'Bearer {token}'.encode()))
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': query.encode(),
+            'root_path': '', 'headers': headers, 'client': ('127.0.0.1', 50000), 'server': ('localhost', 80),
+        }
+        body_sent = False
+        messages = []
+
+        async def receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            # Cliente nunca desconecta: o handler cancela esta espera ao terminar
+            await asyncio.Future()
+
+        async def send(message):
+            messages.append(message)
+
+        async with semaphore:
+            start = time.perf_counter()
+            await application(scope, receive, send)
+            elapsed = time.perf_counter() - start
+        return messages[0]['status'], elapsed
+
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+        return await asyncio.gather(*(call(request, semaphore) for request in requests))
+
+    with Timer() as timer:
+        results = asyncio.run(main())
+    return results, timer.elapsed
+
+
+def report(mode, results, elapsed):
+    latencies = [latency * 1000 for _, latency in results]
+    errors = sum(1 for status, _ in results if status != 200)
+    print(
+        f"{mode:<5} {len(results) / elapsed:8.1f} req/s   p50 {percentile(latencies, 50):7.2f} ms   "
+        f"p99 {percentile(latencies, 99):7.2f} ms   erros {errors}"
+    )
+    return errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--locations', type=int, default=50)
+    parser.add_argument('--customers', type=int, default=40)
+    parser.add_argument('--cache', action='store_true', help="Mantém o cache configurado (padrão: DummyCache)")
+    parser.add_argument('--db', help="Caminho do banco SQLite (padrão: arquivo temporário)")
+    args = parser.parse_args(argv)
+
+    if not args.cache:
+        # core.settings lê o backend do ambiente
+        os.environ['CACHE_BACKEND'] = 'django.core.cache.backends.dummy.DummyCache'
+    setup_django(args.db)
+    from django.conf import settings
+    settings.ALLOWED_HOSTS = ['*']
+
+    location_ids, tokens, first_day = seed(args.locations, args.customers)
+    requests = request_mix(args.requests, location_ids, tokens, first_day)
+    print(f"{args.requests} requisições, concorrência {args.concurrency}, cache {'ligado' if args.cache else 'desligado'}")
+
+    errors = report('WSGI', *run_wsgi(requests, args.concurrency))
+    errors += report('ASGI', *run_asgi(requests, args.concurrency))
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
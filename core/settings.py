@@ -27,6 +27,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Server-Timing e histogramas do /metrics (reservas.metrics); primeiro para medir todo o resto
+    'reservas.middleware.RequestMetricsMiddleware',
     "corsheaders.middleware.CorsMiddleware",
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -35,6 +37,10 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # X-Profile / ?_profile= de staff: perfil da requisição (reservas.profiling)
+    'reservas.middleware.ProfilingMiddleware',
+    # Sob ASGI, leituras quentes vão para os handlers assíncronos de reservas.async_views
+    'reservas.middleware.AsyncReadRoutingMiddleware',
 ]
 
 AUTH_USER_MODEL = 'auth.User' 
@@ -44,16 +50,30 @@ from datetime import timedelta
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'reservas.authentication.RoleJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated', 
-    ]
+    ],
+    # JSONRenderer do DRF com o tempo de renderização medido (ver reservas.renderers)
+    'DEFAULT_RENDERER_CLASSES': [
+        'reservas.renderers.TimedJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
+# Listagens paginadas (reservas.pagination.KeysetPagination): tamanho padrão e limite do ?page_size=
+RESERVAS_PAGE_SIZE = 50
+RESERVAS_MAX_PAGE_SIZE = 200
+# Disponibilidade em lote (/api/locations/available-slots/): máximo de ids em ?locations=
+RESERVAS_MAX_BULK_LOCATIONS = 50
+# Exportação em streaming (reservas.exports): linhas lidas do banco por bloco
+RESERVAS_EXPORT_CHUNK_SIZE = 2000
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
+    'TOKEN_OBTAIN_SERIALIZER': 'reservas.serializers.RoleTokenObtainPairSerializer',
 }
 
 ROOT_URLCONF = 'core.urls'
@@ -77,6 +97,33 @@ import os
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Threads que geram as variantes de LocationImage após o upload (0 = na própria requisição)
+RESERVAS_IMAGE_WORKERS = int(os.environ.get('RESERVAS_IMAGE_WORKERS', 2))
+
+# Uploads de imagens: acima de FILE_UPLOAD_MAX_MEMORY_SIZE cada arquivo vai para um temporário em disco,
+# então a memória por requisição fica limitada a (quantidade x 1 MB) independentemente do tamanho
+FILE_UPLOAD_MAX_MEMORY_SIZE = 1024 * 1024
+RESERVAS_MAX_IMAGES_PER_REQUEST = 20
+RESERVAS_MAX_IMAGE_SIZE = 10 * 1024 * 1024
+RESERVAS_MAX_UPLOAD_SIZE = 210 * 1024 * 1024
+
+# Listagens de reservas por .values() + orjson (reservas.projections) em vez do ReservationSerializer;
+# desligado, cada requisição ainda pode pedir com ?fast=1
+RESERVAS_FAST_SERIALIZATION = os.environ.get('RESERVAS_FAST_SERIALIZATION', '0') == '1'
+
+# Métricas por requisição (reservas.metrics): cabeçalho Server-Timing nas respostas e token do /metrics
+# (sem token, o /metrics fica fechado)
+RESERVAS_SERVER_TIMING = os.environ.get('RESERVAS_SERVER_TIMING', '1') == '1'
+RESERVAS_METRICS_TOKEN = os.environ.get('RESERVAS_METRICS_TOKEN', '')
+# Log de consultas (reservas.querylog): fração das requisições amostradas e limite de linhas por processo
+RESERVAS_QUERYLOG_SAMPLE_RATE = float(os.environ.get('RESERVAS_QUERYLOG_SAMPLE_RATE', 0.05))
+RESERVAS_QUERYLOG_MAX_ENTRIES = int(os.environ.get('RESERVAS_QUERYLOG_MAX_ENTRIES', 500))
+# Profiling sob demanda (reservas.profiling): intervalo de amostragem, destino e limites dos perfis
+RESERVAS_PROFILE_DIR = os.environ.get('RESERVAS_PROFILE_DIR', os.path.join(BASE_DIR, 'profiles'))
+RESERVAS_PROFILE_INTERVAL_MS = float(os.environ.get('RESERVAS_PROFILE_INTERVAL_MS', 1))
+RESERVAS_PROFILE_MAX_SECONDS = int(os.environ.get('RESERVAS_PROFILE_MAX_SECONDS', 30))
+RESERVAS_PROFILE_MAX_BYTES = int(os.environ.get('RESERVAS_PROFILE_MAX_BYTES', 5 * 1024 * 1024))
+RESERVAS_PROFILE_MAX_FILES = int(os.environ.get('RESERVAS_PROFILE_MAX_FILES', 100))
 
 WSGI_APPLICATION = 'core.wsgi.application'
 
@@ -85,6 +132,28 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # BEGIN IMMEDIATE: cada transaction.atomic() pega a trava de escrita logo no início,
+            # então o select_for_update() das reservas também serializa no SQLite
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+            'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;',
+        },
+    }
+}
+
+# Cache das leituras de locais e disponibilidade (reservas.cache). Em produção com vários processos,
+# use um backend compartilhado, ex.: CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache
+# e CACHE_LOCATION=/var/tmp/reservas-cache
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'reservas'),
+        'TIMEOUT': int(os.environ.get('CACHE_TIMEOUT', 300)),
+        'OPTIONS': {
+            # Limite de entradas; o LocMemCache descarta as usadas há mais tempo (LRU)
+            'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', 5000)),
+        },
     }
 }
 
@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from reservas.views import LocationViewSet, ReservationViewSet
+from reservas.views import LocationViewSet, ReservationViewSet, metrics_view
 from django.conf import settings
 from django.conf.urls.static import static
 
@@ -12,6 +12,7 @@ router.register(r'reservations', ReservationViewSet, basename='reservation')
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('reservas.api_urls')),     # apenas endpoints DRF
+    path('metrics', metrics_view, name='metrics'),   # Prometheus (reservas.metrics)
     path('', include('reservas.urls')),              # templates do frontend
 ]
 
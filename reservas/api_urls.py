@@ -1,9 +1,10 @@
-from django.urls import path
+from django.urls import path, re_path
 from rest_framework.routers import DefaultRouter
 from .views import (
     RegisterView, LocationViewSet, ReservationViewSet,
     LocationImageUploadView, OwnerDashboardView, CustomerReservationsView,
-    UserTypeView, PaymentCreateView
+    UserTypeView, PaymentCreateView, CacheStatsView, LocationImageBatchUploadView, QueryLogView,
+    ProfileDownloadView, OwnerExportView
 )
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
@@ -17,9 +18,14 @@ urlpatterns = [
     path('auth/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('auth/user-type/', UserTypeView.as_view(), name='user-type'),
     path('owner/dashboard/', OwnerDashboardView.as_view(), name='api-owner-dashboard'),
+    re_path(r'^owner/export/reservations\.(?P<export_format>csv|ndjson)$', OwnerExportView.as_view(), name='owner-export'),
     path('customer/reservations/', CustomerReservationsView.as_view(), name='customer-reservations'),
     path('payments/', PaymentCreateView.as_view(), name='payment-create'),
     path('locations/images/upload/', LocationImageUploadView.as_view(), name='location-image-upload'),
+    path('locations/images/batch-upload/', LocationImageBatchUploadView.as_view(), name='location-image-batch-upload'),
+    path('cache/stats/', CacheStatsView.as_view(), name='cache-stats'),
+    path('querylog/', QueryLogView.as_view(), name='querylog'),
+    path('profiles/<str:name>/', ProfileDownloadView.as_view(), name='profile-download'),
 ]
 
 urlpatterns += router.urls
\ No newline at end of file
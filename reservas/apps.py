@@ -4,5 +4,6 @@ class ReservasConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'reservas'
 
-def ready(self):
-    import reservas.signals
\ No newline at end of file
+    def ready(self):
+        import reservas.signals
+        import reservas.metrics        # execute_wrapper das métricas em cada conexão aberta daqui em diante
@@ -0,0 +1,16 @@
+"""URLconf usada sob ASGI para GET/HEAD (ver reservas.middleware.AsyncReadRoutingMiddleware).
+
+As rotas assíncronas vêm antes; todo o resto cai nas URLs normais do projeto.
+"""
+from django.conf import settings
+from django.urls import include, path
+
+from . import async_views
+
+urlpatterns = [
+    path('api/locations/', async_views.location_list, name='async-location-list'),
+    path('api/locations/<int:pk>/', async_views.location_detail, name='async-location-detail'),
+    path('api/locations/<int:pk>/available-slots/', async_views.available_slots, name='async-location-available-slots'),
+    path('api/customer/reservations/', async_views.customer_reservations, name='async-customer-reservations'),
+    path('', include(settings.ROOT_URLCONF)),
+]
@@ -0,0 +1,219 @@
+"""Handlers assíncronos (ASGI) das leituras mais consultadas.
+
+Sob ASGI, o AsyncReadRoutingMiddleware manda os GET destes endpoints para cá (reservas.async_urls);
+sob WSGI continuam as views DRF de reservas.views. O JSON, as chaves de cache e os ETags são os
+mesmos, mas o usuário do token, o local e as páginas vêm do ORM assíncrono, sem bloquear o event loop.
+Só há saída JSON (sem a API navegável do DRF).
+"""
+import functools
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.views import exception_handler
+
+from .authentication import RoleJWTAuthentication
+from .availability import AvailabilityQueryError, availability_by_day, parse_date_range, parse_encoding, parse_slot_minutes
+from .cache import aread_through, availability_version, list_version, location_data_version
+from .conditional import not_modified, set_validators, validators
+from .fieldsets import wants
+from .geo import GeoQueryError, parse_near
+from .models import Location, Reservation
+from .occupancy import aget_occupancy
+from .pagination import KeysetPagination
+from .projections import ReservationValues
+from .renderers import FastJSONRenderer, TimedJSONRenderer
+from .roles import aget_role, is_owner
+from .serializers import LocationSerializer, ReservationSerializer
+from .views import (
+    CustomerReservationsView, LocationViewSet, cache_scope, can_view, day_availability, fast_serialization,
+    keyset_columns, near_page, request_fieldset, reservation_joins,
+)
+
+
+def render(data, status=200, renderer_class=TimedJSONRenderer):
+    response = HttpResponse(renderer_class().render(data), status=status, content_type='application/json')
+    patch_vary_headers(response, ('Accept',))
+    return response
+
+
+def error_response(exc, authenticator):
+    # Mesmo tratamento do APIView.handle_exception: falha de autenticação vira 401 com WWW-Authenticate
+    if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+        exc.auth_header = authenticator.authenticate_header(None)
+    response = exception_handler(exc, {})
+    rendered = render(response.data, response.status_code)
+    for header in ('WWW-Authenticate', 'Retry-After'):
+        if header in response:
+            rendered[header] = response[header]
+    return rendered
+
+
+def api_get(require_auth=False):
+    """Autentica pelo JWT (assíncrono), memoiza o papel e entrega um Request do DRF à view"""
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            authenticator = RoleJWTAuthentication()
+            drf_request = Request(request)
+            try:
+                result = await authenticator.aauthenticate(request)
+                drf_request.user = result[0] if result else AnonymousUser()
+                if require_auth and not drf_request.user.is_authenticated:
+                    raise exceptions.NotAuthenticated()
+                await aget_role(drf_request.user)
+                return await view(drf_request, *args, **kwargs)
+            except exceptions.APIException as exc:
+                return error_response(exc, authenticator)
+        return wrapper
+    return decorator
+
+
+def visible_locations(user, fieldset=None, prefetch_images=False):
+    queryset = Location.objects.filter(owner=user) if is_owner(user) else Location.objects.filter(is_active=True)
+    if prefetch_images and wants(fieldset, 'images', 'image_variants'):
+        queryset = queryset.prefetch_related('images')
+    return queryset
+
+
+async def get_location(request, pk, prefetch_images=False, fieldset=None):
+    queryset = visible_locations(request.user, fieldset, prefetch_images)
+    try:
+        return await queryset.aget(pk=pk)
+    except Location.DoesNotExist:
+        raise exceptions.NotFound()
+
+
+async def cached_for_location(request, namespace, version, pk, parts, build):
+    """Equivalente de LocationViewSet._cached_for_location; `build` é assíncrono"""
+    async def builder():
+        location, data = await build()
+        return {'owner_id': location.owner_id, 'is_active': location.is_active, 'data': data}
+
+    payload = await aread_through(namespace, version(pk), (pk, *parts), builder)
+    if not can_view(request.user, payload):
+        raise exceptions.NotFound("Local não encontrado.")
+    return payload['data']
+
+
+async def conditional(request, version, pk, respond):
+    etag, last_modified = validators([version(pk)], cache_scope(request.user), request.build_absolute_uri())
+    response = not_modified(request, etag, last_modified) or await respond()
+    if response.status_code in (200, 304):
+        set_validators(response, etag, last_modified)
+    return response
+
+
+@api_get()
+async def location_list(request):
+    try:
+        near = parse_near(request.query_params)
+    except GeoQueryError as exc:
+        return render({"detail": str(exc)}, status=400)
+    fieldset = request_fieldset(request, LocationSerializer)
+    version, parts = list_version(), (cache_scope(request.user), request.build_absolute_uri())
+    etag, last_modified = validators([version], *parts)
+    response = not_modified(request, etag, last_modified)
+    if response is None:
+        context = {'request': request, 'fieldset': fieldset}
+
+        async def builder():
+            if near:
+                # Busca por proximidade: candidatos do geohash + haversine em Python, fora do event loop
+                return await sync_to_async(near_page)(request, visible_locations(request.user), near, context)
+            paginator = KeysetPagination()
+            page = await paginator.apaginate_queryset(
+                visible_locations(request.user, fieldset, prefetch_images=True), request, view=LocationViewSet
+            )
+            data = LocationSerializer(page, many=True, context=context).data
+            return paginator.get_paginated_response(data).data
+
+        response = render(await aread_through('locations', version, parts, builder))
+    return set_validators(response, etag, last_modified)
+
+
+@api_get()
+async def location_detail(request, pk):
+    fieldset = request_fieldset(request, LocationSerializer)
+
+    async def respond():
+        async def build():
+            location = await get_location(request, pk, prefetch_images=True, fieldset=fieldset)
+            return location, LocationSerializer(location, context={'request': request, 'fieldset': fieldset}).data
+
+        return render(await cached_for_location(
+            request, 'location', location_data_version, pk, (request.build_absolute_uri('/'), fieldset), build
+        ))
+
+    return await conditional(request, location_data_version, pk, respond)
+
+
+@api_get()
+async def available_slots(request, pk):
+    return await conditional(request, availability_version, pk, lambda: _available_slots(request, pk))
+
+
+async def _available_slots(request, pk):
+    date_str = request.query_params.get('date')
+    if not date_str and 'from' in request.query_params:
+        return await _available_slots_range(request, await get_location(request, pk))
+    if not date_str:
+        return render({"detail": "Data não fornecida."}, status=400)
+
+    try:
+        query_date = datetime.strptime(date_str, "%Y-%m-%d").date()
+    except ValueError:
+        return render({"detail": "Formato de data inválido. Use YYYY-MM-DD."}, status=400)
+
+    try:
+        slot_minutes = parse_slot_minutes(request.query_params)
+    except AvailabilityQueryError as exc:
+        return render({"detail": str(exc)}, status=400)
+
+    async def build():
+        location = await get_location(request, pk)
+        return location, day_availability(location, slot_minutes, await aget_occupancy(location.id, query_date))
+
+    return render(await cached_for_location(
+        request, 'availability', availability_version, pk, (query_date, slot_minutes), build
+    ))
+
+
+async def _available_slots_range(request, location):
+    try:
+        start, end = parse_date_range(request.query_params)
+        encoding = parse_encoding(request.query_params)
+        slot_minutes = parse_slot_minutes(request.query_params)
+    except AvailabilityQueryError as exc:
+        return render({"detail": str(exc)}, status=400)
+
+    # agendas_by_day ainda é síncrono: roda na thread do ORM, fora do event loop
+    availability = await sync_to_async(availability_by_day)([location], start, end, encoding, slot_minutes)
+    return render({
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "encoding": encoding,
+        "slot_minutes": slot_minutes,
+        "locations": {str(location_id): days for location_id, days in availability.items()},
+    })
+
+
+@api_get(require_auth=True)
+async def customer_reservations(request):
+    fieldset = request_fieldset(request, ReservationSerializer)
+    reservations = Reservation.objects.filter(user=request.user)
+    paginator = KeysetPagination()
+    if fast_serialization(request):
+        values = ReservationValues(context={'fieldset': fieldset})
+        reservations = values.project(reservations, keyset_columns(CustomerReservationsView))
+        page = await paginator.apaginate_queryset(reservations, request, view=CustomerReservationsView)
+        return render(paginator.get_paginated_response(await values.aserialize(page)).data, renderer_class=FastJSONRenderer)
+    page = await paginator.apaginate_queryset(
+        reservation_joins(reservations, fieldset), request, view=CustomerReservationsView
+    )
+    serializer = ReservationSerializer(page, many=True, context={'fieldset': fieldset})
+    return render(paginator.get_paginated_response(serializer.data).data)
@@ -0,0 +1,72 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .models import UserProfile
+
+
+class RoleJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication que reaproveita a claim `role` do token em vez de consultar os grupos.
+
+    O perfil vem na mesma consulta do usuário; se os grupos mudaram depois que o token foi emitido
+    (UserProfile.roles_updated_at > role_at) a claim é ignorada e o papel é recalculado.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user = self.user_model.objects.select_related('userprofile').get(**self.user_lookup(validated_token))
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        return self.check_user(user, validated_token)
+
+    async def aauthenticate(self, request):
+        """authenticate() para os handlers ASGI: o token é validado em memória e só a busca do usuário
+        vai ao banco, pelo ORM assíncrono"""
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        try:
+            user = await self.user_model.objects.select_related('userprofile').aget(**self.user_lookup(validated_token))
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        return self.check_user(user, validated_token)
+
+    @staticmethod
+    def user_lookup(validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        return {api_settings.USER_ID_FIELD: user_id}
+
+    def check_user(self, user, validated_token):
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        self.apply_role_claim(user, validated_token)
+        return user
+
+    @staticmethod
+    def apply_role_claim(user, validated_token):
+        role_at = validated_token.get('role_at')
+        if role_at is None or 'role' not in validated_token:
+            return
+        try:
+            roles_updated_at = user.userprofile.roles_updated_at
+        except UserProfile.DoesNotExist:
+            roles_updated_at = None
+        if roles_updated_at is None or roles_updated_at.timestamp() <= role_at:
+            user._role = validated_token['role']
@@ -0,0 +1,238 @@
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from math import ceil
+
+from django.db.models import Exists, OuterRef
+
+from .models import Reservation
+
+# Janela máxima aceita pelos endpoints de disponibilidade por intervalo de datas
+MAX_RANGE_DAYS = 62
+
+ENCODINGS = ('slots', 'bitmask', 'rle')
+
+SLOT_SIZES = (15, 30, 60)
+DEFAULT_SLOT_MINUTES = 60
+
+
+class AvailabilityQueryError(ValueError):
+    pass
+
+
+def to_minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def format_minutes(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def merge_intervals(intervals):
+    """Ordena e funde intervalos [início, fim) em minutos; intervalos encostados viram um só"""
+    merged = []
+    for start, end in sorted(intervals):
+        if start >= end:
+            continue
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+class DayAgenda:
+    """Intervalos ocupados de um local em um dia, disjuntos e ordenados, com consultas em O(log n).
+
+    É a única regra de conflito do app: a listagem de horários (available_slots) e a validação
+    de novas reservas (ReservationCreateSerializer) passam por aqui.
+    """
+
+    def __init__(self, intervals=()):
+        merged = merge_intervals(intervals)
+        self.starts = [start for start, _ in merged]
+        self.ends = [end for _, end in merged]
+
+    @classmethod
+    def from_times(cls, rows):
+        return cls((to_minutes(start_time), to_minutes(end_time)) for start_time, end_time in rows)
+
+    @classmethod
+    def for_day(cls, location_id, date):
+        """Monta a agenda a partir das reservas ativas (pendentes e confirmadas) do local no dia"""
+        rows = active_reservations().filter(location_id=location_id, date=date).values_list('start_time', 'end_time')
+        return cls.from_times(rows)
+
+    @property
+    def intervals(self):
+        return [[start, end] for start, end in zip(self.starts, self.ends)]
+
+    def __len__(self):
+        return len(self.starts)
+
+    def conflicts(self, start, end):
+        # Primeiro intervalo que termina depois de `start`; há conflito se ele começar antes de `end`
+        index = bisect_right(self.ends, start)
+        return index < len(self.starts) and self.starts[index] < end
+
+    def conflicts_with(self, start_time, end_time):
+        return self.conflicts(to_minutes(start_time), to_minutes(end_time))
+
+    def free_slots(self, slot_starts, slot_minutes):
+        return [start for start in slot_starts if not self.conflicts(start, start + slot_minutes)]
+
+    def hours_mask(self):
+        """Bitmask das horas cheias que têm alguma ocupação (bit h = hora h)"""
+        mask = 0
+        for hour in range(24):
+            if self.conflicts(hour * 60, hour * 60 + 60):
+                mask |= 1 << hour
+        return mask
+
+
+def active_reservations():
+    return Reservation.objects.exclude(status=Reservation.Status.CANCELADA)
+
+
+def operating_hours(location):
+    """Horas em que o local funciona, já incluindo a hora de fechamento"""
+    start_operating = location.operating_hours_start.hour
+    end_operating = location.operating_hours_end.hour
+
+    # Incluir a última hora se o local funciona até ela
+    # Ex: se funciona até 23:00, deve mostrar slot 23:00
+    if location.operating_hours_end.minute >= 0:
+        end_operating += 1
+
+    return range(start_operating, end_operating)
+
+
+def slot_starts(location, slot_minutes=DEFAULT_SLOT_MINUTES):
+    """Inícios dos slots do local na grade de `slot_minutes`, com a mesma regra de operating_hours"""
+    first = to_minutes(location.operating_hours_start) // slot_minutes * slot_minutes
+    last = to_minutes(location.operating_hours_end) // slot_minutes * slot_minutes
+    return range(first, last + 1, slot_minutes)
+
+
+def parse_date(value, name):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        raise AvailabilityQueryError(f"Formato de data inválido em '{name}'. Use YYYY-MM-DD.")
+
+
+def parse_time(value, name):
+    try:
+        return datetime.strptime(value, "%H:%M").time()
+    except (TypeError, ValueError):
+        raise AvailabilityQueryError(f"Formato de horário inválido em '{name}'. Use HH:MM.")
+
+
+def parse_window(params):
+    """(data, início, fim) de ?date=&start=&end= para a busca de locais livres"""
+    if not params.get('date') or not params.get('start') or not params.get('end'):
+        raise AvailabilityQueryError("Informe 'date', 'start' e 'end'.")
+    day = parse_date(params['date'], 'date')
+    start = parse_time(params['start'], 'start')
+    end = parse_time(params['end'], 'end')
+    if start >= end:
+        raise AvailabilityQueryError("'start' deve ser anterior a 'end'.")
+    return day, start, end
+
+
+def free_locations(locations, day, start, end):
+    """Locais em que [start, end) pode ser reservado no dia: horário de funcionamento e duração máxima
+    cobrem a janela (mesmas regras do ReservationCreateSerializer) e nenhuma reserva ativa se sobrepõe.
+
+    A sobreposição é um único NOT EXISTS correlacionado, resolvido pelo índice parcial
+    reservation_active_day_idx (location, date, start_time).
+    """
+    overlapping = active_reservations().filter(
+        location=OuterRef('pk'), date=day, start_time__lt=end, end_time__gt=start,
+    )
+    hours = ceil((to_minutes(end) - to_minutes(start)) / 60)
+    return locations.filter(
+        operating_hours_start__lte=start,
+        operating_hours_end__gte=end,
+        max_duration__gte=hours,
+    ).filter(~Exists(overlapping))
+
+
+def parse_date_range(params):
+    if not params.get('from') or not params.get('to'):
+        raise AvailabilityQueryError("Informe 'from' e 'to'.")
+    start = parse_date(params['from'], 'from')
+    end = parse_date(params['to'], 'to')
+    if end < start:
+        raise AvailabilityQueryError("'to' deve ser igual ou posterior a 'from'.")
+    if (end - start).days + 1 > MAX_RANGE_DAYS:
+        raise AvailabilityQueryError(f"Intervalo máximo de {MAX_RANGE_DAYS} dias.")
+    return start, end
+
+
+def parse_encoding(params):
+    encoding = params.get('encoding', 'slots')
+    if encoding not in ENCODINGS:
+        raise AvailabilityQueryError(f"Codificação inválida. Use uma de: {', '.join(ENCODINGS)}.")
+    return encoding
+
+
+def parse_slot_minutes(params):
+    try:
+        slot_minutes = int(params.get('slot_minutes', DEFAULT_SLOT_MINUTES))
+    except (TypeError, ValueError):
+        slot_minutes = None
+    if slot_minutes not in SLOT_SIZES:
+        raise AvailabilityQueryError(f"Tamanho de slot inválido. Use um de: {', '.join(map(str, SLOT_SIZES))} minutos.")
+    return slot_minutes
+
+
+def agendas_by_day(location_ids, start, end):
+    """Uma única consulta em Reservation, agrupada em memória: {(location_id, date): DayAgenda}"""
+    intervals = {}
+    rows = active_reservations().filter(
+        location_id__in=location_ids,
+        date__range=(start, end),
+    ).values_list('location_id', 'date', 'start_time', 'end_time')
+    for location_id, day, start_time, end_time in rows:
+        intervals.setdefault((location_id, day), []).append((to_minutes(start_time), to_minutes(end_time)))
+    return {key: DayAgenda(day_intervals) for key, day_intervals in intervals.items()}
+
+
+def encode_slots(free_starts, slot_minutes, encoding):
+    """Converte os inícios de slots livres no formato pedido pelo cliente.
+
+    bitmask e rle usam o índice do slot no dia (minuto // slot_minutes); com slots de 60 minutos é a hora.
+    """
+    if encoding == 'slots':
+        return [format_minutes(start) for start in free_starts]
+    indexes = [start // slot_minutes for start in free_starts]
+    if encoding == 'bitmask':
+        mask = 0
+        for index in indexes:
+            mask |= 1 << index
+        return mask
+    # rle: lista de [índice inicial, quantidade de slots livres consecutivos]
+    runs = []
+    for index in indexes:
+        if runs and runs[-1][0] + runs[-1][1] == index:
+            runs[-1][1] += 1
+        else:
+            runs.append([index, 1])
+    return runs
+
+
+def availability_by_day(locations, start, end, encoding='slots', slot_minutes=DEFAULT_SLOT_MINUTES):
+    """{location_id: {"YYYY-MM-DD": slots livres}} para todos os locais e dias do intervalo"""
+    agendas = agendas_by_day([location.id for location in locations], start, end)
+    days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+    empty = DayAgenda()
+    result = {}
+    for location in locations:
+        starts = slot_starts(location, slot_minutes)
+        result[location.id] = {
+            day.isoformat(): encode_slots(
+                agendas.get((location.id, day), empty).free_slots(starts, slot_minutes), slot_minutes, encoding
+            )
+            for day in days
+        }
+    return result
@@ -0,0 +1,135 @@
+"""Cache read-through das leituras de locais e disponibilidade.
+
+As chaves levam a versão do local (ou da listagem); qualquer escrita em Reservation, Location ou
+LocationImage incrementa a versão e as entradas antigas simplesmente deixam de ser lidas, expirando
+pelo TTL / LRU do backend configurado em CACHES.
+"""
+import threading
+import time
+from collections import Counter
+from hashlib import sha1
+
+from django.core.cache import cache
+from django.db import transaction
+
+LIST_VERSION_KEY = 'reservas:locations:version'
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def location_version_key(location_id, scope):
+    return f'reservas:location:{location_id}:{scope}:version'
+
+
+def _version(key):
+    version = cache.get(key)
+    if version is None:
+        # Versão nova e única: se a chave foi expulsa do cache, não reaproveita entradas antigas
+        version = time.time_ns()
+        cache.add(key, version, timeout=None)
+        version = cache.get(key, version)
+    return version
+
+
+def _bump(key):
+    cache.set(key, time.time_ns(), timeout=None)
+
+
+def availability_version(location_id):
+    """Muda a cada reserva criada/alterada no local e a cada alteração do próprio local"""
+    return _version(location_version_key(location_id, 'availability'))
+
+
+def location_data_version(location_id):
+    """Muda quando o local ou suas imagens mudam"""
+    return _version(location_version_key(location_id, 'data'))
+
+
+def list_version():
+    return _version(LIST_VERSION_KEY)
+
+
+def invalidate(location_id, availability=False, data=False, listing=False):
+    """Invalida as leituras do local agora e de novo após o commit (evita recachear dados da transação aberta)"""
+    keys = []
+    if availability:
+        keys.append(location_version_key(location_id, 'availability'))
+    if data:
+        keys.append(location_version_key(location_id, 'data'))
+    if listing:
+        keys.append(LIST_VERSION_KEY)
+
+    def bump():
+        for key in keys:
+            _bump(key)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def make_key(namespace, version, *parts):
+    digest = sha1(repr(parts).encode()).hexdigest()
+    return f'reservas:{namespace}:{version}:{digest}'
+
+
+def read_through(namespace, version, parts, builder, timeout=None):
+    """Devolve o valor em cache ou chama `builder()`, guarda e devolve (None nunca é guardado)"""
+    key = make_key(namespace, version, *parts)
+    value = cache.get(key)
+    if value is not None:
+        record(namespace, hit=True)
+        return value
+    record(namespace, hit=False)
+    value = builder()
+    if value is not None:
+        if timeout is None:
+            cache.set(key, value)
+        else:
+            cache.set(key, value, timeout)
+    return value
+
+
+async def aread_through(namespace, version, parts, builder, timeout=None):
+    """read_through() com `builder` assíncrono, para os handlers ASGI.
+
+    O acesso ao cache continua síncrono: os backends configurados (memória local ou arquivo) respondem
+    sem espera de rede; só a montagem do valor (ORM) é aguardada.
+    """
+    key = make_key(namespace, version, *parts)
+    value = cache.get(key)
+    if value is not None:
+        record(namespace, hit=True)
+        return value
+    record(namespace, hit=False)
+    value = await builder()
+    if value is not None:
+        if timeout is None:
+            cache.set(key, value)
+        else:
+            cache.set(key, value, timeout)
+    return value
+
+
+def record(namespace, hit):
+    with _stats_lock:
+        _stats[(namespace, 'hits' if hit else 'misses')] += 1
+
+
+def cache_stats():
+    """Contadores de acertos/erros por namespace neste processo"""
+    with _stats_lock:
+        snapshot = dict(_stats)
+    namespaces = sorted({namespace for namespace, _ in snapshot})
+    return {
+        namespace: {
+            'hits': snapshot.get((namespace, 'hits'), 0),
+            'misses': snapshot.get((namespace, 'misses'), 0),
+        }
+        for namespace in namespaces
+    }
+
+
+def reset_cache_stats():
+    with _stats_lock:
+        _stats.clear()
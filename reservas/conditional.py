@@ -0,0 +1,31 @@
+"""Validadores HTTP (ETag / Last-Modified) derivados das versões de reservas.cache.
+
+As versões mudam a cada escrita que afeta a resposta, então o ETag é calculado sem consultar o banco
+e um If-None-Match válido responde 304 antes de qualquer serializer rodar.
+"""
+from hashlib import sha1
+
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+def validators(versions, *parts):
+    """(ETag forte, Last-Modified em segundos) para as versões e o restante da chave da resposta"""
+    etag = quote_etag(sha1(repr((tuple(versions), parts)).encode()).hexdigest())
+    # Versão = time_ns() da última escrita (ou da primeira leitura depois de a chave sair do cache).
+    # Last-Modified tem resolução de segundos; o ETag é o validador exato.
+    last_modified = max(versions) // 1_000_000_000
+    return etag, last_modified
+
+
+def not_modified(request, etag, last_modified):
+    """Resposta 304 (ou 412) se as pré-condições do cliente permitirem; senão None"""
+    return get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+
+def set_validators(response, etag, last_modified):
+    response.headers['ETag'] = etag
+    response.headers['Last-Modified'] = http_date(last_modified)
+    # A resposta depende de quem pergunta (owner vê os próprios locais)
+    patch_vary_headers(response, ('Authorization',))
+    return response
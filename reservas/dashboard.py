@@ -0,0 +1,128 @@
+from datetime import date
+
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from .models import Location, LocationOccupancy, LocationStats, Reservation
+
+# Contador de LocationStats para cada status de reserva
+STATUS_COUNTERS = {
+    Reservation.Status.PENDENTE: 'pending_reservations',
+    Reservation.Status.CONFIRMADA: 'confirmed_reservations',
+    Reservation.Status.CANCELADA: 'cancelled_reservations',
+}
+
+COUNTER_FIELDS = ('total_reservations', *STATUS_COUNTERS.values())
+
+
+def ensure_stats(location):
+    LocationStats.objects.get_or_create(location_id=location.pk, defaults={'owner_id': location.owner_id})
+
+
+def sync_owner(location):
+    """Acompanha a transferência do local: o dashboard filtra LocationStats pelo owner copiado na linha"""
+    LocationStats.objects.filter(location_id=location.pk).exclude(owner_id=location.owner_id).update(owner_id=location.owner_id)
+
+
+def apply_delta(location_id, status, delta):
+    """Soma `delta` ao total e ao contador do status, com UPDATE atômico (F) na linha do local"""
+    apply_deltas(location_id, {status: delta})
+
+
+def apply_deltas(location_id, deltas):
+    """apply_delta de vários status de uma vez ({status: delta}), num único UPDATE"""
+    changes = {'total_reservations': F('total_reservations') + sum(deltas.values())}
+    for status, delta in deltas.items():
+        if status in STATUS_COUNTERS:
+            changes[STATUS_COUNTERS[status]] = F(STATUS_COUNTERS[status]) + delta
+    if not LocationStats.objects.filter(location_id=location_id).update(**changes):
+        # Linha ausente (local criado por bulk_create, por exemplo): recalcula do zero
+        reconcile_location(location_id)
+
+
+def move_status(location_id, old_status, new_status):
+    if old_status == new_status:
+        return
+    changes = {}
+    if old_status in STATUS_COUNTERS:
+        changes[STATUS_COUNTERS[old_status]] = F(STATUS_COUNTERS[old_status]) - 1
+    if new_status in STATUS_COUNTERS:
+        changes[STATUS_COUNTERS[new_status]] = F(STATUS_COUNTERS[new_status]) + 1
+    if changes and not LocationStats.objects.filter(location_id=location_id).update(**changes):
+        reconcile_location(location_id)
+
+
+def expected_stats(location_id=None):
+    """Contadores calculados da tabela Reservation (uma consulta agregada): {location_id: {campo: valor}}"""
+    locations = Location.objects.all()
+    if location_id is not None:
+        locations = locations.filter(id=location_id)
+    counters = {
+        STATUS_COUNTERS[status]: Count('reservation', filter=Q(reservation__status=status))
+        for status in STATUS_COUNTERS
+    }
+    rows = locations.values('id', 'owner_id').annotate(total_reservations=Count('reservation'), **counters)
+    return {row.pop('id'): row for row in rows}
+
+
+def stored_stats(location_id=None):
+    rows = LocationStats.objects.all()
+    if location_id is not None:
+        rows = rows.filter(location_id=location_id)
+    return {row.pop('location_id'): row for row in rows.values('location_id', 'owner_id', *COUNTER_FIELDS)}
+
+
+def diff_stats(expected, stored):
+    return [
+        (location_id, expected.get(location_id), stored.get(location_id))
+        for location_id in sorted(expected.keys() | stored.keys())
+        if expected.get(location_id) != stored.get(location_id)
+    ]
+
+
+def repair_stats(expected, divergences):
+    for location_id, wanted, _ in divergences:
+        if wanted is None:
+            LocationStats.objects.filter(location_id=location_id).delete()
+        else:
+            LocationStats.objects.update_or_create(location_id=location_id, defaults=wanted)
+
+
+def reconcile_location(location_id):
+    expected = expected_stats(location_id)
+    repair_stats(expected, diff_stats(expected, stored_stats(location_id)))
+
+
+def dashboard_summary(owner, today=None):
+    """Dashboard do owner em uma única consulta sobre LocationStats.
+
+    As reservas confirmadas futuras vêm da soma de LocationOccupancy.confirmed_count a partir de hoje
+    (subconsulta por local), que não cresce com o histórico.
+    """
+    today = today or date.today()
+    upcoming = (
+        LocationOccupancy.objects.filter(location=OuterRef('location'), date__gte=today)
+        .values('location')
+        .annotate(total=Sum('confirmed_count'))
+        .values('total')
+    )
+    rows = list(
+        LocationStats.objects.filter(owner=owner)
+        .annotate(upcoming=Coalesce(Subquery(upcoming, output_field=IntegerField()), 0))
+        .values('location__name', 'upcoming', *COUNTER_FIELDS)
+    )
+
+    per_location = {}
+    for row in rows:
+        if row['total_reservations']:
+            per_location[row['location__name']] = per_location.get(row['location__name'], 0) + row['total_reservations']
+
+    return {
+        'total_locations': len(rows),
+        'total_reservations': sum(row['total_reservations'] for row in rows),
+        'upcoming_reservations': sum(row['upcoming'] for row in rows),
+        'reservations_per_location': [{'location__name': name, 'count': count} for name, count in per_location.items()],
+        'reservations_per_status': {
+            status.value: sum(row[field] for row in rows) for status, field in STATUS_COUNTERS.items()
+        },
+    }
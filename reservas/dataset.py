@@ -0,0 +1,266 @@
+"""Gerador de dados sintéticos em volume: usuários, locais, reservas e pagamentos via bulk_create.
+
+Nada passa pelos signals, então o gerador grava também o que eles manteriam: UserProfile, grupos,
+geohash, o índice LocationOccupancy e os contadores LocationStats. No fim invalida o cache da
+listagem e roda ANALYZE. Usado pelo comando `generate_dataset` e por benchmarks/endpoints.py.
+
+Distribuições (todas a partir de uma semente, reproduzíveis):
+- 5% dos usuários são owners; poucos owners concentram muitos locais;
+- locais em algumas capitais (80% com coordenadas), preço log-normal, horários mais comuns;
+- popularidade dos locais com cauda longa (Pareto): poucos locais concentram muitas reservas;
+- reservas em horas cheias, mais à noite e nos fins de semana, sem sobreposição entre ativas;
+- status conforme passado/futuro; pagamento na maioria das confirmadas e reembolso em canceladas.
+"""
+import random
+import time as clock
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group, User
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import geo
+from .availability import DayAgenda
+from .cache import invalidate
+from .models import Location, LocationOccupancy, LocationStats, Payment, Reservation, UserProfile
+from .occupancy import occupancy_values
+
+# (nome, latitude, longitude, peso)
+CITIES = (
+    ('São Paulo', -23.5505, -46.6333, 40),
+    ('Rio de Janeiro', -22.9068, -43.1729, 25),
+    ('Belo Horizonte', -19.9167, -43.9345, 15),
+    ('Curitiba', -25.4284, -49.2733, 10),
+    ('Recife', -8.0476, -34.8770, 10),
+)
+KINDS = ('Quadra', 'Campo', 'Salão', 'Sala de reunião', 'Estúdio', 'Piscina', 'Churrasqueira')
+OPENING_HOURS = ((8, 22), (6, 23), (10, 20), (8, 18), (7, 23))
+OPENING_WEIGHTS = (40, 20, 15, 15, 10)
+PAYMENT_METHODS = (Payment.PaymentMethod.PIX, Payment.PaymentMethod.CARTAO, Payment.PaymentMethod.BOLETO)
+PAYMENT_WEIGHTS = (60, 30, 10)
+DEFAULT_PASSWORD = 'password123'
+
+
+class DatasetGenerator:
+
+    def __init__(self, users, locations, reservations, seed=1, batch_size=5000, days_back=180,
+                 days_ahead=60, prefix='synth', progress=None):
+        self.users, self.locations, self.reservations = users, locations, reservations
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.days_back, self.days_ahead = days_back, days_ahead
+        self.prefix = prefix
+        self.progress = progress or (lambda stage, count, elapsed: None)
+        self.today = date.today()
+        self.counts = {}
+
+    def run(self):
+        if User.objects.filter(username__startswith=f'{self.prefix}-').exists():
+            raise ValueError(f"Já existem usuários com o prefixo '{self.prefix}-': use outro --prefix.")
+        owners, customers = self.stage('usuários', self.create_users)
+        locations = self.stage('locais', lambda: self.create_locations(owners))
+        self.stage('reservas', lambda: self.create_reservations(locations, customers))
+        invalidate(None, listing=True)
+        if connection.vendor in ('sqlite', 'postgresql'):
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+        return self.counts
+
+    def stage(self, name, create):
+        started = clock.perf_counter()
+        result = create()
+        self.progress(name, self.counts.get(name, 0), clock.perf_counter() - started)
+        return result
+
+    def batches(self, total):
+        for start in range(0, total, self.batch_size):
+            yield range(start, min(start + self.batch_size, total))
+
+    # Usuários: um único hash de senha para todos (o hash é o que torna o UserFactory lento)
+    def create_users(self):
+        password = make_password(DEFAULT_PASSWORD)
+        groups = {name: Group.objects.get_or_create(name=name)[0].id for name in ('owners', 'customers')}
+        owner_count = max(1, self.users // 20)
+        owners, customers = [], []
+        now = timezone.now()
+        for batch in self.batches(self.users):
+            with transaction.atomic():
+                created = User.objects.bulk_create([
+                    User(username=f'{self.prefix}-{n}', email=f'{self.prefix}-{n}@example.com', password=password,
+                         first_name=f'Usuário {n}', date_joined=now - timedelta(days=self.rng.randrange(720)))
+                    for n in batch
+                ])
+                memberships = []
+                for n, user in zip(batch, created):
+                    role = 'owners' if n < owner_count else 'customers'
+                    (owners if role == 'owners' else customers).append(user.id)
+                    memberships.append(User.groups.through(user_id=user.id, group_id=groups[role]))
+                User.groups.through.objects.bulk_create(memberships)
+                UserProfile.objects.bulk_create([
+                    UserProfile(user_id=user.id, phone=f'11{self.rng.randrange(10 ** 9):09d}',
+                                cpf=f'{self.rng.randrange(10 ** 11):011d}')
+                    for user in created
+                ])
+        self.counts['usuários'] = self.users
+        # Sem customers (dataset mínimo), os owners também reservam
+        return owners, customers or owners
+
+    def create_locations(self, owners):
+        """[(id, owner_id, preço, abertura, fechamento, duração máxima, popularidade)]"""
+        city_weights = [city[3] for city in CITIES]
+        locations = []
+        for batch in self.batches(self.locations):
+            rows = []
+            for n in batch:
+                name, lat, lng, _ = self.rng.choices(CITIES, city_weights)[0]
+                opens, closes = self.rng.choices(OPENING_HOURS, OPENING_WEIGHTS)[0]
+                location = Location(
+                    # Owners no início da lista ficam com mais locais
+                    owner_id=owners[int(len(owners) * self.rng.random() ** 2)],
+                    name=f'{self.rng.choice(KINDS)} {n}',
+                    description=f'{self.rng.choice(KINDS)} em {name} com estacionamento e vestiário',
+                    address=f'Rua {self.rng.randrange(1, 500)}, {self.rng.randrange(1, 3000)} - {name}',
+                    price_per_hour=Decimal(min(max(self.rng.lognormvariate(4.3, 0.5), 20), 999)).quantize(Decimal('0.01')),
+                    operating_hours_start=time(opens), operating_hours_end=time(closes),
+                    cancellation_hours=self.rng.choice((2, 12, 24, 48)),
+                    max_duration=self.rng.choice((1, 2, 2, 3, 4, 6)),
+                    is_active=self.rng.random() < 0.95,
+                )
+                if self.rng.random() < 0.8:
+                    location.latitude = Decimal(f'{lat + self.rng.gauss(0, 0.08):.6f}')
+                    location.longitude = Decimal(f'{lng + self.rng.gauss(0, 0.08):.6f}')
+                    location.geohash = geo.encode(float(location.latitude), float(location.longitude))
+                rows.append(location)
+            with transaction.atomic():
+                created = Location.objects.bulk_create(rows)
+                LocationStats.objects.bulk_create([
+                    LocationStats(location_id=location.id, owner_id=location.owner_id) for location in created
+                ])
+            locations.extend(
+                (location.id, location.owner_id, location.price_per_hour, location.operating_hours_start.hour,
+                 location.operating_hours_end.hour, location.max_duration, min(self.rng.paretovariate(1.2), 500))
+                for location in created
+            )
+        self.counts['locais'] = self.locations
+        return locations
+
+    def reservation_counts(self, locations):
+        # Reservas divididas pela popularidade: parte inteira + sorteio do resto
+        total_weight = sum(location[-1] for location in locations)
+        shares = [self.reservations * location[-1] / total_weight for location in locations]
+        counts = [int(share) for share in shares]
+        remainder = self.reservations - sum(counts)
+        for index in self.rng.choices(range(len(locations)), weights=shares, k=remainder):
+            counts[index] += 1
+        return counts
+
+    def create_reservations(self, locations, customers):
+        writer = ReservationWriter(self.batch_size)
+        for location, count in zip(locations, self.reservation_counts(locations)):
+            self.location_reservations(writer, location, count, customers)
+        writer.flush()
+        self.counts['reservas'] = writer.reservations
+        self.counts['pagamentos'] = writer.payments
+
+    def location_reservations(self, writer, location, count, customers):
+        location_id, owner_id, price, opens, closes, max_duration, _ = location
+        busy, agendas, counters = {}, {}, {'pendente': 0, 'confirmed': 0, 'cancelled': 0}
+        for _ in range(count):
+            for attempt in range(5):
+                day = self.random_day()
+                duration = min(self.rng.choice((1, 1, 1, 2, 2, 3)), max_duration, closes - opens)
+                hours = range(opens, closes - duration + 1)
+                # Mais procura no fim da tarde e à noite
+                start = self.rng.choices(hours, weights=[3 if hour >= 17 else 1 for hour in hours])[0]
+                status = self.random_status(day)
+                mask = ((1 << duration) - 1) << start
+                if status == 'cancelled' or not busy.get(day, 0) & mask:
+                    break
+            else:
+                continue
+            if status != 'cancelled':
+                busy[day] = busy.get(day, 0) | mask
+                agendas.setdefault(day, []).append((start * 60, (start + duration) * 60, status))
+            counters[status] += 1
+            writer.add(self.reservation(location_id, customers, day, start, duration, status), price * duration, status, self.rng)
+
+        for day, intervals in agendas.items():
+            confirmed = sum(1 for *_, status in intervals if status == 'confirmed')
+            agenda = DayAgenda([(start, end) for start, end, _ in intervals])
+            writer.occupancy.append(LocationOccupancy(
+                location_id=location_id, date=day, **occupancy_values(agenda, len(intervals), confirmed)
+            ))
+        writer.stats.append(LocationStats(
+            location_id=location_id, owner_id=owner_id, total_reservations=sum(counters.values()),
+            pending_reservations=counters['pendente'], confirmed_reservations=counters['confirmed'],
+            cancelled_reservations=counters['cancelled'],
+        ))
+
+    def random_day(self):
+        while True:
+            day = self.today + timedelta(days=self.rng.randint(-self.days_back, self.days_ahead))
+            # Fins de semana ~1,5x mais procurados
+            if day.weekday() >= 5 or self.rng.random() < 0.66:
+                return day
+
+    def random_status(self, day):
+        if day < self.today:
+            return self.rng.choices(('confirmed', 'cancelled', 'pendente'), (82, 12, 6))[0]
+        return self.rng.choices(('confirmed', 'pendente', 'cancelled'), (45, 45, 10))[0]
+
+    def reservation(self, location_id, customers, day, start, duration, status):
+        reservation = Reservation(
+            user_id=self.rng.choice(customers), location_id=location_id, date=day,
+            start_time=time(start), end_time=time(start + duration), status=status,
+        )
+        if status == 'cancelled':
+            reservation.cancelled_at = timezone.make_aware(datetime.combine(day, time(start))) - timedelta(
+                hours=self.rng.randrange(2, 240)
+            )
+        return reservation
+
+
+class ReservationWriter:
+    """Acumula reservas, pagamentos, ocupação e contadores e grava em lotes de bulk_create"""
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.pending, self.occupancy, self.stats = [], [], []
+        self.reservations = self.payments = 0
+
+    def add(self, reservation, value, status, rng):
+        payment = None
+        if status == 'confirmed' and rng.random() < 0.9:
+            payment = (Payment.PaymentStatus.PAGO, None)
+        elif status == 'pendente' and rng.random() < 0.5:
+            payment = (Payment.PaymentStatus.PENDENTE, None)
+        elif status == 'cancelled' and rng.random() < 0.3:
+            payment = (Payment.PaymentStatus.REEMBOLSADO, reservation.cancelled_at)
+        if payment is not None:
+            payment = (rng.choices(PAYMENT_METHODS, PAYMENT_WEIGHTS)[0], value, *payment)
+        self.pending.append((reservation, payment))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        with transaction.atomic():
+            reservations = Reservation.objects.bulk_create([reservation for reservation, _ in self.pending])
+            payments = []
+            for reservation, (_, payment) in zip(reservations, self.pending):
+                if payment is not None:
+                    method, value, status, refunded = payment
+                    payments.append(Payment(
+                        reservation_id=reservation.id, method=method, valor=value, status=status, reembolsado_em=refunded,
+                    ))
+            Payment.objects.bulk_create(payments)
+            LocationOccupancy.objects.bulk_create(self.occupancy)
+            # As linhas de LocationStats foram criadas com os locais; aqui só os contadores
+            LocationStats.objects.bulk_update(self.stats, [
+                'total_reservations', 'pending_reservations', 'confirmed_reservations', 'cancelled_reservations',
+            ], batch_size=500)
+        self.reservations += len(reservations)
+        self.payments += len(payments)
+        self.pending, self.occupancy, self.stats = [], [], []
+
@@ -0,0 +1,138 @@
+"""Exportação em streaming do histórico de reservas (e pagamentos) de um owner, em CSV ou NDJSON.
+
+Para cada local do owner (em ordem de id), um values_list() com os joins de Location, usuário e
+Payment é lido com iterator(chunk_size): cada lote de linhas vira um bloco de bytes entregue ao
+StreamingHttpResponse antes do próximo ser lido, então a memória não depende do tamanho do
+histórico. Uma consulta por local (location_id = ?) percorre o índice reservation_loc_date_status
+já na ordem de data, com from/to como faixa nesse índice; uma consulta única com o filtro pelo
+owner faria o SQLite ordenar o histórico inteiro antes de devolver a primeira linha.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+
+from .availability import AvailabilityQueryError, parse_date
+from .models import Location, Reservation
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependência opcional
+    orjson = None
+
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+# (coluna exportada, lookup do values_list)
+COLUMNS = (
+    ('reservation_id', 'id'),
+    ('date', 'date'),
+    ('start_time', 'start_time'),
+    ('end_time', 'end_time'),
+    ('status', 'status'),
+    ('created_at', 'created_at'),
+    ('cancelled_at', 'cancelled_at'),
+    ('location_id', 'location_id'),
+    ('location_name', 'location__name'),
+    ('customer', 'user__username'),
+    ('payment_id', 'payment__id'),
+    ('payment_method', 'payment__method'),
+    ('payment_status', 'payment__status'),
+    ('payment_valor', 'payment__valor'),
+    ('payment_criado_em', 'payment__criado_em'),
+    ('payment_reembolsado_em', 'payment__reembolsado_em'),
+)
+NAMES = tuple(name for name, _ in COLUMNS)
+
+
+def parse_export_filters(params):
+    """(from, to, location_id) opcionais da query string"""
+    start = parse_date(params['from'], 'from') if params.get('from') else None
+    end = parse_date(params['to'], 'to') if params.get('to') else None
+    if start and end and end < start:
+        raise AvailabilityQueryError("'to' deve ser igual ou posterior a 'from'.")
+    location_id = params.get('location')
+    if location_id is not None and not location_id.isdigit():
+        raise AvailabilityQueryError("location deve ser o id de um local.")
+    return start, end, int(location_id) if location_id else None
+
+
+def export_querysets(owner, start=None, end=None, location_id=None):
+    """Um values_list por local do owner, na ordem (local, data, início, id)"""
+    locations = Location.objects.filter(owner=owner).order_by('id')
+    if location_id is not None:
+        locations = locations.filter(id=location_id)
+    filters = {}
+    if start is not None:
+        filters['date__gte'] = start
+    if end is not None:
+        filters['date__lte'] = end
+    for location in locations.values_list('id', flat=True):
+        yield (
+            Reservation.objects.filter(location_id=location, **filters)
+            .order_by('date', 'start_time', 'id')
+            .values_list(*(lookup for _, lookup in COLUMNS))
+        )
+
+
+def plain(value):
+    """Valor em tipos JSON/CSV simples (o mesmo texto nos dois formatos)"""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def encode_csv(rows, header=False):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(NAMES)
+    writer.writerows([plain(value) for value in row] for row in rows)
+    return buffer.getvalue().encode()
+
+
+def encode_ndjson(rows, header=False):
+    if orjson is not None:
+        return b''.join(orjson.dumps(dict(zip(NAMES, map(plain, row)))) + b'\n' for row in rows)
+    return ''.join(
+        json.dumps(dict(zip(NAMES, map(plain, row))), ensure_ascii=False, separators=(',', ':')) + '\n'
+        for row in rows
+    ).encode()
+
+
+ENCODERS = {'csv': encode_csv, 'ndjson': encode_ndjson}
+
+
+def stream_export(querysets, export_format, chunk_size):
+    """Blocos de bytes do arquivo, um por lote de `chunk_size` linhas lidas do banco"""
+    encode = ENCODERS[export_format]
+    # Cabeçalho sai mesmo sem nenhuma linha (CSV vazio ainda tem as colunas)
+    header = encode([], header=True)
+    if header:
+        yield header
+    batch = []
+    for queryset in querysets:
+        for row in queryset.iterator(chunk_size=chunk_size):
+            batch.append(row)
+            if len(batch) >= chunk_size:
+                yield encode(batch)
+                batch = []
+    if batch:
+        yield encode(batch)
+
+
+async def astream(chunks):
+    """Mesmo stream sob ASGI: cada bloco é lido na thread do ORM (sem isso o Django junta tudo na memória)"""
+    next_chunk = sync_to_async(next)
+    while True:
+        chunk = await next_chunk(chunks, None)
+        if chunk is None:
+            return
+        yield chunk
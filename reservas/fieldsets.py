@@ -0,0 +1,44 @@
+"""Fieldsets esparsos nas leituras: ?fields=id,date,status ou ?omit=location_images.
+
+O conjunto pedido vai no contexto do serializer (`fieldset`); SparseFieldsMixin remove os demais
+campos antes de montar a resposta, então SerializerMethodField fora do fieldset nem roda. As views
+usam wants() para só fazer os select_related/prefetch_related dos campos que vão sair.
+"""
+
+
+class FieldsetError(ValueError):
+    pass
+
+
+def parse_fieldset(params, available):
+    """Campos pedidos, na ordem do serializer, ou None quando a requisição não restringe"""
+    fields, omit = params.get('fields'), params.get('omit')
+    if not fields and not omit:
+        return None
+    if fields and omit:
+        raise FieldsetError("Use ?fields= ou ?omit=, não os dois.")
+    requested = {name.strip() for name in (fields or omit).split(',') if name.strip()}
+    unknown = requested - set(available)
+    if unknown:
+        raise FieldsetError(f"Campos desconhecidos: {', '.join(sorted(unknown))}.")
+    if fields:
+        return tuple(name for name in available if name in requested)
+    return tuple(name for name in available if name not in requested)
+
+
+def wants(fieldset, *names):
+    """Algum dos campos sai na resposta? (sem fieldset, todos saem)"""
+    return fieldset is None or any(name in fieldset for name in names)
+
+
+class SparseFieldsMixin:
+    """ModelSerializer que respeita context['fieldset'] (só leitura: criação e edição usam todos os campos)"""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        fieldset = self.context.get('fieldset')
+        if fieldset is not None:
+            for name in list(fields):
+                if name not in fieldset:
+                    del fields[name]
+        return fields
@@ -0,0 +1,144 @@
+"""Proximidade sem PostGIS: geohash indexado em Location + distância exata só nos candidatos.
+
+A busca cobre o retângulo envolvente do círculo com poucas células da maior precisão possível,
+junta as consecutivas e busca as faixas de prefixo no índice
+(`geohash >= 'abc' AND geohash < 'abc{'`, uma por SELECT do UNION ALL). A distância haversine só é
+calculada para essas linhas.
+"""
+from math import asin, cos, floor, pi, radians, sin, sqrt
+
+from django.db.models import FloatField
+from django.db.models.functions import Cast
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+# Caractere logo após 'z': fecha a faixa de prefixo sem depender de LIKE (que no SQLite não usa índice)
+PREFIX_END = '{'
+GEOHASH_PRECISION = 9
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = pi * EARTH_RADIUS_KM / 180
+
+DEFAULT_RADIUS_KM = 5
+MAX_RADIUS_KM = 100
+# Células por busca: mais células = precisão maior = menos candidatos fora do raio
+MAX_CELLS = 16
+
+
+class GeoQueryError(ValueError):
+    pass
+
+
+def encode(latitude, longitude, precision=GEOHASH_PRECISION):
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        interval, coordinate = (lng_range, longitude) if even else (lat_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """(altura, largura) da célula em graus"""
+    lng_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """(sul, norte, oeste, leste) em graus do retângulo que envolve o círculo; oeste/leste podem passar de ±180"""
+    lat_radius = radius_km / KM_PER_DEGREE
+    south, north = max(latitude - lat_radius, -90.0), min(latitude + lat_radius, 90.0 - 1e-9)
+    # A largeura em longitude é medida na borda mais próxima do polo, onde o grau é mais curto
+    widest = max(abs(south), abs(north))
+    lng_radius = min(radius_km / (KM_PER_DEGREE * max(cos(radians(widest)), 0.01)), 180.0)
+    return south, north, longitude - lng_radius, longitude + lng_radius
+
+
+def covering_cells(latitude, longitude, radius_km, max_cells=MAX_CELLS):
+    """Células da maior precisão que cobrem o retângulo envolvente do círculo com até `max_cells` células"""
+    south, north, west, east = bounding_box(latitude, longitude, radius_km)
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        lat_deg, lng_deg = cell_size(precision)
+        rows = range(floor((south + 90) / lat_deg), floor((north + 90) / lat_deg) + 1)
+        columns = range(floor((west + 180) / lng_deg), floor((east + 180) / lng_deg) + 1)
+        if len(rows) * len(columns) <= max_cells or precision == 1:
+            break
+    # Centro de cada célula da grade; a longitude dá a volta no antimeridiano
+    return sorted({
+        encode(-90 + (row + 0.5) * lat_deg, (column + 0.5) * lng_deg % 360.0 - 180.0, precision)
+        for row in rows for column in columns
+    })
+
+
+def cell_ranges(cells):
+    """Células ordenadas -> faixas [início, fim) de geohash, juntando as consecutivas (ex.: 6gyf3..6gyf7)"""
+    ranges = []
+    for cell in sorted(cells):
+        if ranges:
+            start, last = ranges[-1]
+            if last[:-1] == cell[:-1] and BASE32.index(cell[-1]) == BASE32.index(last[-1]) + 1:
+                ranges[-1] = (start, cell)
+                continue
+        ranges.append((cell, cell))
+    return [(start, last + PREFIX_END) for start, last in ranges]
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = map(radians, (lat1, lng1, lat2, lng2))
+    a = sin((lat2 - lat1) / 2) ** 2 + cos(lat1) * cos(lat2) * sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * asin(sqrt(a))
+
+
+def parse_near(params):
+    """(latitude, longitude, raio em km) de ?near=lat,lng&radius= ou None sem ?near"""
+    near = params.get('near')
+    if not near:
+        return None
+    try:
+        latitude, longitude = (float(part) for part in near.split(','))
+    except ValueError:
+        raise GeoQueryError("Use near=latitude,longitude.")
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise GeoQueryError("Coordenadas fora do intervalo válido.")
+    try:
+        radius = float(params.get('radius', DEFAULT_RADIUS_KM))
+    except ValueError:
+        raise GeoQueryError("Raio inválido: informe em km.")
+    if not 0 < radius <= MAX_RADIUS_KM:
+        raise GeoQueryError(f"O raio deve estar entre 0 e {MAX_RADIUS_KM} km.")
+    return latitude, longitude, radius
+
+
+def nearby(queryset, latitude, longitude, radius_km):
+    """[(distância em km, id)] dos locais do queryset dentro do raio, do mais próximo ao mais distante"""
+    south, north, west, east = bounding_box(latitude, longitude, radius_km)
+    # O retângulo descarta no banco, sobre as linhas que o índice já trouxe, os cantos das células;
+    # o cast para REAL evita montar um Decimal por coordenada
+    queryset = queryset.order_by().filter(latitude__range=(south, north))
+    if -180 <= west and east <= 180:
+        queryset = queryset.filter(longitude__range=(west, east))
+    queryset = queryset.values_list('id', Cast('latitude', FloatField()), Cast('longitude', FloatField()))
+    # Uma busca por faixa no índice para cada faixa, em UNION ALL: um OR das faixas no mesmo WHERE
+    # faz o SQLite desistir do índice e varrer a tabela
+    selects = [queryset.filter(geohash__gte=start, geohash__lt=end) for start, end in cell_ranges(
+        covering_cells(latitude, longitude, radius_km)
+    )]
+    candidates = selects[0].union(*selects[1:], all=True) if len(selects) > 1 else selects[0]
+    result = []
+    for location_id, lat, lng in candidates:
+        distance = haversine_km(latitude, longitude, lat, lng)
+        if distance <= radius_km:
+            result.append((distance, location_id))
+    result.sort()
+    return result
@@ -0,0 +1,154 @@
+"""Variantes redimensionadas de LocationImage (thumb, card, full), geradas fora da thread da requisição.
+
+O upload grava só o original; depois do commit a geração vai para um pool de threads local
+(RESERVAS_IMAGE_WORKERS; 0 = gera na própria thread, usado nos testes). As variantes ficam no mesmo
+storage do original e os caminhos em LocationImage.variants.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from PIL import Image, ImageOps
+
+from .cache import invalidate
+from .models import LocationImage
+
+logger = logging.getLogger(__name__)
+
+# Nome -> caixa máxima (largura, altura); a proporção é mantida e nunca se amplia o original
+VARIANTS = {
+    'full': (1600, 1600),
+    'card': (640, 480),
+    'thumb': (160, 160),
+}
+JPEG_QUALITY = 82
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def image_workers():
+    return getattr(settings, 'RESERVAS_IMAGE_WORKERS', 2)
+
+
+def variant_name(image, variant):
+    return f'location_images/variants/{image.pk}/{variant}.jpg'
+
+
+def render_variants(image):
+    """Gera e grava as variantes de uma LocationImage; retorna {variante: caminho no storage}"""
+    storage = image.image.storage
+    with image.image.open('rb') as source, Image.open(source) as original:
+        # JPEG: decodifica já reduzido quando o original é muito maior que a maior variante
+        original.draft('RGB', max(VARIANTS.values()))
+        current = ImageOps.exif_transpose(original).convert('RGB')
+
+    variants = {}
+    # Da maior para a menor: cada variante é reduzida a partir da anterior
+    for variant, box in VARIANTS.items():
+        current.thumbnail(box, Image.Resampling.LANCZOS)
+        buffer = BytesIO()
+        current.save(buffer, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+        name = variant_name(image, variant)
+        if storage.exists(name):
+            storage.delete(name)
+        variants[variant] = storage.save(name, ContentFile(buffer.getvalue()))
+    return variants
+
+
+def generate_variants(image_id):
+    image = LocationImage.objects.filter(pk=image_id).first()
+    if image is None or not image.image:
+        return None
+    variants = render_variants(image)
+    # update() não dispara post_save (que agendaria de novo); invalida o cache do local aqui
+    LocationImage.objects.filter(pk=image_id).update(variants=variants)
+    invalidate(image.location_id, data=True, listing=True)
+    return variants
+
+
+def try_generate_variants(image_id):
+    """Como generate_variants, mas registra a falha e devolve None: uma imagem corrompida não derruba o lote"""
+    try:
+        return generate_variants(image_id)
+    except Exception:
+        logger.exception("Falha ao gerar variantes da imagem %s", image_id)
+        return None
+
+
+def generate_in_worker(image_id):
+    """Executa try_generate_variants numa thread do pool, fechando a conexão própria da thread no fim"""
+    try:
+        return try_generate_variants(image_id)
+    finally:
+        connection.close()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=image_workers(), thread_name_prefix='location-images')
+        return _executor
+
+
+def schedule_variants(image_id):
+    """Agenda a geração para depois do commit do upload (o worker precisa enxergar a linha)"""
+    if image_workers() <= 0:
+        transaction.on_commit(lambda: generate_variants(image_id))
+    else:
+        transaction.on_commit(lambda: get_executor().submit(generate_in_worker, image_id))
+
+
+def save_location_images(location, files):
+    """Grava vários uploads de um local: arquivos no storage e linhas num único bulk_create.
+
+    Uploads grandes já chegam em arquivos temporários (FILE_UPLOAD_MAX_MEMORY_SIZE); o storage os
+    move ou copia em chunks, então a memória não cresce com o tamanho do lote.
+    """
+    images = [LocationImage(location=location) for _ in files]
+    saved = []
+    try:
+        with transaction.atomic():
+            for image, upload in zip(images, files):
+                image.image.save(upload.name, upload, save=False)
+                saved.append(image.image.name)
+            LocationImage.objects.bulk_create(images)
+    except Exception:
+        # Sem linhas gravadas, os arquivos ficariam órfãos no storage
+        storage = LocationImage._meta.get_field('image').storage
+        for name in saved:
+            storage.delete(name)
+        raise
+    finally:
+        # Os temporários já foram movidos para o storage; fecha agora em vez de esperar o GC
+        for upload in files:
+            upload.close()
+
+    # bulk_create não dispara post_save: agenda variantes e invalida o cache aqui
+    for image in images:
+        schedule_variants(image.pk)
+    invalidate(location.pk, data=True, listing=True)
+    return images
+
+
+def variant_urls(image, request=None):
+    """{'original': url, 'thumb': url, ...}; variantes ainda não geradas apontam para o original"""
+    return stored_variant_urls(image.image.storage, image.image.url, image.variants, request)
+
+
+def stored_variant_urls(storage, original, variants, request=None):
+    """variant_urls() a partir das colunas (url do original + JSON de variantes), sem instância"""
+    def absolute(url):
+        return request.build_absolute_uri(url) if request is not None else url
+
+    original = absolute(original)
+    urls = {'original': original}
+    for variant in VARIANTS:
+        name = (variants or {}).get(variant)
+        urls[variant] = absolute(storage.url(name)) if name else original
+    return urls
@@ -0,0 +1,387 @@
+"""Importação em lote de locais e do histórico de reservas/pagamentos (comando bulk_import).
+
+A entrada (CSV com cabeçalho ou NDJSON) é lida em streaming e processada em lotes de
+`batch_size` linhas; cada lote é validado e gravado com bulk_create numa transação própria.
+Linhas rejeitadas vão para um arquivo NDJSON à parte ({"line", "errors", "row"}), e o restante
+do lote segue.
+
+Locais passam pelo LocationSerializer (as mesmas regras da API), com owner pelo username (do grupo
+owners) e is_active opcional. Com `external_id` na entrada, o importador grava um mapa
+external_id,id para a importação das reservas referenciar os locais recém-criados.
+
+Reservas seguem as regras de horário do ReservationCreateSerializer (schedule_error: início antes
+do fim, dentro do funcionamento, duração máxima) e a mesma regra de conflito (DayAgenda), checada
+em memória: a ocupação dos dias do lote vem de LocationOccupancy numa consulta e cada reserva
+aceita entra na agenda do dia, então conflitos com o banco e dentro do próprio arquivo são
+pegos sem consulta por linha. A regra "não no passado" da API não se aplica (é histórico).
+Como bulk_create não dispara signals, cada lote atualiza também LocationOccupancy, LocationStats
+e o cache de disponibilidade dos locais afetados.
+"""
+import csv
+import json
+import time as clock
+from collections import Counter, defaultdict
+from datetime import date, datetime, time
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from . import geo
+from .availability import DayAgenda, to_minutes
+from .cache import invalidate
+from .dashboard import apply_deltas
+from .models import Location, LocationOccupancy, LocationStats, Payment, Reservation
+from .occupancy import occupancy_values
+from .serializers import LocationSerializer, reservation_price, schedule_error
+
+FORMATS = ('csv', 'ndjson')
+TRUE_VALUES = ('1', 'true', 't', 'sim', 's', 'yes', 'y')
+FALSE_VALUES = ('0', 'false', 'f', 'não', 'nao', 'n', 'no')
+# TextChoices.values monta a lista a cada acesso: fora do laço por linha
+STATUSES = frozenset(Reservation.Status.values)
+PAYMENT_METHODS = frozenset(Payment.PaymentMethod.values)
+PAYMENT_STATUSES = frozenset(Payment.PaymentStatus.values)
+
+
+class RowError(ValueError):
+    pass
+
+
+def detect_format(path, fmt=None):
+    fmt = fmt or Path(path).suffix.lstrip('.').lower()
+    if fmt == 'jsonl':
+        fmt = 'ndjson'
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato desconhecido para {path}: use --format csv ou ndjson.")
+    return fmt
+
+
+def read_rows(handle, fmt):
+    """(número da linha, dict ou None, erro) de cada registro, sem carregar o arquivo"""
+    if fmt == 'csv':
+        reader = csv.DictReader(handle)
+        for row in reader:
+            yield reader.line_num, row, None
+        return
+    for number, line in enumerate(handle, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield number, {'raw': line.rstrip('\n')}, f"JSON inválido: {exc}"
+            continue
+        if not isinstance(row, dict):
+            yield number, {'raw': row}, "Cada linha deve ser um objeto JSON."
+            continue
+        yield number, row, None
+
+
+def batched(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def text(row, name, required=True):
+    value = row.get(name)
+    if value is None or (isinstance(value, str) and not value.strip()):
+        if required:
+            raise RowError(f"Campo obrigatório ausente: {name}.")
+        return None
+    return value.strip() if isinstance(value, str) else value
+
+
+def parse_value(row, name, convert, label, required=True):
+    value = text(row, name, required)
+    if value is None:
+        return None
+    try:
+        return convert(value)
+    except (TypeError, ValueError, InvalidOperation):
+        raise RowError(f"{name} inválido: {value!r} ({label}).")
+
+
+def parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    value = str(value).lower()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise ValueError(value)
+
+
+def parse_datetime(value):
+    value = datetime.fromisoformat(str(value))
+    return value if timezone.is_aware(value) else timezone.make_aware(value)
+
+
+class Rejects:
+    """Arquivo NDJSON das linhas rejeitadas, criado só na primeira rejeição"""
+
+    def __init__(self, path):
+        self.path, self.handle, self.count = path, None, 0
+
+    def add(self, number, row, errors):
+        if self.handle is None:
+            self.handle = open(self.path, 'w', encoding='utf-8')
+        self.handle.write(json.dumps({'line': number, 'errors': errors, 'row': row}, ensure_ascii=False, default=str) + '\n')
+        self.count += 1
+
+    def close(self):
+        if self.handle is not None:
+            self.handle.close()
+
+
+class Importer:
+    """Lê, valida e grava em lotes; subclasses implementam import_batch(lote) -> linhas gravadas"""
+
+    def __init__(self, rejects, batch_size=5000, progress=None):
+        self.rejects = rejects
+        self.batch_size = batch_size
+        self.progress = progress or (lambda imported, rejected, elapsed: None)
+        self.imported = 0
+
+    def run(self, rows):
+        started = clock.perf_counter()
+        for batch in batched(rows, self.batch_size):
+            valid = []
+            for number, row, error in batch:
+                if error:
+                    self.rejects.add(number, row, [error])
+                else:
+                    valid.append((number, row))
+            if valid:
+                self.imported += self.import_batch(valid)
+            self.progress(self.imported, self.rejects.count, clock.perf_counter() - started)
+        self.finish()
+        return {'importadas': self.imported, 'rejeitadas': self.rejects.count,
+                'segundos': clock.perf_counter() - started}
+
+    def reject(self, number, row, errors):
+        self.rejects.add(number, row, errors if isinstance(errors, list) else [errors])
+
+    def finish(self):
+        pass
+
+
+def flatten_errors(errors):
+    """Erros do DRF ({campo: [msgs]}) como lista de textos"""
+    messages = []
+    for field, details in errors.items():
+        for detail in details if isinstance(details, list) else [details]:
+            messages.append(str(detail) if field == 'non_field_errors' else f"{field}: {detail}")
+    return messages
+
+
+class LocationImporter(Importer):
+    """Locais com as regras do LocationSerializer; owner pelo username"""
+
+    def __init__(self, rejects, batch_size=5000, progress=None, id_map=None):
+        super().__init__(rejects, batch_size, progress)
+        # Arquivo aberto para o mapa external_id,id (ou None)
+        self.id_map = csv.writer(id_map) if id_map is not None else None
+        if self.id_map is not None:
+            self.id_map.writerow(('external_id', 'id'))
+        self.owners = {}
+
+    def resolve_owners(self, batch):
+        missing = {str(row.get('owner', '')).strip() for _, row in batch} - set(self.owners) - {''}
+        if missing:
+            found = dict(User.objects.filter(username__in=missing, groups__name='owners').values_list('username', 'id'))
+            self.owners.update({username: found.get(username) for username in missing})
+
+    def import_batch(self, batch):
+        self.resolve_owners(batch)
+        accepted = []
+        for number, row in batch:
+            owner_id = self.owners.get(str(row.get('owner', '')).strip())
+            serializer = LocationSerializer(data=row)
+            errors = [] if owner_id else ["owner: usuário inexistente ou fora do grupo owners."]
+            if not serializer.is_valid():
+                errors += flatten_errors(serializer.errors)
+            try:
+                is_active = parse_value(row, 'is_active', parse_bool, 'true/false', required=False)
+            except RowError as exc:
+                errors.append(str(exc))
+            if errors:
+                self.reject(number, row, errors)
+                continue
+            location = Location(owner_id=owner_id, is_active=is_active is not False, **serializer.validated_data)
+            if location.has_coordinates():
+                location.geohash = geo.encode(float(location.latitude), float(location.longitude))
+            accepted.append((row.get('external_id'), location))
+
+        with transaction.atomic():
+            created = Location.objects.bulk_create([location for _, location in accepted])
+            LocationStats.objects.bulk_create([
+                LocationStats(location_id=location.id, owner_id=location.owner_id) for location in created
+            ])
+        if self.id_map is not None:
+            self.id_map.writerows(
+                (external_id, location.id) for (external_id, _), location in zip(accepted, created)
+                if external_id not in (None, '')
+            )
+        return len(created)
+
+    def finish(self):
+        invalidate(None, listing=True)
+
+
+class ReservationImporter(Importer):
+    """Reservas (e pagamentos) históricos com as regras de horário e de conflito da API, checadas em memória"""
+
+    def __init__(self, rejects, batch_size=5000, progress=None, location_map=None):
+        super().__init__(rejects, batch_size, progress)
+        # external_id -> id de Location (saída do LocationImporter)
+        self.location_map = location_map
+        self.locations, self.users = {}, {}
+
+    def location_id(self, value):
+        if self.location_map is not None:
+            if str(value) not in self.location_map:
+                raise ValueError(value)
+            return self.location_map[str(value)]
+        return int(value)
+
+    def parse(self, row):
+        status = text(row, 'status', required=False) or Reservation.Status.CONFIRMADA
+        if status not in STATUSES:
+            raise RowError(f"status inválido: {status!r} (use {', '.join(sorted(STATUSES))}).")
+        method = text(row, 'payment_method', required=False)
+        if method is not None and method not in PAYMENT_METHODS:
+            raise RowError(f"payment_method inválido: {method!r}.")
+        payment_status = text(row, 'payment_status', required=False) or Payment.PaymentStatus.PENDENTE
+        if payment_status not in PAYMENT_STATUSES:
+            raise RowError(f"payment_status inválido: {payment_status!r}.")
+        return {
+            'location_id': parse_value(row, 'location', self.location_id, 'id do local'),
+            'username': str(text(row, 'user')),
+            'date': parse_value(row, 'date', date.fromisoformat, 'AAAA-MM-DD'),
+            'start_time': parse_value(row, 'start_time', time.fromisoformat, 'HH:MM'),
+            'end_time': parse_value(row, 'end_time', time.fromisoformat, 'HH:MM'),
+            'status': status,
+            'cancelled_at': parse_value(row, 'cancelled_at', parse_datetime, 'data e hora ISO 8601', required=False),
+            'payment_method': method,
+            'payment_status': payment_status,
+            'valor': parse_value(row, 'valor', Decimal, 'decimal', required=False),
+            'reembolsado_em': parse_value(row, 'reembolsado_em', parse_datetime, 'data e hora ISO 8601', required=False),
+        }
+
+    def resolve(self, parsed):
+        missing = {values['location_id'] for _, _, values in parsed} - set(self.locations)
+        if missing:
+            found = Location.objects.only(
+                'id', 'price_per_hour', 'operating_hours_start', 'operating_hours_end', 'max_duration'
+            ).in_bulk(missing)
+            self.locations.update({location_id: found.get(location_id) for location_id in missing})
+        missing = {values['username'] for _, _, values in parsed} - set(self.users)
+        if missing:
+            found = dict(User.objects.filter(username__in=missing).values_list('username', 'id'))
+            self.users.update({username: found.get(username) for username in missing})
+
+    def day_state(self, parsed):
+        """Ocupação gravada dos (local, dia) do lote: {(local, dia): [DayAgenda, ativas, confirmadas]}"""
+        keys = {(values['location_id'], values['date']) for _, _, values in parsed}
+        rows = LocationOccupancy.objects.filter(
+            location_id__in={location_id for location_id, _ in keys}, date__in={day for _, day in keys},
+        ).values_list('location_id', 'date', 'busy_intervals', 'reservation_count', 'confirmed_count')
+        state = {
+            (location_id, day): [DayAgenda(busy), count, confirmed]
+            for location_id, day, busy, count, confirmed in rows if (location_id, day) in keys
+        }
+        for key in keys:
+            state.setdefault(key, [DayAgenda(), 0, 0])
+        return state
+
+    def import_batch(self, batch):
+        parsed = []
+        for number, row in batch:
+            try:
+                parsed.append((number, row, self.parse(row)))
+            except RowError as exc:
+                self.reject(number, row, str(exc))
+        if not parsed:
+            return 0
+
+        with transaction.atomic():
+            self.resolve(parsed)
+            state = self.day_state(parsed)
+            touched, accepted, deltas = set(), [], defaultdict(Counter)
+            for number, row, values in parsed:
+                location = self.locations.get(values['location_id'])
+                user_id = self.users.get(values['username'])
+                if location is None or user_id is None:
+                    self.reject(number, row, "Local inexistente." if location is None else "Usuário inexistente.")
+                    continue
+                error = schedule_error(location, values['date'], values['start_time'], values['end_time'])
+                key = (location.id, values['date'])
+                if error is None and values['status'] != Reservation.Status.CANCELADA:
+                    # Canceladas não ocupam a agenda; as demais entram nela já para as próximas linhas
+                    agenda, count, confirmed = state[key]
+                    if agenda.conflicts_with(values['start_time'], values['end_time']):
+                        error = "Conflito com outra reserva existente neste horário."
+                    else:
+                        interval = [to_minutes(values['start_time']), to_minutes(values['end_time'])]
+                        state[key] = [
+                            DayAgenda([*agenda.intervals, interval]), count + 1,
+                            confirmed + (values['status'] == Reservation.Status.CONFIRMADA),
+                        ]
+                        touched.add(key)
+                if error:
+                    self.reject(number, row, error)
+                    continue
+                accepted.append((location, user_id, values))
+                deltas[location.id][values['status']] += 1
+
+            self.write(accepted, state, touched, deltas)
+
+        for location_id in deltas:
+            invalidate(location_id, availability=True)
+        return len(accepted)
+
+    def write(self, accepted, state, touched, deltas):
+        reservations = Reservation.objects.bulk_create([
+            Reservation(
+                user_id=user_id, location_id=location.id, date=values['date'], start_time=values['start_time'],
+                end_time=values['end_time'], status=values['status'], cancelled_at=values['cancelled_at'],
+            )
+            for location, user_id, values in accepted
+        ])
+        Payment.objects.bulk_create([
+            Payment(
+                reservation_id=reservation.id, method=values['payment_method'], status=values['payment_status'],
+                valor=values['valor'] if values['valor'] is not None else reservation_price(
+                    location, values['start_time'], values['end_time'],
+                ),
+                reembolsado_em=values['reembolsado_em'],
+            )
+            for reservation, (location, _, values) in zip(reservations, accepted)
+            if values['payment_method'] is not None
+        ])
+        LocationOccupancy.objects.bulk_create(
+            [
+                LocationOccupancy(location_id=location_id, date=day, **occupancy_values(*state[(location_id, day)]))
+                for location_id, day in touched
+            ],
+            update_conflicts=True,
+            unique_fields=['location', 'date'],
+            update_fields=['busy_intervals', 'occupied_hours', 'reservation_count', 'confirmed_count', 'updated_at'],
+        )
+        for location_id, counts in deltas.items():
+            apply_deltas(location_id, counts)
+
+
+def load_location_map(handle):
+    """Mapa external_id -> id gravado pela importação de locais"""
+    return {row['external_id']: int(row['id']) for row in csv.DictReader(handle)}
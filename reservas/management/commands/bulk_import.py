@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from reservas.importer import (
+    LocationImporter, Rejects, ReservationImporter, detect_format, load_location_map, read_rows,
+)
+
+
+class Command(BaseCommand):
+    help = "Importa em lote (CSV ou NDJSON) locais ou o histórico de reservas e pagamentos, com as regras da API"
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=['locations', 'reservations'])
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['csv', 'ndjson'], help="Padrão: pela extensão do arquivo")
+        parser.add_argument('--batch-size', type=int, default=5000, help="Linhas por lote (uma transação cada)")
+        parser.add_argument('--rejects', help="Arquivo NDJSON das linhas rejeitadas (padrão: <path>.rejects.ndjson)")
+        parser.add_argument('--map-output', help="locations: grava o mapa external_id,id dos locais criados")
+        parser.add_argument('--location-map', help="reservations: lê a coluna location como external_id desse mapa")
+
+    def handle(self, *args, **options):
+        def progress(imported, rejected, elapsed):
+            rows = imported + rejected
+            self.stdout.write(
+                f"{options['kind']}: {imported} importadas, {rejected} rejeitadas em {elapsed:.1f}s "
+                f"({rows / max(elapsed, 1e-9):,.0f} linhas/s)"
+            )
+
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size deve ser positivo.")
+        try:
+            fmt = detect_format(options['path'], options['format'])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        rejects = Rejects(options['rejects'] or f"{options['path']}.rejects.ndjson")
+        id_map = None
+        try:
+            if options['kind'] == 'locations':
+                if options['map_output']:
+                    id_map = open(options['map_output'], 'w', newline='', encoding='utf-8')
+                importer = LocationImporter(rejects, options['batch_size'], progress, id_map=id_map)
+            else:
+                location_map = None
+                if options['location_map']:
+                    with open(options['location_map'], newline='', encoding='utf-8') as handle:
+                        location_map = load_location_map(handle)
+                importer = ReservationImporter(rejects, options['batch_size'], progress, location_map=location_map)
+            with open(options['path'], newline='', encoding='utf-8') as handle:
+                result = importer.run(read_rows(handle, fmt))
+        except OSError as exc:
+            raise CommandError(str(exc))
+        finally:
+            rejects.close()
+            if id_map is not None:
+                id_map.close()
+
+        total = result['importadas'] + result['rejeitadas']
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['importadas']} importadas, {result['rejeitadas']} rejeitadas em {result['segundos']:.1f}s "
+            f"({total / max(result['segundos'], 1e-9):,.0f} linhas/s)."
+        ))
+        if result['rejeitadas']:
+            self.stdout.write(f"Linhas rejeitadas em {rejects.path}.")
@@ -0,0 +1,39 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from reservas.images import VARIANTS, generate_in_worker, image_workers, try_generate_variants
+from reservas.models import LocationImage
+
+
+class Command(BaseCommand):
+    help = "Gera (backfill) as variantes thumb/card/full das imagens de locais em paralelo"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Regera também as imagens que já têm variantes")
+        parser.add_argument('--location', type=int, help="Restringe a um único local")
+        parser.add_argument('--workers', type=int, default=None, help="Threads em paralelo (padrão: RESERVAS_IMAGE_WORKERS)")
+
+    def handle(self, *args, **options):
+        images = LocationImage.objects.exclude(image='')
+        if options['location'] is not None:
+            images = images.filter(location_id=options['location'])
+        ids = [
+            pk for pk, variants in images.order_by('id').values_list('id', 'variants')
+            if options['force'] or set(VARIANTS) - set(variants or {})
+        ]
+        workers = options['workers'] if options['workers'] is not None else image_workers()
+
+        if workers <= 1:
+            # Na thread principal: sem generate_in_worker, que fecharia a conexão de quem chamou
+            results = [try_generate_variants(pk) for pk in ids]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(generate_in_worker, ids))
+
+        failed = [pk for pk, result in zip(ids, results) if result is None]
+        for pk in failed[:50]:
+            self.stderr.write(f"imagem {pk}: variantes não geradas")
+        self.stdout.write(self.style.SUCCESS(
+            f"Variantes geradas para {len(ids) - len(failed)} imagem(ns); {len(failed)} falha(s)."
+        ))
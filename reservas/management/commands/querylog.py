@@ -0,0 +1,37 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from reservas.querylog import top
+
+
+class Command(BaseCommand):
+    help = "Mostra as consultas SQL mais caras do log amostrado (reservas.querylog), por tempo total e por p99"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=20, help="Linhas por tabela")
+        parser.add_argument('--by', choices=('total', 'p99'), help="Só uma das tabelas")
+        parser.add_argument('--json', action='store_true', help="Saída em JSON")
+
+    def handle(self, *args, **options):
+        data = top(options['limit'])
+        if options['json']:
+            self.stdout.write(json.dumps(data, indent=2, ensure_ascii=False))
+            return
+
+        self.stdout.write(
+            f"{data['fingerprints']} fingerprint(s) de {len(data['processes'])} processo(s), "
+            f"amostragem {data['sample_rate']:.0%}"
+        )
+        tables = (('total', "Por tempo total"), ('p99', "Por p99"))
+        for by, title in tables:
+            if options['by'] not in (None, by):
+                continue
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n{title}"))
+            self.stdout.write(f"{'fingerprint':16} {'view':40} {'n':>7} {'total':>11} {'média':>9} {'p99':>9} {'máx':>9}")
+            for row in data[f'by_{by}']:
+                self.stdout.write(
+                    f"{row['fingerprint']:16} {row['view'][:40]:40} {row['count']:7d} {row['total_ms']:9.1f}ms "
+                    f"{row['mean_ms']:7.2f}ms {row['p99_ms']:7.2f}ms {row['max_ms']:7.2f}ms"
+                )
+                self.stdout.write(f"    {row['sql'][:200]}")
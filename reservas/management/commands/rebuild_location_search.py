@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from reservas.search import install_search_index
+
+
+class Command(BaseCommand):
+    help = "Recria (se faltarem) a tabela FTS5 e os triggers da busca de locais e reindexa todos os locais"
+
+    def handle(self, *args, **options):
+        if not install_search_index():
+            raise CommandError("A busca textual indexada só existe no SQLite.")
+        self.stdout.write(self.style.SUCCESS("Índice de busca de locais reconstruído."))
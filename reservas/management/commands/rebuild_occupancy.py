@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from reservas.models import LocationOccupancy
+from reservas.occupancy import expected_occupancy, stored_occupancy, diff_occupancy
+
+
+class Command(BaseCommand):
+    help = "Reconstrói (ou apenas confere, com --check) o índice de ocupação LocationOccupancy a partir das reservas"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help="Só compara o índice com as reservas, sem gravar")
+        parser.add_argument('--location', type=int, help="Restringe a um único local")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        location_id = options['location']
+        expected = expected_occupancy(location_id)
+        stored = stored_occupancy(location_id)
+        divergences = diff_occupancy(expected, stored)
+
+        for loc_id, day, wanted, found in divergences[:50]:
+            self.stdout.write(f"local {loc_id} em {day}: esperado {wanted}, gravado {found}")
+
+        if options['check']:
+            if divergences:
+                raise CommandError(f"{len(divergences)} divergência(s) entre o índice de ocupação e as reservas.")
+            self.stdout.write(self.style.SUCCESS(f"Índice de ocupação consistente ({len(stored)} dias)."))
+            return
+
+        rows = LocationOccupancy.objects.all()
+        if location_id is not None:
+            rows = rows.filter(location_id=location_id)
+        with transaction.atomic():
+            rows.delete()
+            LocationOccupancy.objects.bulk_create(
+                [
+                    LocationOccupancy(location_id=loc_id, date=day, **values)
+                    for (loc_id, day), values in expected.items()
+                ],
+                batch_size=options['batch_size'],
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Índice reconstruído: {len(expected)} dias, {len(divergences)} divergência(s) corrigida(s)."
+        ))
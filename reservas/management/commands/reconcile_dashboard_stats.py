@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from reservas.dashboard import expected_stats, stored_stats, diff_stats, repair_stats
+
+
+class Command(BaseCommand):
+    help = "Confere os contadores do dashboard (LocationStats) contra as reservas e corrige as divergências"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help="Só relata as divergências, sem corrigir")
+        parser.add_argument('--location', type=int, help="Restringe a um único local")
+
+    def handle(self, *args, **options):
+        location_id = options['location']
+        with transaction.atomic():
+            expected = expected_stats(location_id)
+            divergences = diff_stats(expected, stored_stats(location_id))
+
+            for loc_id, wanted, found in divergences[:50]:
+                self.stdout.write(f"local {loc_id}: esperado {wanted}, gravado {found}")
+
+            if options['check']:
+                if divergences:
+                    raise CommandError(f"{len(divergences)} local(is) com contadores divergentes.")
+                self.stdout.write(self.style.SUCCESS(f"Contadores consistentes ({len(expected)} locais)."))
+                return
+
+            repair_stats(expected, divergences)
+        self.stdout.write(self.style.SUCCESS(f"{len(divergences)} local(is) corrigido(s)."))
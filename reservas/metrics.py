@@ -0,0 +1,226 @@
+"""Métricas por requisição: cabeçalho Server-Timing e histogramas por rota no formato do Prometheus.
+
+O RequestMetricsMiddleware abre um RequestMetrics num contextvar (visível também nas threads do
+sync_to_async, então vale para os handlers assíncronos). As consultas SQL são medidas por um
+execute_wrapper instalado em cada conexão quando ela é aberta (connection_created); a serialização
+e a renderização, pelos phase() em reservas.serializers, reservas.projections e
+reservas.renderers. Fora de uma requisição tudo isso só custa uma leitura do contextvar.
+
+Os histogramas ficam na memória do processo (como os contadores de reservas.cache): com vários
+workers, cada um expõe os seus em /metrics e o Prometheus soma por instância.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.backends.signals import connection_created
+
+# Limites (em segundos) dos buckets dos histogramas de tempo
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+_current = ContextVar('reservas_request_metrics', default=None)
+_routes = {}
+_routes_lock = threading.Lock()
+
+
+class RequestMetrics:
+    __slots__ = ('started', 'queries', 'sql', 'serialize', 'render', 'statements', 'view', '_depth')
+
+    def __init__(self, sampled=False):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql = self.serialize = self.render = 0.0
+        # Requisição amostrada para o reservas.querylog: (sql, segundos) de cada consulta
+        self.statements = [] if sampled else None
+        self.view = None
+        self._depth = 0
+
+
+def start(sampled=False):
+    metrics = RequestMetrics(sampled)
+    return metrics, _current.set(metrics)
+
+
+def current():
+    return _current.get()
+
+
+def finish(token):
+    _current.reset(token)
+
+
+@contextmanager
+def phase(name):
+    """Soma o tempo do bloco na fase `name` da requisição atual; blocos aninhados contam uma vez só"""
+    metrics = _current.get()
+    if metrics is None or metrics._depth:
+        yield
+        return
+    metrics._depth += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics._depth -= 1
+        setattr(metrics, name, getattr(metrics, name) + time.perf_counter() - started)
+
+
+class TimedSerializerMixin:
+    """Conta o to_representation do serializer na fase 'serialize' (inclui consultas preguiçosas que ele dispare)"""
+
+    def to_representation(self, instance):
+        with phase('serialize'):
+            return super().to_representation(instance)
+
+
+def sql_timer(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - started
+        metrics.queries += 1
+        metrics.sql += duration
+        if metrics.statements is not None:
+            metrics.statements.append((sql, duration))
+
+
+def install_sql_timer(sender, connection, **kwargs):
+    # O mesmo DatabaseWrapper reconecta várias vezes: instala uma vez só
+    if sql_timer not in connection.execute_wrappers:
+        connection.execute_wrappers.append(sql_timer)
+
+
+connection_created.connect(install_sql_timer, dispatch_uid='reservas.metrics.sql_timer')
+
+
+def server_timing(metrics, total):
+    return ', '.join((
+        f'total;dur={total * 1000:.1f}',
+        f'db;dur={metrics.sql * 1000:.1f};desc="{metrics.queries} queries"',
+        f'serialize;dur={metrics.serialize * 1000:.1f}',
+        f'render;dur={metrics.render * 1000:.1f}',
+    ))
+
+
+def route_name(request):
+    """Nome da rota (baixa cardinalidade): o nome da URL, igual sob WSGI e ASGI"""
+    match = getattr(request, 'resolver_match', None)
+    if match is None or not match.view_name:
+        return 'unmatched'
+    return match.view_name.removeprefix('async-')
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def copy(self):
+        copy = Histogram(self.buckets)
+        copy.counts, copy.sum = list(self.counts), self.sum
+        return copy
+
+
+# Campo do RouteMetrics: (métrica, descrição)
+HISTOGRAMS = {
+    'duration': ('reservas_request_duration_seconds', 'Tempo total da requisição'),
+    'queries': ('reservas_request_sql_queries', 'Consultas SQL por requisição'),
+    'sql': ('reservas_request_sql_seconds', 'Tempo em SQL por requisição'),
+    'serialize': ('reservas_request_serialize_seconds', 'Tempo de serialização por requisição'),
+    'render': ('reservas_request_render_seconds', 'Tempo de renderização por requisição'),
+}
+
+
+class RouteMetrics:
+    __slots__ = ('responses', 'duration', 'queries', 'sql', 'serialize', 'render')
+
+    def __init__(self):
+        self.responses = {}
+        self.duration = Histogram(DURATION_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.sql = Histogram(DURATION_BUCKETS)
+        self.serialize = Histogram(DURATION_BUCKETS)
+        self.render = Histogram(DURATION_BUCKETS)
+
+    def copy(self):
+        copy = RouteMetrics.__new__(RouteMetrics)
+        copy.responses = dict(self.responses)
+        for field in HISTOGRAMS:
+            setattr(copy, field, getattr(self, field).copy())
+        return copy
+
+
+def observe(route, method, status, metrics, total):
+    with _routes_lock:
+        entry = _routes.get((route, method))
+        if entry is None:
+            entry = _routes[(route, method)] = RouteMetrics()
+        entry.responses[status] = entry.responses.get(status, 0) + 1
+        entry.duration.observe(total)
+        entry.queries.observe(metrics.queries)
+        entry.sql.observe(metrics.sql)
+        entry.serialize.observe(metrics.serialize)
+        entry.render.observe(metrics.render)
+
+
+def reset_metrics():
+    with _routes_lock:
+        _routes.clear()
+
+
+def _labels(**labels):
+    return ','.join(f'{name}="{value}"' for name, value in labels.items())
+
+
+def _histogram_lines(name, histogram, labels):
+    lines, cumulative = [], 0
+    for bound, count in zip(histogram.buckets + ('+Inf',), histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_sum{{{labels}}} {histogram.sum:.6f}')
+    lines.append(f'{name}_count{{{labels}}} {cumulative}')
+    return lines
+
+
+def render_metrics():
+    """Texto de exposição do Prometheus (versão 0.0.4) com as métricas deste processo"""
+    from .cache import cache_stats
+
+    with _routes_lock:
+        # Cópia dos números; a formatação acontece fora da trava
+        snapshot = sorted(((key, entry.copy()) for key, entry in _routes.items()), key=lambda item: item[0])
+
+    lines = [
+        '# HELP reservas_requests_total Respostas por rota, método e status',
+        '# TYPE reservas_requests_total counter',
+    ]
+    for (route, method), entry in snapshot:
+        for status, count in sorted(entry.responses.items()):
+            lines.append(f'reservas_requests_total{{{_labels(route=route, method=method, status=status)}}} {count}')
+    for field, (name, description) in HISTOGRAMS.items():
+        lines += [f'# HELP {name} {description}', f'# TYPE {name} histogram']
+        for (route, method), entry in snapshot:
+            lines += _histogram_lines(name, getattr(entry, field), _labels(route=route, method=method))
+
+    lines += [
+        '# HELP reservas_cache_requests_total Leituras do cache por namespace e resultado',
+        '# TYPE reservas_cache_requests_total counter',
+    ]
+    for namespace, counts in cache_stats().items():
+        for result in ('hits', 'misses'):
+            lines.append(f'reservas_cache_requests_total{{{_labels(namespace=namespace, result=result)}}} {counts[result]}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,134 @@
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+
+from . import metrics, profiling, querylog
+
+ASYNC_URLCONF = 'reservas.async_urls'
+
+
+class AsyncReadRoutingMiddleware:
+    """Sob ASGI, resolve GET/HEAD pela URLconf de reservas.async_urls (handlers assíncronos).
+
+    Sob WSGI não faz nada: as mesmas URLs continuam nas views DRF síncronas.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def route(self, request):
+        if isinstance(request, ASGIRequest) and request.method in ('GET', 'HEAD'):
+            request.urlconf = ASYNC_URLCONF
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self.route(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        self.route(request)
+        return await self.get_response(request)
+
+
+class RequestMetricsMiddleware:
+    """Mede cada requisição (tempo total, SQL, serialização, renderização) para o Server-Timing e o /metrics.
+
+    Fica no topo de MIDDLEWARE para o tempo total cobrir os demais middlewares. Sorteia também as
+    requisições cujas consultas vão para o log de consultas (reservas.querylog).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.header = getattr(settings, 'RESERVAS_SERVER_TIMING', True)
+        self.sample_rate = getattr(settings, 'RESERVAS_QUERYLOG_SAMPLE_RATE', 0.0)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def record(self, request, response, request_metrics):
+        total = time.perf_counter() - request_metrics.started
+        metrics.observe(metrics.route_name(request), request.method, response.status_code, request_metrics, total)
+        if self.header:
+            response['Server-Timing'] = metrics.server_timing(request_metrics, total)
+        if request_metrics.statements:
+            querylog.record(request_metrics.view or metrics.route_name(request), request_metrics.statements)
+        return response
+
+    def start(self):
+        return metrics.start(sampled=self.sample_rate > 0 and random.random() < self.sample_rate)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request_metrics = metrics.current()
+        if request_metrics is not None and request_metrics.statements is not None:
+            request_metrics.view = querylog.view_name(view_func, request.method)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        request_metrics, token = self.start()
+        try:
+            return self.record(request, self.get_response(request), request_metrics)
+        finally:
+            metrics.finish(token)
+
+    async def __acall__(self, request):
+        request_metrics, token = self.start()
+        try:
+            return self.record(request, await self.get_response(request), request_metrics)
+        finally:
+            metrics.finish(token)
+
+
+class ProfilingMiddleware:
+    """Perfila a requisição quando staff pede (X-Profile / ?_profile=, ver reservas.profiling).
+
+    Fora disso só confere a presença do cabeçalho e do parâmetro.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def save(self, request, response, profile):
+        name = profile.save(metrics.route_name(request))
+        response['X-Profile'] = name or 'descartado: acima de RESERVAS_PROFILE_MAX_BYTES'
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        mode = profiling.requested_mode(request)
+        if mode is None or not profiling.is_staff(request):
+            return self.get_response(request)
+        profile = profiling.Profile(mode)
+        profile.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            profile.stop()
+        return self.save(request, response, profile)
+
+    async def __acall__(self, request):
+        mode = profiling.requested_mode(request)
+        if mode is None or not await sync_to_async(profiling.is_staff)(request):
+            return await self.get_response(request)
+        profile = profiling.Profile(mode, all_threads=True)
+        profile.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            # No event loop: o cProfile só pode ser desligado na thread em que foi ligado
+            profile.stop()
+        return await sync_to_async(self.save)(request, response, profile)
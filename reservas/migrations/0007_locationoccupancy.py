@@ -0,0 +1,48 @@
+# Generated by Django 5.2.2 on 2026-10-18 08:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_occupancy(apps, schema_editor):
+    Reservation = apps.get_model('reservas', 'Reservation')
+    LocationOccupancy = apps.get_model('reservas', 'LocationOccupancy')
+    occupancy = {}
+    rows = Reservation.objects.exclude(status='cancelled').values_list('location_id', 'date', 'start_time', 'end_time')
+    for location_id, day, start_time, end_time in rows.iterator():
+        mask, count = occupancy.get((location_id, day), (0, 0))
+        for hour in range(start_time.hour, end_time.hour):
+            mask |= 1 << hour
+        occupancy[(location_id, day)] = (mask, count + 1)
+    LocationOccupancy.objects.bulk_create(
+        [
+            LocationOccupancy(location_id=location_id, date=day, occupied_hours=mask, reservation_count=count)
+            for (location_id, day), (mask, count) in occupancy.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservas', '0006_remove_location_image_locationimage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LocationOccupancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('occupied_hours', models.PositiveIntegerField(default=0)),
+                ('reservation_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occupancy', to='reservas.location')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('location', 'date'), name='unique_location_occupancy_per_day')],
+            },
+        ),
+        migrations.RunPython(populate_occupancy, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.2 on 2026-10-18 08:40
+
+from django.db import migrations, models
+
+
+def fill_busy_intervals(apps, schema_editor):
+    Reservation = apps.get_model('reservas', 'Reservation')
+    LocationOccupancy = apps.get_model('reservas', 'LocationOccupancy')
+    for occupancy in LocationOccupancy.objects.iterator():
+        rows = Reservation.objects.filter(
+            location_id=occupancy.location_id, date=occupancy.date
+        ).exclude(status='cancelled').values_list('start_time', 'end_time')
+        merged = []
+        for start, end in sorted((s.hour * 60 + s.minute, e.hour * 60 + e.minute) for s, e in rows):
+            if start >= end:
+                continue
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        mask = 0
+        for hour in range(24):
+            if any(start < hour * 60 + 60 and end > hour * 60 for start, end in merged):
+                mask |= 1 << hour
+        occupancy.busy_intervals = merged
+        occupancy.occupied_hours = mask
+        occupancy.save(update_fields=['busy_intervals', 'occupied_hours'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservas', '0007_locationoccupancy'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='locationoccupancy',
+            name='busy_intervals',
+            field=models.JSONField(default=list),
+        ),
+        migrations.RunPython(fill_busy_intervals, migrations.RunPython.noop),
+    ]
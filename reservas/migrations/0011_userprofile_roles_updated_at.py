@@ -0,0 +1,18 @@
+# Generated by Django 5.2.2 on 2026-10-18 08:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservas', '0010_location_active_created_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='roles_updated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.2 on 2026-10-18 08:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_stats(apps, schema_editor):
+    Location = apps.get_model('reservas', 'Location')
+    LocationOccupancy = apps.get_model('reservas', 'LocationOccupancy')
+    LocationStats = apps.get_model('reservas', 'LocationStats')
+    Reservation = apps.get_model('reservas', 'Reservation')
+
+    counts = {
+        row['location_id']: row
+        for row in Reservation.objects.values('location_id').annotate(
+            total=models.Count('id'),
+            pending=models.Count('id', filter=models.Q(status='pendente')),
+            confirmed=models.Count('id', filter=models.Q(status='confirmed')),
+            cancelled=models.Count('id', filter=models.Q(status='cancelled')),
+        )
+    }
+    LocationStats.objects.bulk_create(
+        [
+            LocationStats(
+                location_id=location_id,
+                owner_id=owner_id,
+                total_reservations=counts.get(location_id, {}).get('total', 0),
+                pending_reservations=counts.get(location_id, {}).get('pending', 0),
+                confirmed_reservations=counts.get(location_id, {}).get('confirmed', 0),
+                cancelled_reservations=counts.get(location_id, {}).get('cancelled', 0),
+            )
+            for location_id, owner_id in Location.objects.values_list('id', 'owner_id')
+        ],
+        batch_size=1000,
+    )
+
+    confirmed = Reservation.objects.filter(status='confirmed').values('location_id', 'date').annotate(total=models.Count('id'))
+    for row in confirmed:
+        LocationOccupancy.objects.filter(location_id=row['location_id'], date=row['date']).update(confirmed_count=row['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservas', '0011_userprofile_roles_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='locationoccupancy',
+            name='confirmed_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='LocationStats',
+            fields=[
+                ('location', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='reservas.location')),
+                ('total_reservations', models.IntegerField(default=0)),
+                ('pending_reservations', models.IntegerField(default=0)),
+                ('confirmed_reservations', models.IntegerField(default=0)),
+                ('cancelled_reservations', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='location_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(populate_stats, migrations.RunPython.noop),
+    ]
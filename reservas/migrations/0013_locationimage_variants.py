@@ -0,0 +1,18 @@
+# Generated by Django 5.2.2 on 2026-10-18 09:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservas', '0012_locationstats_occupancy_confirmed_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='locationimage',
+            name='variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.2 on 2026-10-18 09:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+# SQL congelado aqui (não importado de reservas.search): a migração não pode mudar junto com o app
+SEARCH_INDEX_SQL = (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS reservas_location_fts USING fts5(
+        name, description, address,
+        content='reservas_location', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS reservas_location_fts_ai AFTER INSERT ON reservas_location BEGIN
+        INSERT INTO reservas_location_fts(rowid, name, description, address)
+        VALUES (new.id, new.name, new.description, new.address);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS reservas_location_fts_ad AFTER DELETE ON reservas_location BEGIN
+        INSERT INTO reservas_location_fts(reservas_location_fts, rowid, name, description, address)
+        VALUES ('delete', old.id, old.name, old.description, old.address);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS reservas_location_fts_au AFTER UPDATE OF name, description, address ON reservas_location BEGIN
+        INSERT INTO reservas_location_fts(reservas_location_fts, rowid, name, description, address)
+        VALUES ('delete', old.id, old.name, old.description, old.address);
+        INSERT INTO reservas_location_fts(rowid, name, description, address)
+        VALUES (new.id, new.name, new.description, new.address);
+    END""",
+    "INSERT INTO reservas_location_fts(reservas_location_fts) VALUES ('rebuild')",
+)
+DROP_SEARCH_INDEX_SQL = (
+    "DROP TRIGGER IF EXISTS reservas_location_fts_ai",
+    "DROP TRIGGER IF EXISTS reservas_location_fts_ad",
+    "DROP TRIGGER IF EXISTS reservas_location_fts_au",
+    "DROP TABLE IF EXISTS reservas_location_fts",
+)
+
+
+def run_on_sqlite(statements):
+    # FTS5 só existe no SQLite; nos outros bancos a busca usa icontains e não há o que criar
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor == 'sqlite':
+            for statement in statements:
+                schema_editor.execute(statement, params=None)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservas', '0013_locationimage_variants'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='location',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['price_per_hour', 'id'], name='location_active_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='location',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['max_duration'], name='location_active_duration_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='location',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['operating_hours_start', 'operating_hours_end'], name='location_active_hours_idx'),
+        ),
+        # Índice FTS5 + triggers (só SQLite; em outros bancos a busca usa icontains)
+        migrations.RunPython(run_on_sqlite(SEARCH_INDEX_SQL), run_on_sqlite(DROP_SEARCH_INDEX_SQL)),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.2 on 2026-10-18 10:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservas', '0015_location_coordinates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LocationSearchIndex',
+            fields=[
+                ('location', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='reservas.location')),
+                ('document', models.TextField(db_column='reservas_location_fts')),
+            ],
+            options={
+                'db_table': 'reservas_location_fts',
+                'managed': False,
+            },
+        ),
+    ]
@@ -1,21 +1,25 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.core.validators import FileExtensionValidator
 from django.utils import timezone
+from .roles import is_owner, is_customer
+from . import geo
 
 class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     phone = models.CharField(max_length=20)
     cpf = models.CharField(max_length=14)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Última mudança nos grupos do usuário; invalida a claim `role` dos tokens emitidos antes disso
+    roles_updated_at = models.DateTimeField(null=True, blank=True)
 
     @property
     def is_owner(self):
-        return self.user.groups.filter(name='owners').exists()
+        return is_owner(self.user)
 
     @property
     def is_customer(self):
-        return self.user.groups.filter(name='customers').exists()
+        return is_customer(self.user)
 
 class Location(models.Model):
     owner = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -29,6 +33,37 @@ class Location(models.Model):
     max_duration = models.PositiveIntegerField(default=4)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Coordenadas opcionais informadas pelo owner; geohash derivado delas no save() (reservas.geo)
+    latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    geohash = models.CharField(max_length=12, null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', 'is_active'], name='location_owner_active_idx'),
+            # Listagem pública: só locais ativos, na ordem da paginação (created_at, id)
+            models.Index(fields=['created_at', 'id'], condition=models.Q(is_active=True), name='location_active_created_idx'),
+            # Filtros de faixa da busca (reservas.search) sobre os locais ativos
+            models.Index(fields=['price_per_hour', 'id'], condition=models.Q(is_active=True), name='location_active_price_idx'),
+            models.Index(fields=['max_duration'], condition=models.Q(is_active=True), name='location_active_duration_idx'),
+            models.Index(
+                fields=['operating_hours_start', 'operating_hours_end'],
+                condition=models.Q(is_active=True),
+                name='location_active_hours_idx',
+            ),
+            # ?near=: faixas de prefixo de geohash
+            models.Index(fields=['geohash'], condition=models.Q(is_active=True), name='location_active_geohash_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.geohash = geo.encode(float(self.latitude), float(self.longitude)) if self.has_coordinates() else None
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'geohash'}
+        super().save(*args, **kwargs)
+
+    def has_coordinates(self):
+        return self.latitude is not None and self.longitude is not None
 
     def __str__(self):
         return f"{self.name} - {self.address}"
@@ -40,6 +75,8 @@ class LocationImage(models.Model):
         validators=[FileExtensionValidator(['jpg', 'jpeg', 'png'])]
     )
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    # Caminhos das versões redimensionadas (reservas.images): {"thumb": ..., "card": ..., "full": ...}
+    variants = models.JSONField(default=dict, blank=True)
 
     def __str__(self):
         return f"Imagem de {self.location.name}"
@@ -59,6 +96,18 @@ class Reservation(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     status = models.CharField(max_length=15, choices=Status.choices, default=Status.PENDENTE)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['location', 'date', 'status'], name='reservation_loc_date_status'),
+            models.Index(fields=['user', '-date', '-start_time'], name='reservation_user_date_idx'),
+            # Agenda do dia: só reservas ativas (pendentes e confirmadas)
+            models.Index(
+                fields=['location', 'date', 'start_time'],
+                condition=~models.Q(status='cancelled'),
+                name='reservation_active_day_idx',
+            ),
+        ]
+
     def can_cancel(self):
         """Verifica se a reserva pode ser cancelada com base na regra de antecedência"""
         if self.status == 'cancelled':
@@ -71,8 +120,71 @@ class Reservation(models.Model):
         now = datetime.now()
         return reservation_datetime - timedelta(hours=location_cancel_limit) > now
 
+    def save(self, *args, **kwargs):
+        # O índice de ocupação (LocationOccupancy) é atualizado pelo signal post_save,
+        # que precisa rodar na mesma transação da gravação da reserva
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
+
     def __str__(self):
         return f"{self.location.name} - {self.date} {self.start_time}-{self.end_time}"
+
+class LocationOccupancy(models.Model):
+    """Ocupação pré-calculada de um local em um dia.
+
+    busy_intervals guarda os intervalos ocupados já fundidos, em minutos desde 00:00;
+    bit h de occupied_hours = hora h com alguma ocupação.
+    """
+    location = models.ForeignKey(Location, on_delete=models.CASCADE, related_name='occupancy')
+    date = models.DateField()
+    busy_intervals = models.JSONField(default=list)
+    occupied_hours = models.PositiveIntegerField(default=0)
+    reservation_count = models.PositiveIntegerField(default=0)
+    confirmed_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['location', 'date'], name='unique_location_occupancy_per_day'),
+        ]
+
+    def __str__(self):
+        return f"Ocupação de {self.location_id} em {self.date}"
+
+class LocationStats(models.Model):
+    """Contadores de reservas por local, mantidos incrementalmente pelos signals de Reservation.
+
+    O dashboard do owner lê só estas linhas; os totais do owner são a soma das linhas dos seus locais.
+    """
+    location = models.OneToOneField(Location, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='location_stats')
+    total_reservations = models.IntegerField(default=0)
+    pending_reservations = models.IntegerField(default=0)
+    confirmed_reservations = models.IntegerField(default=0)
+    cancelled_reservations = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Estatísticas de {self.location_id}"
+
+class LocationSearchIndex(models.Model):
+    """Tabela FTS5 da busca (reservas.search, só SQLite), mantida por triggers; existe para o join no ORM.
+
+    `= ?` na coluna oculta com o nome da tabela equivale a MATCH no FTS5.
+    """
+    location = models.OneToOneField(
+        Location, on_delete=models.DO_NOTHING, primary_key=True, db_column='rowid',
+        db_constraint=False, related_name='search_index',
+    )
+    document = models.TextField(db_column='reservas_location_fts')
+
+    class Meta:
+        managed = False
+        db_table = 'reservas_location_fts'
     
 class Payment(models.Model):
     class PaymentMethod(models.TextChoices):
@@ -93,5 +205,10 @@ class Payment(models.Model):
     atualizado_em = models.DateTimeField(auto_now=True)
     reembolsado_em = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['status'], name='payment_status_idx'),
+        ]
+
     def __str__(self):
         return f"Pagamento {self.id} - {self.get_method_display()} - {self.status}"
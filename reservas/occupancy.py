@@ -0,0 +1,93 @@
+from .models import LocationOccupancy, Reservation
+from .availability import DayAgenda, active_reservations, to_minutes
+
+
+def mask_to_hours(mask):
+    return [hour for hour in range(24) if mask >> hour & 1]
+
+
+def occupancy_values(agenda, count, confirmed):
+    return {
+        'busy_intervals': agenda.intervals,
+        'occupied_hours': agenda.hours_mask(),
+        'reservation_count': count,
+        'confirmed_count': confirmed,
+    }
+
+
+def compute_occupancy(location_id, date):
+    rows = list(
+        active_reservations().filter(location_id=location_id, date=date).values_list('start_time', 'end_time', 'status')
+    )
+    confirmed = sum(1 for *_, status in rows if status == Reservation.Status.CONFIRMADA)
+    return occupancy_values(DayAgenda.from_times(row[:2] for row in rows), len(rows), confirmed)
+
+
+def refresh_occupancy(location_id, date):
+    """Recalcula a linha de ocupação de um local/dia. Deve ser chamada dentro da transação que alterou a reserva."""
+    values = compute_occupancy(location_id, date)
+    if not values['reservation_count']:
+        LocationOccupancy.objects.filter(location_id=location_id, date=date).delete()
+        return None
+    occupancy, _ = LocationOccupancy.objects.update_or_create(location_id=location_id, date=date, defaults=values)
+    return occupancy
+
+
+def _occupancy_row(location_id, date):
+    return LocationOccupancy.objects.filter(location_id=location_id, date=date).values_list(
+        'busy_intervals', 'occupied_hours', 'reservation_count'
+    )
+
+
+def _occupancy_from_row(row):
+    if row is None:
+        return DayAgenda(), 0, 0
+    intervals, mask, count = row
+    return DayAgenda(intervals), mask, count
+
+
+def get_occupancy(location_id, date):
+    """Retorna (DayAgenda, bitmask de horas ocupadas, total de reservas ativas) lendo uma única linha do índice"""
+    return _occupancy_from_row(_occupancy_row(location_id, date).first())
+
+
+async def aget_occupancy(location_id, date):
+    return _occupancy_from_row(await _occupancy_row(location_id, date).afirst())
+
+
+def expected_occupancy(location_id=None):
+    """Ocupação esperada calculada diretamente da tabela Reservation: {(location_id, date): valores da linha}"""
+    rows = active_reservations()
+    if location_id is not None:
+        rows = rows.filter(location_id=location_id)
+    intervals = {}
+    confirmed = {}
+    rows = rows.values_list('location_id', 'date', 'start_time', 'end_time', 'status')
+    for loc_id, day, start_time, end_time, status in rows.iterator():
+        intervals.setdefault((loc_id, day), []).append((to_minutes(start_time), to_minutes(end_time)))
+        confirmed[(loc_id, day)] = confirmed.get((loc_id, day), 0) + (status == Reservation.Status.CONFIRMADA)
+    return {
+        key: occupancy_values(DayAgenda(day_intervals), len(day_intervals), confirmed[key])
+        for key, day_intervals in intervals.items()
+    }
+
+
+def stored_occupancy(location_id=None):
+    rows = LocationOccupancy.objects.all()
+    if location_id is not None:
+        rows = rows.filter(location_id=location_id)
+    return {
+        (row.pop('location_id'), row.pop('date')): row
+        for row in rows.values(
+            'location_id', 'date', 'busy_intervals', 'occupied_hours', 'reservation_count', 'confirmed_count'
+        )
+    }
+
+
+def diff_occupancy(expected, stored):
+    """Lista de (location_id, date, esperado, gravado) para cada divergência entre o índice e as reservas"""
+    return [
+        (key[0], key[1], expected.get(key), stored.get(key))
+        for key in sorted(expected.keys() | stored.keys())
+        if expected.get(key) != stored.get(key)
+    ]
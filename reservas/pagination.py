@@ -0,0 +1,186 @@
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def _json_value(value):
+    return value.isoformat()
+
+
+class KeysetPagination(BasePagination):
+    """Paginação por cursor (keyset) sobre uma ordenação indexada e única.
+
+    Em vez de OFFSET, cada página filtra "depois da última linha vista" pela tupla de ordenação,
+    então a página N custa o mesmo que a primeira. A view define a ordenação em `keyset_ordering`;
+    o último campo deve ser único (normalmente o id) para o cursor ser estável.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    ordering = ('-created_at', 'id')
+    invalid_cursor_message = "Cursor inválido."
+
+    def get_page_size(self, request):
+        default = getattr(settings, 'RESERVAS_PAGE_SIZE', 50)
+        max_page_size = getattr(settings, 'RESERVAS_MAX_PAGE_SIZE', 200)
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, default))
+        except (TypeError, ValueError):
+            page_size = default
+        return max(1, min(page_size, max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.finish_page(list(self.page_queryset(queryset, request, view)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset() com o ORM assíncrono, para os handlers ASGI"""
+        return self.finish_page([row async for row in self.page_queryset(queryset, request, view)])
+
+    def page_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = tuple(getattr(view, 'keyset_ordering', self.ordering))
+        self.page_size = self.get_page_size(request)
+        self.position, self.reverse = self.decode_cursor(request)
+
+        # Página anterior: percorre a ordenação invertida e desinverte o resultado
+        ordering = self.ordering if not self.reverse else tuple(self.invert(field) for field in self.ordering)
+        queryset = queryset.order_by(*ordering)
+        if self.position is not None:
+            try:
+                queryset = queryset.filter(self.after(ordering, self.position))
+            except (ValidationError, ValueError, TypeError):
+                raise NotFound(self.invalid_cursor_message)
+        return queryset[:self.page_size + 1]
+
+    def finish_page(self, rows):
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if self.reverse:
+            rows.reverse()
+
+        self.has_next = has_more if not self.reverse else self.position is not None
+        self.has_previous = self.position is not None if not self.reverse else has_more
+        self.first_row = rows[0] if rows else None
+        self.last_row = rows[-1] if rows else None
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next or self.last_row is None:
+            return None
+        return self.build_link(self.last_row, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or self.first_row is None:
+            return None
+        return self.build_link(self.first_row, reverse=True)
+
+    def build_link(self, row, reverse):
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(row, reverse))
+
+    @staticmethod
+    def invert(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    @staticmethod
+    def after(ordering, position):
+        """Q de "vem depois de `position`" na ordenação: (a > x) OR (a = x AND b > y) OR ..."""
+        condition = Q()
+        equal = {}
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        # Limite no primeiro campo para o banco fazer range scan no índice
+        first = ordering[0]
+        bound = Q(**{f"{first.lstrip('-')}__{'lte' if first.startswith('-') else 'gte'}": position[0]})
+        return bound & condition
+
+    def encode_cursor(self, row, reverse):
+        # Linhas de modelo ou de .values() (reservas.projections)
+        position = [
+            row[field.lstrip('-')] if isinstance(row, dict) else getattr(row, field.lstrip('-'))
+            for field in self.ordering
+        ]
+        payload = json.dumps({'p': position, 'r': int(reverse)}, default=_json_value, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)))
+            position = payload['p']
+            reverse = bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+
+class RankedPagination(KeysetPagination):
+    """Paginação por deslocamento (?offset=) para resultados ordenados por relevância.
+
+    A relevância não é uma coluna, então não há cursor keyset; como o banco precisa ranquear todas as
+    correspondências de qualquer forma, o deslocamento não encarece as páginas seguintes.
+    """
+    offset_query_param = 'offset'
+    max_offset = 10000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        try:
+            self.offset = max(0, int(request.query_params.get(self.offset_query_param, 0)))
+        except (TypeError, ValueError):
+            self.offset = 0
+        if self.offset > self.max_offset:
+            raise NotFound(f"Deslocamento máximo de {self.max_offset} resultados.")
+
+        rows = list(queryset[self.offset:self.offset + self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        return rows[:self.page_size]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.offset_link(self.offset + self.page_size)
+
+    def get_previous_link(self):
+        if not self.offset:
+            return None
+        return self.offset_link(max(0, self.offset - self.page_size))
+
+    def offset_link(self, offset):
+        url = self.request.build_absolute_uri()
+        if not offset:
+            return remove_query_param(url, self.offset_query_param)
+        return replace_query_param(url, self.offset_query_param, offset)
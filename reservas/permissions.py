@@ -1,4 +1,5 @@
 from rest_framework.permissions import BasePermission, SAFE_METHODS
+from .roles import is_owner
 
 class IsOwnerOrReadOnly(BasePermission):
     def has_object_permission(self, request, view, obj):
@@ -12,4 +13,4 @@ class IsReservationOwnerOrReadOnly(BasePermission):
 
 class IsOwner(BasePermission):
     def has_permission(self, request, view):
-        return request.user.groups.filter(name='owners').exists()
+        return is_owner(request.user)
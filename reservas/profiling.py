@@ -0,0 +1,183 @@
+"""Profiling sob demanda de uma única requisição, só para staff.
+
+Ligado pelo cabeçalho `X-Profile: sample|cprofile` ou por `?_profile=sample|cprofile` (`1` = sample).
+Sem isso o ProfilingMiddleware só olha um cabeçalho e a query string; com ele, e se o usuário
+(sessão ou JWT) for staff, a requisição roda sob:
+
+- sample: uma thread amostra a pilha a cada RESERVAS_PROFILE_INTERVAL_MS e grava stacks no
+  formato "folded" (uma linha `a;b;c N` por pilha), que o flamegraph.pl, o speedscope e o
+  inferno leem direto;
+- cprofile: o cProfile (determinístico, mais overhead) grava um .pstats (snakeviz, flameprof).
+
+O arquivo vai para RESERVAS_PROFILE_DIR e o nome volta no cabeçalho X-Profile; staff baixa por
+/api/profiles/<nome>/. Cada arquivo tem no máximo RESERVAS_PROFILE_MAX_BYTES (no folded, as pilhas
+menos frequentes saem primeiro), o diretório guarda os RESERVAS_PROFILE_MAX_FILES mais recentes e a
+amostragem para após RESERVAS_PROFILE_MAX_SECONDS.
+
+Sob ASGI o ORM roda em outras threads (sync_to_async): o modo sample amostra então todas as
+threads do processo (outras requisições simultâneas podem aparecer), e o cprofile só vê o event loop.
+"""
+import cProfile
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+
+HEADER = 'HTTP_X_PROFILE'
+PARAM = '_profile'
+MODES = {'1': 'sample', 'sample': 'sample', 'cprofile': 'cprofile'}
+EXTENSIONS = {'sample': '.folded', 'cprofile': '.pstats'}
+PROFILE_NAME = re.compile(r'^[\w.-]+\.(folded|pstats)$')
+UNSAFE = re.compile(r'[^\w-]')
+
+_labels = {}
+
+
+def requested_mode(request):
+    """Modo pedido pela requisição, ou None (caminho comum: sem custo além de duas buscas em string)"""
+    value = request.META.get(HEADER)
+    if value is None:
+        if PARAM + '=' not in request.META.get('QUERY_STRING', ''):
+            return None
+        value = request.GET.get(PARAM)
+    return MODES.get((value or '').strip().lower())
+
+
+def is_staff(request):
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user.is_staff
+    # Requisições da API autenticam pelo JWT só dentro da view: autentica aqui, só quando pedido
+    from rest_framework.exceptions import AuthenticationFailed
+    from .authentication import RoleJWTAuthentication
+
+    try:
+        result = RoleJWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return False
+    return bool(result and result[0].is_staff)
+
+
+def frame_label(code):
+    # Memoizado por code object: cada amostra só faz buscas no dicionário
+    label = _labels.get(code)
+    if label is None:
+        filename = code.co_filename
+        for prefix in sys.path:
+            if prefix and filename.startswith(prefix):
+                filename = filename[len(prefix):].lstrip(os.sep)
+                break
+        label = _labels[code] = f'{code.co_name} ({filename}:{code.co_firstlineno})'.replace(';', ':')
+    return label
+
+
+def fold(frame):
+    stack = []
+    while frame is not None:
+        stack.append(frame_label(frame.f_code))
+        frame = frame.f_back
+    return ';'.join(reversed(stack))
+
+
+class StackSampler(threading.Thread):
+    """Amostra a pilha de `thread_id` (ou de todas as threads, se None) e conta as pilhas dobradas"""
+
+    def __init__(self, thread_id, interval, max_seconds):
+        super().__init__(name='reservas-profiler', daemon=True)
+        self.thread_id, self.interval, self.max_seconds = thread_id, interval, max_seconds
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        deadline = time.monotonic() + self.max_seconds
+        while not self._stop_event.wait(self.interval) and time.monotonic() < deadline:
+            frames = sys._current_frames()
+            if self.thread_id is not None:
+                frame = frames.get(self.thread_id)
+                if frame is not None:
+                    self.stacks[fold(frame)] += 1
+                continue
+            for thread_id, frame in frames.items():
+                if thread_id != self.ident:
+                    self.stacks[fold(frame)] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def folded(stacks, max_bytes):
+    """Texto folded das pilhas, das mais frequentes para as menos, até max_bytes"""
+    lines, size = [], 0
+    for stack, count in stacks.most_common():
+        line = f'{stack} {count}\n'
+        size += len(line.encode())
+        if size > max_bytes:
+            break
+        lines.append(line)
+    return ''.join(lines)
+
+
+class Profile:
+    """Perfil de uma requisição: start(), stop() e save(rota) -> nome do arquivo"""
+
+    def __init__(self, mode, all_threads=False):
+        self.mode = mode
+        if mode == 'cprofile':
+            self.profiler = cProfile.Profile()
+        else:
+            self.profiler = StackSampler(
+                None if all_threads else threading.get_ident(),
+                settings.RESERVAS_PROFILE_INTERVAL_MS / 1000,
+                settings.RESERVAS_PROFILE_MAX_SECONDS,
+            )
+
+    def start(self):
+        if self.mode == 'cprofile':
+            self.profiler.enable()
+        else:
+            self.profiler.start()
+
+    def stop(self):
+        if self.mode == 'cprofile':
+            self.profiler.disable()
+        else:
+            self.profiler.stop()
+
+    def save(self, route):
+        directory = Path(settings.RESERVAS_PROFILE_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{UNSAFE.sub('_', route)}-{uuid.uuid4().hex[:8]}"
+        path = directory / (name + EXTENSIONS[self.mode])
+        if self.mode == 'cprofile':
+            self.profiler.dump_stats(path)
+            if path.stat().st_size > settings.RESERVAS_PROFILE_MAX_BYTES:
+                path.unlink()
+                return None
+        else:
+            path.write_text(folded(self.profiler.stacks, settings.RESERVAS_PROFILE_MAX_BYTES))
+        prune(directory, settings.RESERVAS_PROFILE_MAX_FILES)
+        return path.name
+
+
+def prune(directory, max_files):
+    profiles = sorted(
+        (path for path in directory.iterdir() if PROFILE_NAME.match(path.name)),
+        key=lambda path: path.stat().st_mtime,
+    )
+    for path in profiles[:max(len(profiles) - max_files, 0)]:
+        path.unlink(missing_ok=True)
+
+
+def profile_path(name):
+    """Caminho de um perfil salvo, ou None se o nome não for de um perfil existente"""
+    if not PROFILE_NAME.match(name):
+        return None
+    path = Path(settings.RESERVAS_PROFILE_DIR) / name
+    return path if path.is_file() else None
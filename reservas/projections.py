@@ -0,0 +1,131 @@
+"""Caminho rápido, só de leitura, para listagens: linhas de .values() em vez de instâncias do modelo.
+
+Um ValuesSerializer é compilado uma vez a partir do ModelSerializer correspondente: cada campo vira
+(chave do .values(), to_representation do próprio campo DRF), então datas, horários, choices e
+None saem exatamente como no serializer original. Os SerializerMethodField são reescritos na
+subclasse como get_<campo>(row, extra), onde `extra` são os dados da página carregados em load().
+"""
+from asgiref.sync import sync_to_async
+from rest_framework import serializers
+from rest_framework.relations import RelatedField
+
+from .images import stored_variant_urls
+from .metrics import phase
+from .models import LocationImage
+from .serializers import ReservationSerializer
+
+
+class ValuesSerializer:
+    serializer_class = None
+    # Colunas usadas por cada get_<campo>, além das dos campos
+    method_columns = {}
+
+    def __init__(self, context=None):
+        self.context = context or {}
+        self.columns, self.builders = self.compile(self.serializer_class(context=self.context))
+
+    def compile(self, serializer):
+        # Com context['fieldset'] o serializer já vem só com os campos pedidos: colunas e joins caem junto
+        columns, builders = [], []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, serializers.SerializerMethodField):
+                columns.extend(self.method_columns.get(name, ()))
+                builders.append((name, None, getattr(self, f'get_{name}')))
+                continue
+            key = '__'.join(field.source_attrs)
+            # Relação por pk: o .values() já traz o id, que é a própria representação
+            represent = None if isinstance(field, RelatedField) else field.to_representation
+            columns.append(key)
+            builders.append((name, key, represent))
+        return tuple(dict.fromkeys(columns)), builders
+
+    def wants(self, *names):
+        """Algum destes campos sai na resposta?"""
+        return any(name == wanted for name, _, _ in self.builders for wanted in names)
+
+    def project(self, queryset, keep=()):
+        """.values() das colunas dos campos; `keep` são colunas extras (ex.: as da paginação keyset)"""
+        # select_related/prefetch_related não servem para .values(): os joins vêm das chaves com "__"
+        columns = tuple(dict.fromkeys(self.columns + tuple(keep)))
+        return queryset.select_related(None).prefetch_related(None).values(*columns)
+
+    def load(self, rows):
+        """Dados da página inteira para os get_<campo> (ex.: imagens), em consultas próprias"""
+        return None
+
+    async def aload(self, rows):
+        return await sync_to_async(self.load)(rows)
+
+    def serialize(self, rows):
+        return self.build(rows, self.load(rows))
+
+    async def aserialize(self, rows):
+        return self.build(rows, await self.aload(rows))
+
+    def build(self, rows, extra):
+        with phase('serialize'):
+            data = []
+            for row in rows:
+                item = {}
+                for name, key, represent in self.builders:
+                    if key is None:
+                        item[name] = represent(row, extra)
+                    else:
+                        # Mesma regra do Serializer.to_representation: None não passa pelo campo
+                        value = row[key]
+                        if value is not None and represent is not None:
+                            value = represent(value)
+                        item[name] = value
+                data.append(item)
+        return data
+
+
+class ReservationValues(ValuesSerializer):
+    """ReservationSerializer sobre .values(): mesmos bytes, sem instâncias de Reservation/Location"""
+    serializer_class = ReservationSerializer
+    method_columns = {
+        'local_cancelado': ('location__is_active',),
+        'location_images': ('location',),
+        'location_image_variants': ('location',),
+    }
+    image_fields = ('location_images', 'location_image_variants')
+
+    def load(self, rows):
+        if not self.wants(*self.image_fields):
+            return None
+        return self.group_images(self.image_rows(rows))
+
+    async def aload(self, rows):
+        if not self.wants(*self.image_fields):
+            return None
+        return self.group_images([image async for image in self.image_rows(rows)])
+
+    @staticmethod
+    def image_rows(rows):
+        # Mesma consulta (e ordem) do prefetch_related('location__images')
+        location_ids = {row['location'] for row in rows}
+        return LocationImage.objects.filter(location_id__in=location_ids).values_list('location_id', 'image', 'variants')
+
+    @staticmethod
+    def group_images(images):
+        storage = LocationImage._meta.get_field('image').storage
+        by_location = {}
+        for location_id, name, variants in images:
+            by_location.setdefault(location_id, []).append((name, storage.url(name), variants))
+        return storage, by_location
+
+    def get_local_cancelado(self, row, extra):
+        return not row['location__is_active']
+
+    def get_location_images(self, row, extra):
+        _, by_location = extra
+        return [url for _, url, _ in by_location.get(row['location'], ())]
+
+    def get_location_image_variants(self, row, extra):
+        storage, by_location = extra
+        return [
+            stored_variant_urls(storage, url, variants)
+            for name, url, variants in by_location.get(row['location'], ()) if name
+        ]
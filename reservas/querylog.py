@@ -0,0 +1,191 @@
+"""Log amostrado de consultas SQL: fingerprints por view/action, com top-N por tempo total e p99.
+
+O RequestMetricsMiddleware sorteia RESERVAS_QUERYLOG_SAMPLE_RATE das requisições; nelas o
+execute_wrapper de reservas.metrics guarda (sql, duração) de cada consulta e, no fim, record()
+agrega tudo sob a view que atendeu (LocationViewSet.available_slots, OwnerDashboardView, ...).
+
+O SQL vira fingerprint: literais e placeholders viram ?, listas de IN (...) e blocos UNION ALL
+repetidos colapsam, então a mesma consulta com parâmetros diferentes cai na mesma linha. Cada linha
+guarda contagem, total, máximo e um histograma em buckets logarítmicos (p99 aproximado, erro de até
+25%). A tabela tem no máximo RESERVAS_QUERYLOG_MAX_ENTRIES linhas: quando enche, sai a de menor
+tempo total.
+
+Cada processo publica sua tabela no cache (no máximo a cada PUBLISH_INTERVAL segundos); o comando
+querylog e o endpoint /api/querylog/ somam as de todos os processos. Com o LocMemCache (padrão em
+desenvolvimento) o comando, que roda em outro processo, não enxerga as tabelas do servidor: use um
+backend compartilhado (ver CACHES em core.settings) ou o endpoint.
+"""
+import math
+import os
+import re
+import socket
+import threading
+import time
+from functools import lru_cache
+from hashlib import sha1
+
+from django.conf import settings
+from django.core.cache import cache
+
+PROCESSES_KEY = 'reservas:querylog:processes'
+PUBLISH_INTERVAL = 10
+SNAPSHOT_TIMEOUT = 3600
+# Buckets de duração: o i-ésimo vai até BUCKET_BASE * BUCKET_RATIO ** i milissegundos (0,05 ms a ~60 s)
+BUCKET_BASE, BUCKET_RATIO, BUCKETS = 0.05, 1.25, 64
+EXAMPLE_LENGTH = 2000
+
+PROCESS_ID = f'{socket.gethostname()}:{os.getpid()}'
+
+_entries = {}
+_lock = threading.Lock()
+_published = 0.0
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'(?<![\w"])-?\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s|\?')
+_IN_LIST = re.compile(r'\bIN \((?:\?, )*\?\)', re.IGNORECASE)
+_VALUES_LIST = re.compile(r'\bVALUES (\((?:\?, )*\?\))(?:, \1)+', re.IGNORECASE)
+_UNION = re.compile(r'(SELECT (?:(?! UNION ALL ).)+)(?: UNION ALL \1)+', re.IGNORECASE)
+_SPACES = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(sql):
+    """(fingerprint, SQL normalizado): mesmo fingerprint para a mesma consulta com outros parâmetros"""
+    normalized = _SPACES.sub(' ', sql).strip()
+    normalized = _STRING.sub('?', normalized)
+    normalized = _NUMBER.sub('?', normalized)
+    normalized = _PLACEHOLDER.sub('?', normalized)
+    normalized = _IN_LIST.sub('IN (...)', normalized)
+    normalized = _VALUES_LIST.sub(r'VALUES \1, ...', normalized)
+    normalized = _UNION.sub(r'\1 UNION ALL ...', normalized)
+    return sha1(normalized.encode()).hexdigest()[:16], normalized
+
+
+def view_name(view_func, method):
+    """Nome da view (e da action, nos viewsets) que atende a requisição"""
+    cls = getattr(view_func, 'cls', None)
+    if cls is None:
+        return getattr(view_func, '__name__', repr(view_func))
+    action = (getattr(view_func, 'actions', None) or {}).get(method.lower())
+    return f'{cls.__name__}.{action}' if action else cls.__name__
+
+
+def bucket(duration_ms):
+    if duration_ms <= BUCKET_BASE:
+        return 0
+    return min(BUCKETS - 1, math.ceil(math.log(duration_ms / BUCKET_BASE, BUCKET_RATIO)))
+
+
+def new_entry(view, normalized, sql):
+    return {'view': view, 'fingerprint_sql': normalized, 'example': sql[:EXAMPLE_LENGTH],
+            'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'histogram': [0] * BUCKETS}
+
+
+def record(view, statements):
+    """Agrega as consultas (sql, segundos) de uma requisição amostrada sob `view`"""
+    max_entries = settings.RESERVAS_QUERYLOG_MAX_ENTRIES
+    rows = [(fingerprint(sql), sql, duration * 1000) for sql, duration in statements]
+    with _lock:
+        for (digest, normalized), sql, duration_ms in rows:
+            entry = _entries.get((digest, view))
+            if entry is None:
+                if len(_entries) >= max_entries:
+                    # Tabela cheia: sai a linha que menos pesou até agora
+                    del _entries[min(_entries, key=lambda key: _entries[key]['total_ms'])]
+                entry = _entries[(digest, view)] = new_entry(view, normalized, sql)
+            entry['count'] += 1
+            entry['total_ms'] += duration_ms
+            entry['max_ms'] = max(entry['max_ms'], duration_ms)
+            entry['histogram'][bucket(duration_ms)] += 1
+    maybe_publish()
+
+
+def snapshot():
+    """Cópia da tabela deste processo: {(fingerprint, view): linha}"""
+    with _lock:
+        return {key: dict(entry, histogram=list(entry['histogram'])) for key, entry in _entries.items()}
+
+
+def reset_querylog():
+    global _published
+    with _lock:
+        _entries.clear()
+        _published = 0.0
+
+
+def snapshot_key(process_id):
+    return f'reservas:querylog:{process_id}'
+
+
+def maybe_publish(force=False):
+    global _published
+    now = time.monotonic()
+    if not force and now - _published < PUBLISH_INTERVAL:
+        return
+    _published = now
+    cache.set(snapshot_key(PROCESS_ID), snapshot(), SNAPSHOT_TIMEOUT)
+    # Índice dos processos: corrida entre processos só atrasa a entrada de um deles até a próxima publicação
+    processes = cache.get(PROCESSES_KEY) or {}
+    if PROCESS_ID not in processes:
+        processes[PROCESS_ID] = time.time()
+        cache.set(PROCESSES_KEY, processes, SNAPSHOT_TIMEOUT)
+
+
+def collect():
+    """Tabelas publicadas por todos os processos mais a deste, somadas: (linhas, processos)"""
+    tables = {PROCESS_ID: snapshot()}
+    for process_id in cache.get(PROCESSES_KEY) or {}:
+        if process_id not in tables:
+            table = cache.get(snapshot_key(process_id))
+            if table is not None:
+                tables[process_id] = table
+    merged = {}
+    for table in tables.values():
+        for key, entry in table.items():
+            total = merged.get(key)
+            if total is None:
+                merged[key] = dict(entry, histogram=list(entry['histogram']))
+                continue
+            total['count'] += entry['count']
+            total['total_ms'] += entry['total_ms']
+            total['max_ms'] = max(total['max_ms'], entry['max_ms'])
+            total['histogram'] = [a + b for a, b in zip(total['histogram'], entry['histogram'])]
+    return merged, sorted(tables)
+
+
+def percentile(histogram, fraction):
+    """Limite superior do bucket que contém o percentil (aproximação por cima)"""
+    target, seen = fraction * sum(histogram), 0
+    for index, count in enumerate(histogram):
+        seen += count
+        if count and seen >= target:
+            return BUCKET_BASE * BUCKET_RATIO ** index
+    return 0.0
+
+
+def summarize(key, entry):
+    return {
+        'fingerprint': key[0],
+        'view': entry['view'],
+        'count': entry['count'],
+        'total_ms': round(entry['total_ms'], 3),
+        'mean_ms': round(entry['total_ms'] / entry['count'], 3),
+        'p99_ms': round(min(percentile(entry['histogram'], 0.99), entry['max_ms']), 3),
+        'max_ms': round(entry['max_ms'], 3),
+        'sql': entry['fingerprint_sql'],
+        'example': entry['example'],
+    }
+
+
+def top(limit=20):
+    """Top-N por tempo total e por p99 de todos os processos"""
+    merged, processes = collect()
+    rows = [summarize(key, entry) for key, entry in merged.items()]
+    return {
+        'sample_rate': settings.RESERVAS_QUERYLOG_SAMPLE_RATE,
+        'processes': processes,
+        'fingerprints': len(rows),
+        'by_total': sorted(rows, key=lambda row: row['total_ms'], reverse=True)[:limit],
+        'by_p99': sorted(rows, key=lambda row: row['p99_ms'], reverse=True)[:limit],
+    }
@@ -0,0 +1,51 @@
+"""Renderers JSON da API.
+
+TimedJSONRenderer (o padrão) é o JSONRenderer do DRF com o tempo de renderização medido para o
+Server-Timing e o /metrics (reservas.metrics). FastJSONRenderer usa orjson: mesmos bytes do renderer
+do DRF, bem menos tempo por resposta; só as views do caminho rápido opcional (listagens de reservas
+com RESERVAS_FAST_SERIALIZATION ou ?fast=1) o usam.
+
+No FastJSONRenderer, o orjson só entra quando a saída seria compacta e em UTF-8 (o padrão do DRF) e sem indentação
+(a API navegável pede indent e continua no json da stdlib). Tipos que o orjson não conhece
+(Decimal, lazy strings, ...) e datetimes passam pelo mesmo encoder do DRF; inteiros grandes
+demais para ele caem no renderer original. Única diferença conhecida: floats fora de [1e-4, 1e16)
+saem sem o "+"/zeros do expoente (1e16 em vez de 1e+16) e NaN vira null; as respostas da API só
+têm floats em distance_km, arredondado a metros.
+"""
+from rest_framework.renderers import JSONRenderer
+
+from .metrics import phase
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependência opcional
+    orjson = None
+
+
+class TimedJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with phase('render'):
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+class FastJSONRenderer(TimedJSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # phase() aninhado conta uma vez só: os fallbacks para o renderer do DRF não medem em dobro
+        with phase('render'):
+            if (
+                orjson is None or data is None or self.ensure_ascii or not self.compact
+                or self.get_indent(accepted_media_type, renderer_context or {})
+            ):
+                return super().render(data, accepted_media_type, renderer_context)
+            try:
+                ret = orjson.dumps(
+                    data,
+                    default=self.encoder_class().default,
+                    option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+                )
+            except TypeError:
+                return super().render(data, accepted_media_type, renderer_context)
+            # Como o DRF: U+2028/U+2029 escapados, válidos dentro de <script>
+            return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
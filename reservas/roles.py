@@ -0,0 +1,58 @@
+import time
+
+OWNER = 'owner'
+CUSTOMER = 'customer'
+
+# Grupo do Django que define cada papel, em ordem de precedência
+ROLE_GROUPS = (
+    ('owners', OWNER),
+    ('customers', CUSTOMER),
+)
+
+
+def role_from_groups(group_names):
+    group_names = set(group_names)
+    for group_name, role in ROLE_GROUPS:
+        if group_name in group_names:
+            return role
+    return None
+
+
+def get_role(user):
+    """Papel do usuário ('owner', 'customer' ou None), memoizado na própria instância (user._role).
+
+    Com o RoleJWTAuthentication o valor já vem da claim do token; sem ele, uma única consulta aos grupos.
+    """
+    if user is None or not user.is_authenticated:
+        return None
+    if not hasattr(user, '_role'):
+        user._role = role_from_groups(user.groups.values_list('name', flat=True))
+    return user._role
+
+
+async def aget_role(user):
+    """get_role() para código assíncrono; depois dela is_owner/is_customer leem o valor memoizado"""
+    if user is None or not user.is_authenticated:
+        return None
+    if not hasattr(user, '_role'):
+        user._role = role_from_groups([name async for name in user.groups.values_list('name', flat=True)])
+    return user._role
+
+
+def forget_role(user):
+    user.__dict__.pop('_role', None)
+
+
+def is_owner(user):
+    return get_role(user) == OWNER
+
+
+def is_customer(user):
+    return get_role(user) == CUSTOMER
+
+
+def add_role_claims(token, user):
+    """Grava o papel no token com o instante em que foi calculado (role_at, epoch em segundos)"""
+    token['role'] = get_role(user)
+    token['role_at'] = time.time()
+    return token
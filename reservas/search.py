@@ -0,0 +1,166 @@
+"""Busca de locais: texto (FTS5 no SQLite) + filtros de faixa indexados.
+
+O índice textual é a tabela virtual `reservas_location_fts` (conteúdo externo sobre reservas_location),
+mantida por triggers no próprio banco (migração 0014): qualquer escrita em Location, inclusive
+bulk_create e update(), já atualiza o índice. Em outros bancos a busca textual cai para icontains.
+"""
+import re
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.db import connection
+from django.db.models import Count, Max, Min, Q
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'reservas_location_fts'
+
+# Pesos do bm25 por coluna do índice (name, description, address): nome pesa mais
+BM25_WEIGHTS = (10.0, 1.0, 4.0)
+
+MAX_TERMS = 8
+
+_TERM = re.compile(r'\w+', re.UNICODE)
+
+
+# Índice de conteúdo externo: guarda só os tokens; o texto continua em reservas_location.
+# Os triggers acompanham as escritas (inclusive bulk_create e update()). Atenção: quando o Django
+# recria a tabela reservas_location numa migração (AlterField no SQLite), os triggers somem junto;
+# rode `manage.py rebuild_location_search` depois dela.
+FTS_SCHEMA = (
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, description, address,
+        content='reservas_location', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON reservas_location BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, description, address)
+        VALUES (new.id, new.name, new.description, new.address);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON reservas_location BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description, address)
+        VALUES ('delete', old.id, old.name, old.description, old.address);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF name, description, address ON reservas_location BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description, address)
+        VALUES ('delete', old.id, old.name, old.description, old.address);
+        INSERT INTO {FTS_TABLE}(rowid, name, description, address)
+        VALUES (new.id, new.name, new.description, new.address);
+    END""",
+)
+FTS_DROP = (
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+)
+
+
+class SearchQueryError(ValueError):
+    pass
+
+
+def fts_enabled(using=None):
+    return (using or connection).vendor == 'sqlite'
+
+
+def install_search_index(using=None, rebuild=True):
+    """Cria (se faltar) a tabela FTS5 e os triggers e, com rebuild, reindexa todos os locais"""
+    using = using or connection
+    if not fts_enabled(using):
+        return False
+    with using.cursor() as cursor:
+        for statement in FTS_SCHEMA:
+            cursor.execute(statement)
+        if rebuild:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    return True
+
+
+def drop_search_index(using=None):
+    using = using or connection
+    if fts_enabled(using):
+        with using.cursor() as cursor:
+            for statement in FTS_DROP:
+                cursor.execute(statement)
+
+
+def search_terms(text):
+    return _TERM.findall(text or '')[:MAX_TERMS]
+
+
+def match_expression(terms):
+    """Termos do usuário como prefixos entre aspas ("quadra"* AND "centro"*): nada da sintaxe FTS5 vaza"""
+    return ' AND '.join(f'"{term}"*' for term in terms)
+
+
+def _parse(params, name, convert, label):
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return convert(value)
+    except (ValueError, TypeError, InvalidOperation):
+        raise SearchQueryError(f"'{name}' inválido: use {label}.")
+
+
+def _time(value):
+    return datetime.strptime(value, '%H:%M').time()
+
+
+def parse_filters(params):
+    """Filtros de faixa da busca -> kwargs do ORM (todos cobertos pelos índices parciais de Location)"""
+    filters = {}
+    for name, lookup, convert, label in (
+        ('min_price', 'price_per_hour__gte', Decimal, 'um valor numérico'),
+        ('max_price', 'price_per_hour__lte', Decimal, 'um valor numérico'),
+        ('min_duration', 'max_duration__gte', int, 'um número inteiro de horas'),
+        ('opens_by', 'operating_hours_start__lte', _time, 'HH:MM'),
+        ('closes_after', 'operating_hours_end__gte', _time, 'HH:MM'),
+    ):
+        value = _parse(params, name, convert, label)
+        if value is not None:
+            filters[lookup] = value
+    return filters
+
+
+def search_locations(queryset, params, rank=True):
+    """Aplica texto (?q=) e faixas ao queryset.
+
+    Com rank=True e texto, junta o índice FTS5 e ordena pela relevância (bm25) e depois id; com
+    rank=False o texto vira só um filtro (id IN ...), próprio para agregações.
+    """
+    queryset = queryset.filter(**parse_filters(params))
+    terms = search_terms(params.get('q'))
+    if not terms:
+        return queryset.order_by('-created_at', 'id')
+
+    if not fts_enabled():
+        for term in terms:
+            queryset = queryset.filter(
+                Q(name__icontains=term) | Q(description__icontains=term) | Q(address__icontains=term)
+            )
+        return queryset.order_by('-created_at', 'id')
+
+    match = match_expression(terms)
+    if not rank:
+        return queryset.filter(id__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match]))
+
+    # O MATCH usa o índice FTS5 e o join por rowid cai na chave primária de reservas_location;
+    # bm25() lê a linha do índice que o join trouxe
+    weights = ', '.join(str(weight) for weight in BM25_WEIGHTS)
+    return (
+        queryset.filter(search_index__document=match)
+        .annotate(search_rank=RawSQL(f'bm25({FTS_TABLE}, {weights})', []))
+        .order_by('search_rank', 'id')
+    )
+
+
+def search_facets(queryset, params):
+    """Faixa de preço e contagem por duração máxima sobre o resultado inteiro (duas consultas agregadas)"""
+    queryset = search_locations(queryset, params, rank=False).order_by()
+    price = queryset.aggregate(min=Min('price_per_hour'), max=Max('price_per_hour'))
+    durations = queryset.values('max_duration').annotate(count=Count('id')).order_by('max_duration')
+    return {
+        # Mesmo formato do DecimalField serializado (2 casas)
+        'price_per_hour': {key: f'{value:.2f}' if value is not None else None for key, value in price.items()},
+        'max_duration': {str(row['max_duration']): row['count'] for row in durations},
+    }
@@ -1,8 +1,17 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User, Group
+from django.conf import settings
+from django.db import transaction
 from .models import UserProfile, Reservation, Location, Payment, LocationImage
+from .availability import DayAgenda, to_minutes
+from .roles import add_role_claims
+from .images import save_location_images, variant_urls
+from .fieldsets import SparseFieldsMixin
+from .metrics import TimedSerializerMixin
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from django.utils import timezone
 from datetime import timedelta
+from decimal import Decimal
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
@@ -29,18 +38,33 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         group = Group.objects.get_or_create(name=f"{user_type}s")[0]
         user.groups.add(group)
 
-        # cria o perfil manualmente
-        UserProfile.objects.create(user=user, phone=phone, cpf=cpf)
+        # o perfil já é criado pelo signal post_save de User; aqui só completa os dados
+        UserProfile.objects.update_or_create(user=user, defaults={'phone': phone, 'cpf': cpf})
 
         return user
 
-class LocationSerializer(serializers.ModelSerializer):
+class RoleTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Login: inclui o papel do usuário (claim `role`) no refresh e no access token"""
+
+    @classmethod
+    def get_token(cls, user):
+        return add_role_claims(super().get_token(user), user)
+
+def validate_coordinates(attrs, instance=None):
+    """Latitude e longitude vêm juntas (ou nenhuma) e dentro dos intervalos válidos"""
+    latitude = attrs.get('latitude', getattr(instance, 'latitude', None))
+    longitude = attrs.get('longitude', getattr(instance, 'longitude', None))
+    if (latitude is None) != (longitude is None):
+        raise serializers.ValidationError("Informe latitude e longitude juntas.")
+    if latitude is not None and not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise serializers.ValidationError("Coordenadas fora do intervalo válido.")
+    return attrs
+
+class LocationSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
 
     images = serializers.SerializerMethodField()
+    image_variants = serializers.SerializerMethodField()
 
-    def get_images(self, obj):
-        return [image.image_url for image in obj.images.all()]
-    
     class Meta:
         model = Location
         fields = [
@@ -56,10 +80,16 @@ class LocationSerializer(serializers.ModelSerializer):
             'is_active',
             'created_at',
             'owner',
+            'latitude',
+            'longitude',
             'images',
+            'image_variants',
         ]
         read_only_fields = ['owner', 'id', 'is_active', 'created_at']
 
+    def validate(self, attrs):
+        return validate_coordinates(attrs, self.instance)
+
     def get_images(self, obj):
         request = self.context.get('request')
         return [
@@ -67,6 +97,10 @@ class LocationSerializer(serializers.ModelSerializer):
             for image in obj.images.all()
             if image.image
         ]
+
+    def get_image_variants(self, obj):
+        request = self.context.get('request')
+        return [variant_urls(image, request) for image in obj.images.all() if image.image]
     
 class LocationImageSerializer(serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
@@ -81,6 +115,38 @@ class LocationImageSerializer(serializers.ModelSerializer):
             return request.build_absolute_uri(obj.image.url)
         return None
     
+def validate_image_batch(images):
+    """Limites por requisição: quantidade de imagens, tamanho de cada uma e total"""
+    max_count = settings.RESERVAS_MAX_IMAGES_PER_REQUEST
+    max_size = settings.RESERVAS_MAX_IMAGE_SIZE
+    if len(images) > max_count:
+        raise serializers.ValidationError(f"Envie no máximo {max_count} imagens por requisição.")
+    too_big = [image.name for image in images if image.size > max_size]
+    if too_big:
+        raise serializers.ValidationError(
+            f"Imagens acima de {max_size // (1024 * 1024)} MB: {', '.join(too_big)}."
+        )
+    if sum(image.size for image in images) > settings.RESERVAS_MAX_UPLOAD_SIZE:
+        raise serializers.ValidationError("Tamanho total das imagens acima do limite.")
+    return images
+
+class LocationImageBatchSerializer(serializers.Serializer):
+    location = serializers.PrimaryKeyRelatedField(queryset=Location.objects.none())
+    images = serializers.ListField(child=serializers.ImageField(), allow_empty=False)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Só os locais do próprio owner
+        request = self.context.get('request')
+        if request is not None:
+            self.fields['location'].queryset = Location.objects.filter(owner=request.user)
+
+    def validate_images(self, images):
+        return validate_image_batch(images)
+
+    def create(self, validated_data):
+        return save_location_images(validated_data['location'], validated_data['images'])
+
 class LocationCreateSerializer(serializers.ModelSerializer):
     images = serializers.ListField(
         child=serializers.ImageField(),
@@ -92,25 +158,30 @@ class LocationCreateSerializer(serializers.ModelSerializer):
         fields = [
             'name', 'description', 'address', 'price_per_hour',
             'operating_hours_start', 'operating_hours_end',
-            'cancellation_hours', 'max_duration', 'images'
+            'cancellation_hours', 'max_duration', 'latitude', 'longitude', 'images'
         ]
 
+    def validate_images(self, images):
+        return validate_image_batch(images)
+
+    def validate(self, attrs):
+        return validate_coordinates(attrs)
+
+    @transaction.atomic
     def create(self, validated_data):
         images = validated_data.pop('images')
         owner = self.context['request'].user
         location = Location.objects.create(owner=owner, **validated_data)
-
-        for image in images:
-            LocationImage.objects.create(location=location, image=image)
-
+        save_location_images(location, images)
         return location
     
-class ReservationSerializer(serializers.ModelSerializer):
+class ReservationSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     location_name = serializers.CharField(source='location.name', read_only=True)
     location_address = serializers.CharField(source='location.address', read_only=True)
     location_description = serializers.CharField(source='location.description', read_only=True)
     local_cancelado = serializers.SerializerMethodField()
     location_images = serializers.SerializerMethodField()
+    location_image_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Reservation
@@ -128,6 +199,7 @@ class ReservationSerializer(serializers.ModelSerializer):
             'created_at',
             'local_cancelado',
             'location_images',
+            'location_image_variants',
         ]
 
     def get_local_cancelado(self, obj):
@@ -136,6 +208,32 @@ class ReservationSerializer(serializers.ModelSerializer):
     def get_location_images(self, obj):
         return [img.image.url for img in obj.location.images.all()]
 
+    def get_location_image_variants(self, obj):
+        # Mesmo formato relativo de location_images
+        return [variant_urls(img) for img in obj.location.images.all() if img.image]
+
+def schedule_error(location, date, start_time, end_time):
+    """Mensagem da primeira regra de horário violada (ou None); também usada pela importação em lote"""
+    from datetime import datetime, timedelta
+
+    if start_time >= end_time:
+        return "O horário de início deve ser anterior ao de término."
+
+    # 🔸 Verifica se horário está dentro do funcionamento do local
+    if start_time < location.operating_hours_start or end_time > location.operating_hours_end:
+        return "Horário fora do horário de funcionamento do local."
+
+    # 🔸 Verifica duração máxima
+    duration = datetime.combine(date, end_time) - datetime.combine(date, start_time)
+    if duration > timedelta(hours=location.max_duration):
+        return f"Duração excede o máximo permitido de {location.max_duration} horas."
+    return None
+
+def reservation_price(location, start_time, end_time):
+    """Preço por hora proporcional aos minutos reservados, em centavos; também usado pela importação em lote"""
+    minutes = to_minutes(end_time) - to_minutes(start_time)
+    return (location.price_per_hour * minutes / 60).quantize(Decimal('0.01'))
+
 class ReservationCreateSerializer(serializers.ModelSerializer):
     payment_method = serializers.ChoiceField(choices=Payment.PaymentMethod.choices, write_only=True)
     pagamento_status = serializers.ChoiceField(choices=Payment.PaymentStatus.choices, write_only=True, required=False)
@@ -149,7 +247,7 @@ class ReservationCreateSerializer(serializers.ModelSerializer):
         return ReservationSerializer(instance, context=self.context).data
     
     def validate(self, data):
-        from datetime import datetime, timedelta
+        from datetime import datetime
 
         user = self.context['request'].user
         location = data['location']
@@ -157,56 +255,50 @@ class ReservationCreateSerializer(serializers.ModelSerializer):
         start_time = data['start_time']
         end_time = data['end_time']
 
-        if start_time >= end_time:
-            raise serializers.ValidationError("O horário de início deve ser anterior ao de término.")
-
-        # 🔸 Verifica se horário está dentro do funcionamento do local
-        if start_time < location.operating_hours_start or end_time > location.operating_hours_end:
-            raise serializers.ValidationError("Horário fora do horário de funcionamento do local.")
-
-        # 🔸 Verifica duração máxima
-        duration = datetime.combine(date, end_time) - datetime.combine(date, start_time)
-        max_duration = timedelta(hours=location.max_duration)
-        if duration > max_duration:
-            raise serializers.ValidationError(f"Duração excede o máximo permitido de {location.max_duration} horas.")
+        # 🔸 Ordem dos horários, horário de funcionamento e duração máxima
+        error = schedule_error(location, date, start_time, end_time)
+        if error:
+            raise serializers.ValidationError(error)
 
         # 🔸 Verifica se data/hora está no futuro
         now = datetime.now()
         if datetime.combine(date, start_time) <= now:
             raise serializers.ValidationError("Não é possível fazer reservas no passado.")
 
-        # 🔸 Verifica conflitos com outras reservas
-        conflicts = Reservation.objects.filter(
-            location=location,
-            date=date,
-            status='confirmed',
-        ).filter(
-            start_time__lt=end_time,
-            end_time__gt=start_time
-        )
-        if conflicts.exists():
-            raise serializers.ValidationError("Conflito com outra reserva existente neste horário.")
+        # 🔸 Verifica conflitos com outras reservas ativas (pendentes e confirmadas), mesma regra do available_slots
+        self.check_conflicts(location, date, start_time, end_time)
 
         return data
 
+    def check_conflicts(self, location, date, start_time, end_time):
+        if DayAgenda.for_day(location.id, date).conflicts_with(start_time, end_time):
+            raise serializers.ValidationError("Conflito com outra reserva existente neste horário.")
+
     def create(self, validated_data):
         user = self.context['request'].user
         payment_method = validated_data.pop('payment_method')
         pagamento_status = validated_data.pop('pagamento_status', Payment.PaymentStatus.PENDENTE)
 
-        reserva = Reservation.objects.create(user=user, status=Reservation.Status.PENDENTE, **validated_data)
-
-        valor = reserva.location.price_per_hour * ((reserva.end_time.hour - reserva.start_time.hour))
-        pagamento = Payment.objects.create(
-            reservation=reserva,
-            method=payment_method,
-            status=pagamento_status,
-            valor=valor
-        )
-
-        if pagamento.status == Payment.PaymentStatus.PAGO:
-            reserva.status = Reservation.Status.CONFIRMADA
-            reserva.save()
+        with transaction.atomic():
+            # Trava a linha do local: reservas concorrentes para o mesmo local esperam o commit desta,
+            # e o conflito é conferido de novo já com a trava (o validate roda antes, sem trava)
+            location = Location.objects.select_for_update().get(pk=validated_data['location'].pk)
+            self.check_conflicts(location, validated_data['date'], validated_data['start_time'], validated_data['end_time'])
+
+            reserva = Reservation.objects.create(user=user, status=Reservation.Status.PENDENTE, **validated_data)
+
+            # Slots de 15/30 minutos: cobra pelos minutos, não pelas horas cheias
+            valor = reservation_price(location, reserva.start_time, reserva.end_time)
+            pagamento = Payment.objects.create(
+                reservation=reserva,
+                method=payment_method,
+                status=pagamento_status,
+                valor=valor
+            )
+
+            if pagamento.status == Payment.PaymentStatus.PAGO:
+                reserva.status = Reservation.Status.CONFIRMADA
+                reserva.save()
 
         return reserva
 
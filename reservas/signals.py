@@ -1,9 +1,123 @@
-from django.db.models.signals import post_save
+import threading
+
+from django.db.models.signals import post_save, post_init, post_delete, pre_delete, m2m_changed
 from django.contrib.auth.models import User, Group
 from django.dispatch import receiver
-from .models import UserProfile
+from django.utils import timezone
+from .models import UserProfile, Reservation, Location, LocationImage
+from .cache import invalidate
+from .images import schedule_variants
+from .occupancy import refresh_occupancy
+from .dashboard import ensure_stats, apply_delta, move_status, sync_owner
+from .roles import forget_role
+
+# Locais sendo excluídos nesta thread (o Collector manda todos os pre_delete antes de excluir qualquer linha)
+_deleting = threading.local()
+
+def deleting_locations():
+    if not hasattr(_deleting, 'ids'):
+        _deleting.ids = set()
+    return _deleting.ids
 
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
     if created:
         UserProfile.objects.create(user=instance)
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_cached_role(sender, instance, action, reverse, pk_set, **kwargs):
+    # Mudança de grupos invalida o papel memoizado e a claim `role` dos tokens já emitidos
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        forget_role(instance)
+        user_ids = [instance.pk]
+    elif action == 'pre_clear':
+        user_ids = list(instance.user_set.values_list('id', flat=True))
+    else:
+        user_ids = list(pk_set or ())
+    changed_at = timezone.now()
+    for user_id in user_ids:
+        UserProfile.objects.update_or_create(user_id=user_id, defaults={'roles_updated_at': changed_at})
+
+@receiver(post_init, sender=Reservation)
+def remember_original_state(sender, instance, **kwargs):
+    # Guarda local/data/status originais para atualizar também o dia antigo e os contadores do dashboard
+    instance._original = (
+        instance.__dict__.get('location_id'), instance.__dict__.get('date'), instance.__dict__.get('status')
+    )
+
+@receiver(post_save, sender=Reservation)
+def update_occupancy_on_save(sender, instance, created, **kwargs):
+    key = (instance.location_id, instance.date)
+    old_location, old_date, _ = getattr(instance, '_original', (None, None, None))
+    refresh_occupancy(*key)
+    if not created and None not in (old_location, old_date) and (old_location, old_date) != key:
+        refresh_occupancy(old_location, old_date)
+
+@receiver(post_save, sender=Reservation)
+def update_stats_on_save(sender, instance, created, **kwargs):
+    old_location, _, old_status = getattr(instance, '_original', (None, None, None))
+    if created or old_location is None:
+        apply_delta(instance.location_id, instance.status, 1)
+    elif old_location != instance.location_id:
+        apply_delta(old_location, old_status, -1)
+        apply_delta(instance.location_id, instance.status, 1)
+    else:
+        move_status(instance.location_id, old_status, instance.status)
+
+@receiver(post_delete, sender=Reservation)
+def update_occupancy_on_delete(sender, instance, **kwargs):
+    refresh_occupancy(instance.location_id, instance.date)
+
+@receiver(pre_delete, sender=Location)
+def mark_location_deleting(sender, instance, **kwargs):
+    deleting_locations().add(instance.pk)
+
+@receiver(post_delete, sender=Location)
+def unmark_location_deleting(sender, instance, **kwargs):
+    deleting_locations().discard(instance.pk)
+
+@receiver(post_delete, sender=Reservation)
+def update_stats_on_delete(sender, instance, **kwargs):
+    # Cascata da exclusão do local (location.delete(), queryset de locais, exclusão do owner):
+    # a linha de estatísticas já foi junto e recriá-la quebraria a FK no commit
+    if instance.location_id in deleting_locations():
+        return
+    _, _, old_status = getattr(instance, '_original', (None, None, instance.status))
+    apply_delta(instance.location_id, old_status, -1)
+
+@receiver(post_save, sender=Location)
+def create_location_stats(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        ensure_stats(instance)
+    elif update_fields is None or 'owner' in update_fields or 'owner_id' in update_fields:
+        sync_owner(instance)
+
+@receiver(post_save, sender=Reservation)
+@receiver(post_delete, sender=Reservation)
+def invalidate_availability_cache(sender, instance, **kwargs):
+    invalidate(instance.location_id, availability=True)
+    old_location = getattr(instance, '_original', (None,))[0]
+    if old_location is not None and old_location != instance.location_id:
+        invalidate(old_location, availability=True)
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_location_cache(sender, instance, **kwargs):
+    invalidate(instance.pk, availability=True, data=True, listing=True)
+
+@receiver(post_save, sender=LocationImage)
+def generate_location_image_variants(sender, instance, created, **kwargs):
+    if created and instance.image:
+        schedule_variants(instance.pk)
+
+@receiver(post_save, sender=LocationImage)
+@receiver(post_delete, sender=LocationImage)
+def invalidate_location_image_cache(sender, instance, **kwargs):
+    invalidate(instance.location_id, data=True, listing=True)
+
+# Precisa ser o último receiver de post_save de Reservation: os anteriores ainda leem o estado original
+@receiver(post_save, sender=Reservation)
+def remember_saved_state(sender, instance, **kwargs):
+    instance._original = (instance.location_id, instance.date, instance.status)
@@ -1,6 +1,9 @@
 import pytest
+from django.core.cache import cache
 from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import RefreshToken
+from reservas.cache import reset_cache_stats
+from reservas.querylog import reset_querylog
 from reservas.tests.factories import UserFactory
 
 @pytest.fixture
@@ -12,4 +15,13 @@ def authenticated_client(api_client):
     user = UserFactory()
     refresh = RefreshToken.for_user(user)
     api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
-    return api_client
\ No newline at end of file
+    return api_client
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # O LocMemCache sobrevive entre testes e os ids se repetem a cada rollback
+    cache.clear()
+    reset_cache_stats()
+    reset_querylog()
+    yield
+    cache.clear()
@@ -0,0 +1,38 @@
+"""Orçamento de consultas SQL por endpoint.
+
+Cada endpoint de listagem tem um número máximo de consultas, que não pode crescer com o número
+de linhas retornadas. run_with_budget falha o teste quando o orçamento é estourado.
+"""
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reservas.serializers import RoleTokenObtainPairSerializer
+
+# Consultas por requisição (incluindo a do usuário autenticado), independente do tamanho da resposta
+QUERY_BUDGETS = {
+    '/api/locations/': 3,
+    '/api/locations/{location}/': 3,
+    '/api/reservations/': 3,
+    '/api/customer/reservations/': 3,
+    '/api/owner/dashboard/': 2,
+}
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def authenticate(client, user):
+    """Autentica com um token igual ao do login, para o orçamento contar o caminho real de autenticação"""
+    access = RoleTokenObtainPairSerializer.get_token(user).access_token
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+    return client
+
+
+def run_with_budget(client, url, budget):
+    """Faz o GET e devolve (response, consultas executadas); falha se passar de `budget`"""
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    if len(context) > budget:
+        queries = '\n'.join(query['sql'] for query in context.captured_queries)
+        raise QueryBudgetExceeded(f"{url}: {len(context)} consultas, orçamento de {budget}.\n{queries}")
+    return response, len(context)
@@ -19,7 +19,7 @@ def test_location_list_api(authenticated_client):
     LocationFactory.create_batch(3)
     response = authenticated_client.get('/api/locations/')
     assert response.status_code == 200
-    assert len(response.data) == 3  # Paginação pode alterar isso
+    assert len(response.data['results']) == 3
 
 @pytest.mark.django_db
 def test_create_reservation(authenticated_client):
@@ -0,0 +1,62 @@
+import pytest
+from datetime import date, time, timedelta
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from reservas.tests.factories import UserFactory, LocationFactory, ReservationFactory
+
+def bearer(user):
+    return {'Authorization': f'Bearer {RefreshToken.for_user(user).access_token}'}
+
+def both(url, headers=None):
+    """Mesma requisição pela view DRF (WSGI) e pelo handler assíncrono (ASGI)"""
+    sync_response = APIClient().get(url, headers=headers)
+    async_response = async_to_sync(AsyncClient().get)(url, headers=headers)
+    return sync_response, async_response
+
+@pytest.mark.django_db
+def test_async_handlers_match_drf_views():
+    owner, customer = UserFactory(groups=['owners']), UserFactory(groups=['customers'])
+    location = LocationFactory(owner=owner, latitude='-23.550520', longitude='-46.633309')
+    LocationFactory(owner=owner, is_active=False)
+    day = date.today() + timedelta(days=2)
+    ReservationFactory(location=location, user=customer, date=day, start_time=time(9, 0), end_time=time(10, 0))
+
+    urls = [
+        ('/api/locations/', {}),
+        ('/api/locations/?page_size=1', bearer(owner)),
+        ('/api/locations/?near=-23.55,-46.63&radius=3', {}),
+        ('/api/locations/?fields=id,name,images', {}),
+        (f'/api/locations/{location.id}/?omit=images,image_variants', {}),
+        (f'/api/locations/{location.id}/', {}),
+        (f'/api/locations/{location.id}/available-slots/?date={day}', {}),
+        (f'/api/locations/{location.id}/available-slots/?from={day}&to={day}&encoding=rle', {}),
+        ('/api/customer/reservations/', bearer(customer)),
+        ('/api/customer/reservations/?fields=id,status,local_cancelado', bearer(customer)),
+    ]
+    for url, headers in urls:
+        sync_response, async_response = both(url, headers)
+        assert async_response.status_code == sync_response.status_code == 200, url
+        assert async_response.content == sync_response.content, url
+        if 'ETag' in sync_response:
+            assert async_response['ETag'] == sync_response['ETag'], url
+
+@pytest.mark.django_db
+def test_async_handlers_keep_auth_and_visibility_rules():
+    owner = UserFactory(groups=['owners'])
+    hidden = LocationFactory(is_active=False)
+
+    _, response = both('/api/customer/reservations/')
+    assert response.status_code == 401
+    assert response['WWW-Authenticate'] == 'Bearer realm="api"'
+
+    sync_response, async_response = both('/api/locations/', {'Authorization': 'Bearer invalido'})
+    assert async_response.status_code == sync_response.status_code == 401
+    assert async_response.content == sync_response.content
+
+    sync_response, async_response = both(f'/api/locations/{hidden.id}/', bearer(owner))
+    assert sync_response.status_code == async_response.status_code == 404
+
+    etag = async_to_sync(AsyncClient().get)('/api/locations/')['ETag']
+    assert async_to_sync(AsyncClient().get)('/api/locations/', headers={'If-None-Match': etag}).status_code == 304
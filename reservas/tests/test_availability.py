@@ -0,0 +1,121 @@
+import pytest
+from datetime import date, time, timedelta
+from reservas.availability import DayAgenda
+from reservas.serializers import ReservationCreateSerializer
+from reservas.tests.factories import ReservationFactory, LocationFactory, UserFactory
+
+@pytest.mark.django_db
+def test_available_slots_range_for_one_location(authenticated_client, django_assert_max_num_queries):
+    location = LocationFactory(operating_hours_start='08:00', operating_hours_end='12:00')
+    day = date.today() + timedelta(days=1)
+    ReservationFactory(location=location, date=day, start_time=time(9, 0), end_time=time(11, 0), status='pendente')
+
+    url = f'/api/locations/{location.id}/available-slots/?from={day}&to={day + timedelta(days=1)}'
+    with django_assert_max_num_queries(4):
+        response = authenticated_client.get(url)
+
+    assert response.status_code == 200, response.data
+    days = response.data['locations'][str(location.id)]
+    assert days[day.isoformat()] == ["08:00", "11:00", "12:00"]
+    assert days[(day + timedelta(days=1)).isoformat()] == ["08:00", "09:00", "10:00", "11:00", "12:00"]
+
+@pytest.mark.django_db
+def test_available_slots_bulk_encodings(authenticated_client):
+    first = LocationFactory(operating_hours_start='08:00', operating_hours_end='12:00')
+    second = LocationFactory(operating_hours_start='10:00', operating_hours_end='11:00')
+    day = date.today() + timedelta(days=1)
+    ReservationFactory(location=first, date=day, start_time=time(9, 0), end_time=time(11, 0), status='confirmed')
+
+    url = f'/api/locations/available-slots/?from={day}&to={day}&locations={first.id},{second.id}'
+    rle = authenticated_client.get(url + '&encoding=rle').data['locations']
+    bitmask = authenticated_client.get(url + '&encoding=bitmask').data['locations']
+
+    assert rle[str(first.id)][day.isoformat()] == [[8, 1], [11, 2]]
+    assert rle[str(second.id)][day.isoformat()] == [[10, 2]]
+    assert bitmask[str(first.id)][day.isoformat()] == (1 << 8) | (1 << 11) | (1 << 12)
+
+@pytest.mark.django_db
+def test_available_slots_bulk_requires_a_bounded_location_list(authenticated_client, settings):
+    settings.RESERVAS_MAX_BULK_LOCATIONS = 2
+    day = date.today() + timedelta(days=1)
+    url = f'/api/locations/available-slots/?from={day}&to={day}'
+
+    assert authenticated_client.get(url).status_code == 400
+    assert authenticated_client.get(url + '&locations=1,2,3').status_code == 400
+    assert authenticated_client.get(url + '&locations=1,x').status_code == 400
+
+@pytest.mark.django_db
+def test_available_slots_range_rejects_long_windows(authenticated_client):
+    location = LocationFactory()
+    response = authenticated_client.get(f'/api/locations/{location.id}/available-slots/?from=2030-01-01&to=2030-12-31')
+    assert response.status_code == 400
+
+def test_day_agenda_merges_and_detects_conflicts():
+    agenda = DayAgenda([(600, 660), (540, 600), (900, 945)])
+
+    assert agenda.intervals == [[540, 660], [900, 945]]
+    assert agenda.conflicts(630, 700)
+    assert agenda.conflicts(930, 1000)
+    assert not agenda.conflicts(660, 900)
+    assert not agenda.conflicts(945, 960)
+
+@pytest.mark.django_db
+def test_available_slots_with_sub_hour_slots(authenticated_client):
+    location = LocationFactory(operating_hours_start='08:00', operating_hours_end='10:00')
+    day = date.today() + timedelta(days=1)
+    ReservationFactory(location=location, date=day, start_time=time(8, 30), end_time=time(9, 15), status='pendente')
+
+    response = authenticated_client.get(f'/api/locations/{location.id}/available-slots/?date={day}&slot_minutes=15')
+
+    assert response.status_code == 200, response.data
+    assert response.data['available_slots'] == ["08:00", "08:15", "09:15", "09:30", "09:45", "10:00"]
+
+@pytest.mark.django_db
+def test_pending_reservation_blocks_new_booking():
+    location = LocationFactory(operating_hours_start='08:00', operating_hours_end='23:30')
+    tomorrow = date.today() + timedelta(days=1)
+    ReservationFactory(location=location, date=tomorrow, start_time=time(14, 0), end_time=time(14, 30), status='pendente')
+
+    data = {
+        "location": location.id,
+        "date": tomorrow.isoformat(),
+        "start_time": "14:15",
+        "end_time": "15:00",
+        "payment_method": "pix"
+    }
+    serializer = ReservationCreateSerializer(data=data, context={'request': type('obj', (), {'user': UserFactory()})})
+
+    assert not serializer.is_valid()
+    assert "Conflito com outra reserva" in str(serializer.errors)
+
+@pytest.mark.django_db
+def test_free_locations_in_one_anti_join(api_client, django_assert_max_num_queries):
+    day = date.today() + timedelta(days=1)
+    free = LocationFactory(name='Livre', operating_hours_start='08:00', operating_hours_end='22:00')
+    touching = LocationFactory(name='Encostada', operating_hours_start='08:00', operating_hours_end='22:00')
+    with_cancelled = LocationFactory(name='Cancelada', operating_hours_start='08:00', operating_hours_end='22:00')
+    busy = LocationFactory(name='Ocupada', operating_hours_start='08:00', operating_hours_end='22:00')
+    LocationFactory(name='Fecha cedo', operating_hours_start='08:00', operating_hours_end='20:00')
+    LocationFactory(name='Duração curta', operating_hours_start='08:00', operating_hours_end='22:00', max_duration=1)
+    LocationFactory(name='Inativa', operating_hours_start='08:00', operating_hours_end='22:00', is_active=False)
+    ReservationFactory(location=touching, date=day, start_time=time(17, 0), end_time=time(19, 0))
+    ReservationFactory(location=with_cancelled, date=day, start_time=time(19, 0), end_time=time(20, 0), status='cancelled')
+    ReservationFactory(location=busy, date=day, start_time=time(20, 0), end_time=time(22, 0), status='confirmed')
+    ReservationFactory(location=free, date=day + timedelta(days=1), start_time=time(19, 0), end_time=time(21, 0))
+
+    url = f'/api/locations/free/?date={day}&start=19:00&end=21:00'
+    with django_assert_max_num_queries(2) as captured:
+        response = api_client.get(url)
+
+    assert response.status_code == 200, response.data
+    assert sorted(row['name'] for row in response.data['results']) == ['Cancelada', 'Encostada', 'Livre']
+    assert 'NOT EXISTS' in captured.captured_queries[0]['sql']
+
+    page = api_client.get(url + '&page_size=2').data
+    assert len(page['results']) == 2
+    assert len(api_client.get(page['next']).data['results']) == 1
+
+@pytest.mark.django_db
+def test_free_locations_validates_window(api_client):
+    assert api_client.get('/api/locations/free/?date=2030-01-01&start=21:00&end=19:00').status_code == 400
+    assert api_client.get('/api/locations/free/?date=2030-01-01&start=7h').status_code == 400
@@ -0,0 +1,114 @@
+import pytest
+from datetime import date, time, timedelta
+from rest_framework.test import APIClient
+from reservas.cache import cache_stats
+from reservas.tests.factories import UserFactory, LocationFactory, ReservationFactory
+
+@pytest.mark.django_db
+def test_available_slots_is_cached_until_a_reservation_changes(django_assert_num_queries):
+    location = LocationFactory()
+    day = date.today() + timedelta(days=1)
+    client = APIClient()
+    url = f'/api/locations/{location.id}/available-slots/?date={day.isoformat()}'
+
+    first = client.get(url).data
+    with django_assert_num_queries(0):
+        assert client.get(url).data == first
+    assert cache_stats()['availability'] == {'hits': 1, 'misses': 1}
+
+    reservation = ReservationFactory(location=location, date=day, start_time=time(9, 0), end_time=time(10, 0))
+    assert '09:00' not in client.get(url).data['available_slots']
+
+    reservation.status = 'cancelled'
+    reservation.save()
+    assert '09:00' in client.get(url).data['available_slots']
+    assert cache_stats()['availability'] == {'hits': 1, 'misses': 3}
+
+@pytest.mark.django_db
+def test_cache_keys_are_per_location_even_with_equal_versions(monkeypatch):
+    # Relógio grosso: as versões dos dois locais saem iguais
+    monkeypatch.setattr('reservas.cache.time.time_ns', lambda: 1)
+    first, second = LocationFactory(name='Primeira'), LocationFactory(name='Segunda')
+    client = APIClient()
+    assert client.get(f'/api/locations/{first.id}/').data['name'] == 'Primeira'
+    assert client.get(f'/api/locations/{second.id}/').data['name'] == 'Segunda'
+
+@pytest.mark.django_db
+def test_location_update_invalidates_detail_and_list():
+    location = LocationFactory(name='Quadra')
+    client = APIClient()
+    assert client.get(f'/api/locations/{location.id}/').data['name'] == 'Quadra'
+    assert [row['name'] for row in client.get('/api/locations/').data['results']] == ['Quadra']
+
+    location.name = 'Quadra coberta'
+    location.save()
+    assert client.get(f'/api/locations/{location.id}/').data['name'] == 'Quadra coberta'
+    assert [row['name'] for row in client.get('/api/locations/').data['results']] == ['Quadra coberta']
+
+@pytest.mark.django_db
+def test_cached_location_keeps_visibility_rules():
+    owner, other = UserFactory(groups=['owners']), UserFactory(groups=['owners'])
+    location = LocationFactory(owner=owner)
+    client = APIClient()
+    client.force_authenticate(owner)
+    assert client.get(f'/api/locations/{location.id}/').status_code == 200
+
+    client.force_authenticate(other)
+    assert client.get(f'/api/locations/{location.id}/').status_code == 404
+    assert cache_stats()['location']['hits'] == 1
+
+@pytest.mark.django_db
+def test_cache_stats_endpoint_requires_admin():
+    client = APIClient()
+    client.force_authenticate(UserFactory())
+    assert client.get('/api/cache/stats/').status_code == 403
+    client.force_authenticate(UserFactory(is_staff=True))
+    assert client.get('/api/cache/stats/').status_code == 200
+
+@pytest.mark.django_db
+def test_conditional_get_returns_304_until_location_changes(django_assert_num_queries):
+    location = LocationFactory(name='Quadra')
+    client = APIClient()
+    url = f'/api/locations/{location.id}/'
+    response = client.get(url)
+    etag = response['ETag']
+    assert response.has_header('Last-Modified')
+
+    with django_assert_num_queries(0):
+        not_modified = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert not_modified.status_code == 304
+    assert not_modified['ETag'] == etag
+
+    location.name = 'Quadra coberta'
+    location.save()
+    changed = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert changed.status_code == 200
+    assert changed['ETag'] != etag
+
+@pytest.mark.django_db
+def test_conditional_get_on_list_and_available_slots():
+    location = LocationFactory()
+    client = APIClient()
+    day = (date.today() + timedelta(days=1)).isoformat()
+    slots_url = f'/api/locations/{location.id}/available-slots/?date={day}'
+
+    list_etag = client.get('/api/locations/')['ETag']
+    slots_etag = client.get(slots_url)['ETag']
+    assert client.get('/api/locations/', HTTP_IF_NONE_MATCH=list_etag).status_code == 304
+    assert client.get(slots_url, HTTP_IF_NONE_MATCH=slots_etag).status_code == 304
+
+    ReservationFactory(location=location, date=date.today() + timedelta(days=1), start_time=time(9, 0), end_time=time(10, 0))
+    assert client.get(slots_url, HTTP_IF_NONE_MATCH=slots_etag).status_code == 200
+    # Reservas não mudam a listagem de locais
+    assert client.get('/api/locations/', HTTP_IF_NONE_MATCH=list_etag).status_code == 304
+
+@pytest.mark.django_db
+def test_etag_is_scoped_to_owner():
+    owner = UserFactory(groups=['owners'])
+    location = LocationFactory(owner=owner)
+    client = APIClient()
+    client.force_authenticate(owner)
+    etag = client.get(f'/api/locations/{location.id}/')['ETag']
+
+    client.force_authenticate(UserFactory(groups=['owners']))
+    assert client.get(f'/api/locations/{location.id}/', HTTP_IF_NONE_MATCH=etag).status_code == 404
@@ -0,0 +1,88 @@
+import pytest
+from datetime import date, time, timedelta
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from rest_framework.test import APIClient
+from reservas.models import Location, LocationStats
+from reservas.tests.factories import UserFactory, LocationFactory, ReservationFactory
+
+@pytest.mark.django_db
+def test_dashboard_counters_follow_reservation_lifecycle():
+    owner = UserFactory(groups=['owners'])
+    quadra, salao = LocationFactory(owner=owner, name='Quadra'), LocationFactory(owner=owner, name='Salão')
+    LocationFactory(owner=owner, name='Vazio')
+    future = date.today() + timedelta(days=3)
+    ReservationFactory(location=quadra, date=future, start_time=time(9, 0), end_time=time(10, 0), status='confirmed')
+    ReservationFactory(location=quadra, date=date.today() - timedelta(days=3), start_time=time(9, 0), end_time=time(10, 0), status='confirmed')
+    pending = ReservationFactory(location=salao, date=future, start_time=time(9, 0), end_time=time(10, 0), status='pendente')
+
+    pending.status = 'confirmed'
+    pending.save()
+    cancelled = ReservationFactory(location=salao, date=future, start_time=time(11, 0), end_time=time(12, 0), status='pendente')
+    cancelled.status = 'cancelled'
+    cancelled.save()
+
+    client = APIClient()
+    client.force_authenticate(owner)
+    data = client.get('/api/owner/dashboard/').data
+
+    assert data['total_locations'] == 3
+    assert data['total_reservations'] == 4
+    assert data['upcoming_reservations'] == 2
+    assert sorted((row['location__name'], row['count']) for row in data['reservations_per_location']) == [('Quadra', 2), ('Salão', 2)]
+    assert data['reservations_per_status'] == {'pendente': 0, 'confirmed': 3, 'cancelled': 1}
+
+@pytest.mark.django_db
+def test_transferring_location_moves_dashboard_counters():
+    old_owner, new_owner = UserFactory(groups=['owners']), UserFactory(groups=['owners'])
+    location = LocationFactory(owner=old_owner, name='Quadra')
+    ReservationFactory(location=location, date=date.today() + timedelta(days=3), start_time=time(9, 0), end_time=time(10, 0), status='confirmed')
+
+    location.owner = new_owner
+    location.save()
+
+    client = APIClient()
+    client.force_authenticate(old_owner)
+    data = client.get('/api/owner/dashboard/').data
+    assert (data['total_locations'], data['total_reservations'], data['upcoming_reservations']) == (0, 0, 0)
+
+    client.force_authenticate(new_owner)
+    data = client.get('/api/owner/dashboard/').data
+    assert (data['total_locations'], data['total_reservations'], data['upcoming_reservations']) == (1, 1, 1)
+    assert data['reservations_per_location'] == [{'location__name': 'Quadra', 'count': 1}]
+    call_command('reconcile_dashboard_stats', '--check')
+
+@pytest.mark.django_db
+def test_reconcile_dashboard_stats_repairs_drift():
+    reservation = ReservationFactory(status='confirmed')
+    LocationStats.objects.filter(location=reservation.location).update(total_reservations=7, confirmed_reservations=0)
+
+    with pytest.raises(CommandError):
+        call_command('reconcile_dashboard_stats', '--check')
+
+    call_command('reconcile_dashboard_stats')
+    call_command('reconcile_dashboard_stats', '--check')
+    stats = LocationStats.objects.get(location=reservation.location)
+    assert (stats.total_reservations, stats.confirmed_reservations) == (1, 1)
+
+@pytest.mark.django_db
+def test_deleting_location_cascades_cleanly():
+    reservation = ReservationFactory()
+    reservation.location.delete()
+    assert not LocationStats.objects.exists()
+
+@pytest.mark.django_db(transaction=True)
+def test_deleting_owner_or_location_queryset_cascades_cleanly():
+    owner = UserFactory(groups=['owners'])
+    ReservationFactory(location=LocationFactory(owner=owner), status='confirmed')
+    other = ReservationFactory(status='pendente')
+    # Exclusão do owner (origin = User) e "excluir selecionados" do admin (origin = QuerySet)
+    owner.delete()
+    Location.objects.filter(owner=other.location.owner).delete()
+    assert not LocationStats.objects.exists()
+
+    # Cliente excluído: o local continua e os contadores acompanham
+    reservation = ReservationFactory(status='confirmed')
+    reservation.user.delete()
+    stats = LocationStats.objects.get(location=reservation.location)
+    assert (stats.total_reservations, stats.confirmed_reservations) == (0, 0)
@@ -0,0 +1,21 @@
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from reservas.models import Location, Payment, Reservation, UserProfile
+
+@pytest.mark.django_db
+def test_generate_dataset_keeps_derived_tables_consistent():
+    call_command('generate_dataset', users=40, locations=6, reservations=300, prefix='t', batch_size=50)
+
+    assert User.objects.filter(username__startswith='t').count() == 40
+    assert UserProfile.objects.count() == 40
+    assert Location.objects.count() == 6
+    assert 0 < Reservation.objects.count() <= 300
+    assert 0 < Payment.objects.count() <= Reservation.objects.count()
+    # Os bulk_create pulam os signals: ocupação e contadores do dashboard têm que bater mesmo assim
+    call_command('rebuild_occupancy', '--check')
+    call_command('reconcile_dashboard_stats', '--check')
+
+    with pytest.raises(CommandError):
+        call_command('generate_dataset', users=5, locations=1, reservations=10, prefix='t')
@@ -0,0 +1,81 @@
+import csv
+import io
+import json
+import pytest
+from datetime import date, time, timedelta
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from reservas.models import Payment
+from reservas.tests.factories import UserFactory, LocationFactory, ReservationFactory
+from reservas.tests.test_async_views import bearer
+from reservas.tests.test_query_plans import full_table_scans
+
+@pytest.fixture
+def history(db):
+    owner, customer = UserFactory(groups=['owners']), UserFactory()
+    quadra, salao = LocationFactory(owner=owner, name='Quadra'), LocationFactory(owner=owner, name='Salão, "VIP"')
+    start = date(2026, 1, 10)
+    reservations = [
+        ReservationFactory(user=customer, location=location, date=start + timedelta(days=day), start_time=time(9, 0), end_time=time(10, 0))
+        for location in (salao, quadra) for day in range(3)
+    ]
+    Payment.objects.create(reservation=reservations[0], method='pix', valor='75.50', status='pago')
+    ReservationFactory(user=customer, date=start)  # de outro owner
+    return {'owner': owner, 'quadra': quadra, 'salao': salao, 'start': start, 'reservations': reservations}
+
+@pytest.mark.django_db
+def test_csv_export_streams_owner_rows_in_chunks(history, settings):
+    settings.RESERVAS_EXPORT_CHUNK_SIZE = 2
+    response = APIClient().get('/api/owner/export/reservations.csv', headers=bearer(history['owner']))
+    assert response.status_code == 200 and response.streaming
+    assert response['Content-Type'] == 'text/csv; charset=utf-8'
+    chunks = list(response.streaming_content)
+    assert len(chunks) == 4  # cabeçalho + 3 blocos de 2 linhas
+
+    rows = list(csv.DictReader(io.StringIO(b''.join(chunks).decode())))
+    assert [(int(row['location_id']), row['date']) for row in rows] == [
+        (location.id, str(history['start'] + timedelta(days=day)))
+        for location in sorted((history['quadra'], history['salao']), key=lambda location: location.id) for day in range(3)
+    ]
+    paid = next(row for row in rows if row['reservation_id'] == str(history['reservations'][0].id))
+    assert (paid['location_name'], paid['payment_method'], paid['payment_valor']) == ('Salão, "VIP"', 'pix', '75.50')
+    assert sum(1 for row in rows if row['payment_id'] == '') == 5
+
+@pytest.mark.django_db
+def test_ndjson_export_filters_by_date_and_location(history):
+    client = APIClient()
+    url = f"/api/owner/export/reservations.ndjson?from={history['start'] + timedelta(days=1)}&location={history['salao'].id}"
+    response = client.get(url, headers=bearer(history['owner']))
+    assert response['Content-Type'] == 'application/x-ndjson'
+    rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+    assert [row['date'] for row in rows] == ['2026-01-11', '2026-01-12']
+    assert rows[0]['payment_status'] is None and rows[0]['start_time'] == '09:00:00'
+
+    assert client.get('/api/owner/export/reservations.csv?from=2026-02-01&to=2026-01-01',
+                      headers=bearer(history['owner'])).status_code == 400
+    assert client.get('/api/owner/export/reservations.csv', headers=bearer(UserFactory())).status_code == 403
+    assert client.get('/api/owner/export/reservations.xml', headers=bearer(history['owner'])).status_code == 404
+
+@pytest.mark.django_db
+def test_export_query_uses_indexes(history):
+    response = APIClient().get(
+        f"/api/owner/export/reservations.csv?from={history['start']}&to={history['start']}", headers=bearer(history['owner'])
+    )
+    with CaptureQueriesContext(connection) as context:
+        body = b''.join(response.streaming_content)
+    assert body.count(b'\n') == 3
+    assert len(context.captured_queries) == 3  # locais do owner + uma consulta por local
+    assert not [query for query in context.captured_queries if full_table_scans(query['sql'])]
+
+@pytest.mark.django_db
+def test_export_streams_under_asgi(history):
+    async def fetch():
+        response = await AsyncClient().get('/api/owner/export/reservations.ndjson', headers=bearer(history['owner']))
+        return response, [chunk async for chunk in response.streaming_content]
+
+    response, chunks = async_to_sync(fetch)()
+    assert response.status_code == 200
+    assert b''.join(chunks).count(b'\n') == 6
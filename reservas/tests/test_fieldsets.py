@@ -0,0 +1,55 @@
+import pytest
+from datetime import date, time, timedelta
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from reservas.tests.factories import UserFactory, LocationFactory, ReservationFactory
+
+def selects(context):
+    return [query['sql'] for query in context.captured_queries if query['sql'].lstrip().upper().startswith('SELECT')]
+
+@pytest.fixture
+def customer(db):
+    customer = UserFactory(groups=['customers'])
+    day = date.today() + timedelta(days=4)
+    for hour in (9, 10, 11):
+        ReservationFactory(user=customer, date=day, start_time=time(hour, 0), end_time=time(hour + 1, 0))
+    client = APIClient()
+    client.force_authenticate(customer)
+    return client
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url', ['/api/reservations/', '/api/customer/reservations/'])
+@pytest.mark.parametrize('fast', ['0', '1'])
+def test_reservation_fields_prune_payload_and_joins(customer, url, fast):
+    with CaptureQueriesContext(connection) as context:
+        data = customer.get(f'{url}?fields=id,date,status&page_size=2&fast={fast}').data
+    assert [set(row) for row in data['results']] == [{'id', 'date', 'status'}] * 2
+    # Nem join com o local nem consulta de imagens
+    assert not [sql for sql in selects(context) if 'reservas_location' in sql]
+    # O cursor continua funcionando com as colunas da ordenação fora do fieldset
+    assert len(customer.get(data['next']).data['results']) == 1
+
+    with CaptureQueriesContext(connection) as context:
+        row = customer.get(f'{url}?omit=location_images,location_image_variants&fast={fast}').data['results'][0]
+    assert 'location_images' not in row and row['location_name'] == 'Local de Teste'
+    assert not [sql for sql in selects(context) if 'reservas_locationimage' in sql]
+
+@pytest.mark.django_db
+def test_location_fields_skip_image_prefetch_and_keep_separate_cache():
+    location = LocationFactory()
+    client = APIClient()
+    with CaptureQueriesContext(connection) as context:
+        data = client.get('/api/locations/?fields=id,name').data
+    assert data['results'] == [{'id': location.id, 'name': location.name}]
+    assert not [sql for sql in selects(context) if 'reservas_locationimage' in sql]
+
+    assert client.get(f'/api/locations/{location.id}/?fields=id').data == {'id': location.id}
+    assert 'images' in client.get(f'/api/locations/{location.id}/').data
+
+@pytest.mark.django_db
+def test_invalid_fieldsets_are_rejected(customer):
+    response = customer.get('/api/reservations/?fields=id,senha')
+    assert response.status_code == 400 and 'senha' in response.data['detail']
+    assert customer.get('/api/reservations/?fields=id&omit=status').status_code == 400
+    assert APIClient().get('/api/locations/?omit=foo').status_code == 400
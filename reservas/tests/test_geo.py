@@ -0,0 +1,77 @@
+import pytest
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from reservas import geo
+from reservas.models import Location
+from reservas.tests.factories import UserFactory, LocationFactory
+from reservas.tests.test_query_plans import full_table_scans
+
+def test_encode_matches_reference_geohash():
+    assert geo.encode(57.64911, 10.40744, 11) == 'u4pruydqqvj'
+    # Pontos na borda do círculo caem em alguma das células de cobertura
+    cells = geo.covering_cells(-23.55, -46.63, 5)
+    assert len(cells) <= geo.MAX_CELLS
+    for dlat, dlng in ((0.0449, 0), (-0.0449, 0), (0, 0.049), (0, -0.049)):
+        assert geo.encode(-23.55 + dlat, -46.63 + dlng).startswith(tuple(cells))
+
+@pytest.mark.django_db
+def test_near_filters_by_radius_and_orders_by_distance():
+    # Centro de São Paulo; Paulista a ~2,5 km, Pinheiros a ~6 km, Campinas a ~85 km
+    paulista = LocationFactory(name='Paulista', latitude=Decimal('-23.561414'), longitude=Decimal('-46.655881'))
+    se = LocationFactory(name='Sé', latitude=Decimal('-23.550520'), longitude=Decimal('-46.633309'))
+    LocationFactory(name='Pinheiros', latitude=Decimal('-23.567000'), longitude=Decimal('-46.690000'))
+    LocationFactory(name='Campinas', latitude=Decimal('-22.905560'), longitude=Decimal('-47.060830'))
+    LocationFactory(name='Sem coordenadas')
+    LocationFactory(name='Inativo', latitude=Decimal('-23.550520'), longitude=Decimal('-46.633309'), is_active=False)
+    client = APIClient()
+
+    data = client.get('/api/locations/?near=-23.5505,-46.6333&radius=4').data
+    assert [row['id'] for row in data['results']] == [se.id, paulista.id]
+    assert data['results'][0]['distance_km'] < 0.1 < data['results'][1]['distance_km'] < 4
+
+    data = client.get('/api/locations/?near=-23.5505,-46.6333&radius=10&page_size=2').data
+    assert len(data['results']) == 2
+    assert [row['name'] for row in client.get(data['next']).data['results']] == ['Pinheiros']
+
+    assert client.get('/api/locations/?near=-23.5505').status_code == 400
+    assert client.get('/api/locations/?near=-23.5505,-46.6333&radius=500').status_code == 400
+
+@pytest.mark.django_db
+def test_geohash_follows_coordinate_updates():
+    location = LocationFactory(latitude=Decimal('-23.550520'), longitude=Decimal('-46.633309'))
+    assert location.geohash == geo.encode(-23.550520, -46.633309)
+
+    location.latitude, location.longitude = Decimal('-22.905560'), Decimal('-47.060830')
+    location.save(update_fields=['latitude', 'longitude'])
+    assert Location.objects.get(id=location.id).geohash == geo.encode(-22.905560, -47.060830)
+
+    location.latitude = location.longitude = None
+    location.save()
+    assert Location.objects.get(id=location.id).geohash is None
+
+@pytest.mark.django_db
+def test_coordinates_must_come_together():
+    owner = UserFactory(groups=['owners'])
+    location = LocationFactory(owner=owner)
+    client = APIClient()
+    client.force_authenticate(owner)
+    url = f'/api/locations/{location.id}/'
+
+    assert client.patch(url, {'latitude': '-23.5'}, format='json').status_code == 400
+    assert client.patch(url, {'latitude': '-95', 'longitude': '-46.6'}, format='json').status_code == 400
+
+    response = client.patch(url, {'latitude': '-23.5', 'longitude': '-46.6'}, format='json')
+    assert response.status_code == 200, response.data
+    assert Location.objects.get(id=location.id).geohash == geo.encode(-23.5, -46.6)
+
+@pytest.mark.django_db
+def test_near_uses_geohash_index():
+    LocationFactory(latitude=Decimal('-23.550520'), longitude=Decimal('-46.633309'))
+    with CaptureQueriesContext(connection) as context:
+        assert APIClient().get('/api/locations/?near=-23.5505,-46.6333&radius=2').status_code == 200
+    plans = {query['sql']: full_table_scans(query['sql']) for query in context.captured_queries}
+    assert not {sql: plan for sql, plan in plans.items() if plan}
+    assert any('location_active_geohash_idx' in str(connection.cursor().execute(f"EXPLAIN QUERY PLAN {sql}").fetchall())
+               for sql in plans if 'geohash' in sql)
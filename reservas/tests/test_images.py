@@ -0,0 +1,104 @@
+import pytest
+from io import BytesIO, StringIO
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+from rest_framework.test import APIClient
+from reservas.models import LocationImage
+from reservas.tests.factories import LocationFactory
+
+def png_upload(size=(2000, 1000)):
+    buffer = BytesIO()
+    Image.new('RGBA', size, (200, 30, 30, 255)).save(buffer, 'PNG')
+    return SimpleUploadedFile('foto.png', buffer.getvalue(), content_type='image/png')
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.RESERVAS_IMAGE_WORKERS = 0
+    return tmp_path
+
+@pytest.mark.django_db
+def test_upload_generates_variants_after_commit(media_root, django_capture_on_commit_callbacks):
+    location = LocationFactory()
+    with django_capture_on_commit_callbacks(execute=True):
+        image = LocationImage.objects.create(location=location, image=png_upload())
+
+    image.refresh_from_db()
+    assert set(image.variants) == {'thumb', 'card', 'full'}
+    sizes = {name: Image.open(media_root / path).size for name, path in image.variants.items()}
+    assert sizes == {'full': (1600, 800), 'card': (640, 320), 'thumb': (160, 80)}
+
+    data = APIClient().get(f'/api/locations/{location.id}/').data
+    variants = data['image_variants'][0]
+    assert variants['thumb'].endswith(f'/media/location_images/variants/{image.pk}/thumb.jpg')
+    assert data['images'] == [variants['original']]
+
+@pytest.mark.django_db
+def test_backfill_command_generates_missing_variants(media_root):
+    location = LocationFactory()
+    pending = LocationImage.objects.create(location=location, image=png_upload((300, 300)))
+    assert pending.variants == {}
+
+    data = APIClient().get(f'/api/locations/{location.id}/').data
+    # Sem variantes ainda: todas apontam para o original
+    assert set(data['image_variants'][0].values()) == {data['images'][0]}
+
+    call_command('generate_image_variants', '--workers', '1')
+    pending.refresh_from_db()
+    assert Image.open(media_root / pending.variants['card']).size == (300, 300)
+    assert Image.open(media_root / pending.variants['thumb']).size == (160, 160)
+
+@pytest.mark.django_db
+def test_backfill_command_survives_broken_image(media_root):
+    location = LocationFactory()
+    broken = LocationImage.objects.create(location=location, image=SimpleUploadedFile('ruim.png', b'nao e imagem', content_type='image/png'))
+    pending = LocationImage.objects.create(location=location, image=png_upload((300, 300)))
+
+    out, err = StringIO(), StringIO()
+    call_command('generate_image_variants', '--workers', '1', stdout=out, stderr=err)
+    broken.refresh_from_db()
+    pending.refresh_from_db()
+    assert broken.variants == {}
+    assert set(pending.variants) == {'thumb', 'card', 'full'}
+    assert f'imagem {broken.pk}' in err.getvalue()
+    assert '1 imagem(ns); 1 falha(s)' in out.getvalue()
+
+@pytest.mark.django_db
+def test_batch_upload_saves_all_images_with_one_insert(media_root, django_capture_on_commit_callbacks):
+    location = LocationFactory()
+    client = APIClient()
+    client.force_authenticate(location.owner)
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.post(
+            '/api/locations/images/batch-upload/',
+            {'location': location.id, 'images': [png_upload((40, 40)) for _ in range(3)]},
+            format='multipart',
+        )
+
+    assert response.status_code == 201
+    assert len(response.data) == 3
+    images = LocationImage.objects.filter(location=location)
+    assert images.count() == 3
+    assert all(image.variants for image in images)
+
+@pytest.mark.django_db
+def test_batch_upload_limits(media_root, settings):
+    settings.RESERVAS_MAX_IMAGES_PER_REQUEST = 2
+    location, other = LocationFactory(), LocationFactory()
+    client = APIClient()
+    client.force_authenticate(location.owner)
+    url = '/api/locations/images/batch-upload/'
+
+    response = client.post(url, {'location': location.id, 'images': [png_upload((40, 40)) for _ in range(3)]}, format='multipart')
+    assert response.status_code == 400
+    assert 'images' in response.data
+
+    response = client.post(url, {'location': other.id, 'images': [png_upload((40, 40))]}, format='multipart')
+    assert response.status_code == 400
+    assert 'location' in response.data
+
+    settings.RESERVAS_MAX_UPLOAD_SIZE = 1024
+    response = client.post(url, {'location': location.id, 'images': [png_upload((400, 400))]}, format='multipart')
+    assert response.status_code == 413
+    assert not LocationImage.objects.exists()
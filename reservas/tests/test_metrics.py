@@ -0,0 +1,58 @@
+import re
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from rest_framework.test import APIClient
+from reservas.metrics import reset_metrics
+from reservas.tests.factories import LocationFactory, ReservationFactory
+from reservas.tests.test_async_views import bearer
+
+def timings(response):
+    """{nome: dur} do Server-Timing, mais 'queries' tirado do desc do db"""
+    header = response['Server-Timing']
+    parts = {name: float(duration) for name, duration in re.findall(r'(\w+);dur=([\d.]+)', header)}
+    parts['queries'] = int(re.search(r'desc="(\d+) queries"', header).group(1))
+    return parts
+
+@pytest.mark.django_db
+def test_server_timing_header_counts_sql_serializer_and_render(settings):
+    settings.RESERVAS_METRICS_TOKEN = 's3cret'
+    reservation = ReservationFactory()
+    reset_metrics()
+    client = APIClient()
+
+    response = client.get('/api/reservations/', headers=bearer(reservation.user))
+    parts = timings(response)
+    assert response.status_code == 200
+    assert set(parts) == {'total', 'db', 'serialize', 'render', 'queries'}
+    assert parts['queries'] > 0
+    assert parts['total'] >= parts['db'] + parts['render']
+
+    # Sob ASGI a rota assíncrona cai na mesma série (o SQL roda nas threads do sync_to_async)
+    async_response = async_to_sync(AsyncClient().get)(f'/api/locations/{reservation.location_id}/')
+    assert async_response.status_code == 200
+    assert timings(async_response)['queries'] > 0
+    APIClient().get(f'/api/locations/{reservation.location_id}/')
+
+    body = client.get('/metrics', headers={'Authorization': 'Bearer s3cret'}).content.decode()
+    assert 'reservas_requests_total{route="reservation-list",method="GET",status="200"} 1' in body
+    assert 'reservas_requests_total{route="location-detail",method="GET",status="200"} 2' in body
+    assert 'reservas_request_duration_seconds_count{route="location-detail",method="GET"} 2' in body
+    assert 'reservas_request_sql_queries_bucket{route="reservation-list",method="GET",le="+Inf"} 1' in body
+    assert '# TYPE reservas_request_render_seconds histogram' in body
+
+@pytest.mark.django_db
+def test_metrics_endpoint_requires_token(settings):
+    LocationFactory()
+    settings.RESERVAS_METRICS_TOKEN = 's3cret'
+    client = APIClient()
+    assert client.get('/metrics').status_code == 403
+    assert client.get('/metrics', headers={'Authorization': 'Bearer errado'}).status_code == 403
+    response = client.get('/metrics', headers={'Authorization': 'Bearer s3cret'})
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+
+    # Sem token configurado fica fechado, inclusive para localhost (proxy reverso local)
+    settings.RESERVAS_METRICS_TOKEN = ''
+    assert client.get('/metrics', REMOTE_ADDR='127.0.0.1').status_code == 403
+    assert client.get('/metrics', headers={'Authorization': 'Bearer '}).status_code == 403
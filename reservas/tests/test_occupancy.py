@@ -0,0 +1,51 @@
+import pytest
+from datetime import date, time, timedelta
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from reservas.models import LocationOccupancy
+from reservas.tests.factories import ReservationFactory, LocationFactory
+
+@pytest.mark.django_db
+def test_occupancy_follows_reservation_lifecycle():
+    location = LocationFactory()
+    day = date.today() + timedelta(days=2)
+
+    reservation = ReservationFactory(location=location, date=day, start_time=time(14, 0), end_time=time(16, 0), status='pendente')
+    occupancy = LocationOccupancy.objects.get(location=location, date=day)
+    assert occupancy.occupied_hours == (1 << 14) | (1 << 15)
+    assert occupancy.reservation_count == 1
+
+    # Remarcar a reserva atualiza o dia antigo e o novo
+    reservation.date = day + timedelta(days=1)
+    reservation.save()
+    assert not LocationOccupancy.objects.filter(location=location, date=day).exists()
+
+    reservation.status = 'cancelled'
+    reservation.save()
+    assert not LocationOccupancy.objects.filter(location=location).exists()
+
+@pytest.mark.django_db
+def test_available_slots_reads_occupancy(authenticated_client):
+    location = LocationFactory(operating_hours_start='08:00', operating_hours_end='18:00')
+    day = date.today() + timedelta(days=1)
+    ReservationFactory(location=location, date=day, start_time=time(9, 0), end_time=time(11, 0), status='pendente')
+    ReservationFactory(location=location, date=day, start_time=time(15, 0), end_time=time(16, 0), status='cancelled')
+
+    response = authenticated_client.get(f'/api/locations/{location.id}/available-slots/?date={day}')
+
+    assert response.status_code == 200
+    assert "09:00" not in response.data['available_slots']
+    assert "15:00" in response.data['available_slots']
+    assert response.data['debug']['total_reservations'] == 1
+
+@pytest.mark.django_db
+def test_rebuild_occupancy_command_repairs_drift():
+    reservation = ReservationFactory(date=date.today() + timedelta(days=1), start_time=time(10, 0), end_time=time(12, 0))
+    LocationOccupancy.objects.all().delete()
+
+    with pytest.raises(CommandError):
+        call_command('rebuild_occupancy', '--check')
+
+    call_command('rebuild_occupancy')
+    call_command('rebuild_occupancy', '--check')
+    assert LocationOccupancy.objects.get(location=reservation.location).occupied_hours == (1 << 10) | (1 << 11)
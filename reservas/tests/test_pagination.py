@@ -0,0 +1,62 @@
+import pytest
+from datetime import date, time, timedelta
+from rest_framework.test import APIClient
+from reservas.tests.factories import UserFactory, LocationFactory, ReservationFactory
+
+def collect(client, url, key='next'):
+    ids, pages = [], 0
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200, response.data
+        ids.extend(row['id'] for row in response.data['results'])
+        url = response.data[key]
+        pages += 1
+    return ids, pages
+
+@pytest.mark.django_db
+def test_customer_reservations_keyset_pages_are_complete_and_stable():
+    customer = UserFactory()
+    location = LocationFactory()
+    day = date.today() + timedelta(days=1)
+    # Vários empates em (date, start_time) para exercitar o desempate pelo id
+    for offset in range(4):
+        for _ in range(3):
+            ReservationFactory(user=customer, location=location, date=day + timedelta(days=offset % 2), start_time=time(9 + offset, 0), end_time=time(10 + offset, 0))
+    client = APIClient()
+    client.force_authenticate(customer)
+
+    ids, pages = collect(client, '/api/customer/reservations/?page_size=5')
+
+    expected = sorted(
+        customer.reservation_set.values_list('date', 'start_time', 'id'),
+        key=lambda row: (-row[0].toordinal(), -(row[1].hour * 60 + row[1].minute), row[2]),
+    )
+    assert ids == [row[2] for row in expected]
+    assert pages == 3
+
+    # Voltando pelos links "previous" a partir da última página
+    last_page = client.get('/api/customer/reservations/?page_size=5')
+    while last_page.data['next']:
+        last_page = client.get(last_page.data['next'])
+    previous = client.get(last_page.data['previous'])
+    assert [row['id'] for row in previous.data['results']] == ids[5:10]
+
+@pytest.mark.django_db
+def test_location_list_page_size_is_capped(settings):
+    settings.RESERVAS_MAX_PAGE_SIZE = 2
+    LocationFactory.create_batch(3)
+    client = APIClient()
+    client.force_authenticate(UserFactory())
+
+    response = client.get('/api/locations/?page_size=100')
+
+    assert len(response.data['results']) == 2
+    assert response.data['next'] is not None
+    assert response.data['previous'] is None
+
+@pytest.mark.django_db
+def test_invalid_cursor_returns_404():
+    client = APIClient()
+    client.force_authenticate(UserFactory())
+    assert client.get('/api/reservations/?cursor=nao-e-um-cursor').status_code == 404
+    assert client.get('/api/reservations/?cursor=eyJwIjpbIngiLCJ5IiwxXX0').status_code == 404
@@ -0,0 +1,48 @@
+import pstats
+import re
+import pytest
+from rest_framework.test import APIClient
+from reservas.tests.factories import UserFactory, LocationFactory
+from reservas.tests.test_async_views import bearer
+
+@pytest.fixture
+def profile_settings(settings, tmp_path):
+    settings.RESERVAS_PROFILE_DIR = str(tmp_path)
+    settings.RESERVAS_PROFILE_INTERVAL_MS = 0.1
+    settings.RESERVAS_PROFILE_MAX_FILES = 2
+    return tmp_path
+
+@pytest.mark.django_db
+def test_staff_request_is_profiled_to_folded_stacks(profile_settings):
+    admin, customer = UserFactory(is_staff=True), UserFactory()
+    LocationFactory.create_batch(3)
+    client = APIClient()
+
+    response = client.get('/api/locations/?_profile=sample', headers=bearer(admin))
+    assert response.status_code == 200
+    name = response['X-Profile']
+    assert re.fullmatch(r'[\w-]+-location-list-\w+\.folded', name)
+    content = (profile_settings / name).read_text()
+    assert all(re.fullmatch(r'\S.* \d+', line) for line in content.splitlines())
+
+    download = client.get(f'/api/profiles/{name}/', headers=bearer(admin))
+    assert download.status_code == 200 and b''.join(download.streaming_content).decode() == content
+    assert client.get(f'/api/profiles/{name}/', headers=bearer(customer)).status_code == 403
+    assert client.get('/api/profiles/..%2Fdb.sqlite3/', headers=bearer(admin)).status_code == 404
+
+@pytest.mark.django_db
+def test_profiling_is_ignored_for_non_staff(profile_settings):
+    response = APIClient().get('/api/locations/', headers={**bearer(UserFactory()), 'X-Profile': 'sample'})
+    assert response.status_code == 200
+    assert 'X-Profile' not in response
+    assert not list(profile_settings.iterdir())
+
+@pytest.mark.django_db
+def test_cprofile_mode_and_file_cap(profile_settings):
+    client = APIClient()
+    headers = {**bearer(UserFactory(is_staff=True)), 'X-Profile': 'cprofile'}
+    names = [client.get('/api/locations/', headers=headers)['X-Profile'] for _ in range(3)]
+
+    assert all(name.endswith('.pstats') for name in names)
+    assert sorted(path.name for path in profile_settings.iterdir()) == sorted(names[1:])
+    assert pstats.Stats(str(profile_settings / names[-1])).total_calls > 0
@@ -0,0 +1,78 @@
+import pytest
+from datetime import date, time, timedelta
+from decimal import Decimal
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from reservas.models import LocationImage, Reservation
+from reservas.projections import ReservationValues
+from reservas.renderers import FastJSONRenderer
+from reservas.serializers import ReservationSerializer
+from reservas.tests.factories import UserFactory, LocationFactory, ReservationFactory
+
+@pytest.fixture
+def reservations(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.RESERVAS_IMAGE_WORKERS = 0
+    customer = UserFactory(groups=['customers'])
+    day = date.today() + timedelta(days=5)
+    with_images = LocationFactory(name='Quadra “Central” ', description='Ção ✓')
+    LocationImage.objects.create(location=with_images, image=SimpleUploadedFile('a.jpg', b'a'))
+    LocationImage.objects.create(
+        location=with_images, image=SimpleUploadedFile('b.jpg', b'b'), variants={'thumb': 'location_images/variants/b/thumb.jpg'}
+    )
+    closed = LocationFactory(is_active=False, description='')
+    for hour, location in enumerate((with_images, closed, with_images), start=9):
+        ReservationFactory(user=customer, location=location, date=day, start_time=time(hour, 0), end_time=time(hour, 30))
+    Reservation.objects.filter(location=closed).update(status='cancelled', cancelled_at=timezone.now())
+    return customer
+
+@pytest.mark.django_db
+def test_values_path_renders_the_same_bytes(reservations):
+    queryset = Reservation.objects.filter(user=reservations).order_by('-date', '-start_time', 'id')
+    expected = JSONRenderer().render(ReservationSerializer(
+        queryset.select_related('location').prefetch_related('location__images'), many=True
+    ).data)
+    values = ReservationValues()
+    assert FastJSONRenderer().render(values.serialize(list(values.project(queryset)))) == expected
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('fast', ['0', '1'])
+def test_list_endpoints_match_serializer_and_paginate(reservations, fast):
+    client = APIClient()
+    client.force_authenticate(reservations)
+    for url in ('/api/reservations/', '/api/customer/reservations/'):
+        first = client.get(f'{url}?page_size=2&fast={fast}')
+        second = client.get(first.data['next'])
+        page = Reservation.objects.filter(user=reservations).order_by('-date', '-start_time', 'id')
+        assert [row['id'] for row in first.data['results'] + second.data['results']] == [r.id for r in page]
+        assert first.data['results'] == ReservationSerializer(page[:2], many=True).data
+
+@pytest.mark.django_db
+def test_fast_path_is_opt_in(reservations, settings, monkeypatch):
+    calls = []
+    original = ReservationValues.serialize
+    monkeypatch.setattr(ReservationValues, 'serialize', lambda self, rows: calls.append(1) or original(self, rows))
+    client = APIClient()
+    client.force_authenticate(reservations)
+    expected = ReservationSerializer(
+        Reservation.objects.filter(user=reservations).order_by('-date', '-start_time', 'id'), many=True
+    ).data
+
+    # Padrão: ReservationSerializer
+    for url in ('/api/reservations/', '/api/customer/reservations/'):
+        assert client.get(url).data['results'] == expected
+    assert not calls
+
+    settings.RESERVAS_FAST_SERIALIZATION = True
+    assert client.get('/api/customer/reservations/').data['results'] == expected
+    assert client.get('/api/reservations/?fast=0').data['results'] == expected
+    assert len(calls) == 1
+
+def test_fast_renderer_matches_drf_renderer():
+    data = {'a': [1, 2.5, None, True], 'b': 'linha nova “aspas” ç', 'c': Decimal('1.10'),
+            'd': timezone.now(), 3: {'nested': []}, 'big': 2 ** 70}
+    assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+    assert FastJSONRenderer().render(data, 'application/json; indent=4') == JSONRenderer().render(data, 'application/json; indent=4')
+    assert FastJSONRenderer().render(None) == b''
@@ -0,0 +1,37 @@
+import pytest
+from datetime import date, time, timedelta
+from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework.test import APIClient
+from reservas.models import LocationImage
+from reservas.tests.factories import UserFactory, LocationFactory, ReservationFactory
+from reservas.tests.query_budget import QUERY_BUDGETS, authenticate, run_with_budget
+
+def seed(owner, customer, rows):
+    """Cria `rows` locais do owner, cada um com duas imagens e uma reserva do customer"""
+    day = date.today() + timedelta(days=5)
+    locations = LocationFactory.create_batch(rows, owner=owner)
+    for index, location in enumerate(locations):
+        for _ in range(2):
+            LocationImage.objects.create(location=location, image=SimpleUploadedFile('foto.jpg', b'img', content_type='image/jpeg'))
+        ReservationFactory(user=customer, location=location, date=day + timedelta(days=index), start_time=time(9, 0), end_time=time(10, 0))
+    return locations
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('role', ['owner', 'customer'])
+@pytest.mark.parametrize('url', list(QUERY_BUDGETS))
+def test_list_endpoints_stay_within_query_budget(settings, tmp_path, url, role):
+    settings.MEDIA_ROOT = tmp_path
+    users = {'owner': UserFactory(groups=['owners']), 'customer': UserFactory(groups=['customers'])}
+    if url == '/api/owner/dashboard/' and role == 'customer':
+        pytest.skip("dashboard é exclusivo de owners")
+    client = authenticate(APIClient(), users[role])
+
+    counts = []
+    for rows in (2, 10):
+        locations = seed(users['owner'], users['customer'], rows)
+        response, queries = run_with_budget(client, url.format(location=locations[0].id), QUERY_BUDGETS[url])
+        assert response.status_code == 200, response.data
+        counts.append(queries)
+
+    # O número de consultas não depende de quantas linhas a resposta tem
+    assert counts[0] == counts[1]
@@ -0,0 +1,78 @@
+import re
+import pytest
+from datetime import date, time, timedelta
+from django.contrib.auth.models import Group
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from reservas.models import Payment
+from reservas.tests.factories import UserFactory, LocationFactory, ReservationFactory
+
+# Listagem pública: percorre o índice parcial dos ativos já na ordem da paginação e para no LIMIT
+ACTIVE_LISTING_WALK = ('SCAN reservas_location USING INDEX location_active_created_idx',)
+
+# Endpoints de leitura mais acessados; cada consulta que eles executam passa pelo EXPLAIN QUERY PLAN.
+# Terceiro item: varreduras ordenadas de índice intencionais naquele endpoint
+HOT_ENDPOINTS = [
+    ('anonymous', '/api/locations/', ACTIVE_LISTING_WALK),
+    ('customer', '/api/locations/', ACTIVE_LISTING_WALK),
+    ('owner', '/api/locations/', ()),
+    ('customer', '/api/locations/{location}/', ()),
+    ('customer', '/api/locations/{location}/available-slots/?date={day}', ()),
+    ('customer', '/api/locations/{location}/available-slots/?from={day}&to={next_day}', ()),
+    ('customer', '/api/locations/available-slots/?from={day}&to={next_day}&locations={location}', ()),
+    ('customer', '/api/locations/free/?date={day}&start=09:00&end=10:00', ACTIVE_LISTING_WALK),
+    ('customer', '/api/reservations/', ()),
+    ('owner', '/api/reservations/', ()),
+    ('customer', '/api/customer/reservations/', ()),
+    ('owner', '/api/owner/dashboard/', ()),
+]
+
+def full_table_scans(sql, allowed=()):
+    """Linhas do plano que percorrem uma tabela ou um índice inteiro (SCAN), em vez de buscar (SEARCH).
+
+    `SCAN t USING [COVERING] INDEX i` também é uma varredura completa (só que ordenada); onde ela é
+    intencional, o teste passa o detalhe em `allowed`.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+        details = [row[-1] for row in cursor.fetchall()]
+    return [
+        detail for detail in details
+        if detail.startswith('SCAN ') and detail not in allowed
+        and not detail.startswith(('SCAN CONSTANT', 'SCAN SUBQUERY'))
+        # Tabela virtual (FTS5) com restrição, ex.: "VIRTUAL TABLE INDEX 0:M3" = consulta MATCH no índice
+        and not re.search(r'VIRTUAL TABLE INDEX \d+:\S', detail)
+    ]
+
+@pytest.fixture
+def hot_data(db):
+    owner = UserFactory(groups=['owners'])
+    customer = UserFactory(groups=['customers'])
+    Group.objects.get_or_create(name='customers')
+    day = date.today() + timedelta(days=3)
+    locations = LocationFactory.create_batch(3, owner=owner, operating_hours_start='08:00', operating_hours_end='20:00')
+    LocationFactory(is_active=False)
+    for hour, location in enumerate(locations, start=9):
+        reservation = ReservationFactory(user=customer, location=location, date=day, start_time=time(hour, 0), end_time=time(hour + 1, 0))
+        Payment.objects.create(reservation=reservation, method='pix', valor=50)
+    return {'owner': owner, 'customer': customer, 'anonymous': None, 'location': locations[0].id, 'day': day}
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('role,url,allowed', HOT_ENDPOINTS)
+def test_hot_queries_use_indexes(hot_data, role, url, allowed):
+    client = APIClient()
+    if hot_data[role] is not None:
+        client.force_authenticate(hot_data[role])
+    url = url.format(location=hot_data['location'], day=hot_data['day'], next_day=hot_data['day'] + timedelta(days=1))
+
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, response.data
+
+    scans = {
+        query['sql']: full_table_scans(query['sql'], allowed)
+        for query in context.captured_queries
+        if query['sql'].lstrip().upper().startswith('SELECT')
+    }
+    assert not {sql: plan for sql, plan in scans.items() if plan}
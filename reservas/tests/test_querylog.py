@@ -0,0 +1,55 @@
+import json
+import pytest
+from datetime import date, timedelta
+from io import StringIO
+from django.core.management import call_command
+from rest_framework.test import APIClient
+from reservas import querylog
+from reservas.tests.factories import UserFactory, LocationFactory, ReservationFactory
+from reservas.tests.test_async_views import bearer
+
+def test_fingerprint_ignores_literals_and_list_sizes():
+    one, _ = querylog.fingerprint('SELECT * FROM "reservas_location" WHERE "id" IN (%s) AND name = \'a\' LIMIT 21')
+    many, normalized = querylog.fingerprint(
+        'SELECT *  FROM "reservas_location"\n WHERE "id" IN (%s, %s, %s) AND name = \'b\'\'c\' LIMIT 5'
+    )
+    other, _ = querylog.fingerprint('SELECT * FROM "reservas_reservation" WHERE "id" IN (%s)')
+    assert one == many != other
+    assert normalized == 'SELECT * FROM "reservas_location" WHERE "id" IN (...) AND name = ? LIMIT ?'
+
+@pytest.mark.django_db
+def test_sampled_queries_are_attributed_to_views(settings):
+    settings.RESERVAS_QUERYLOG_SAMPLE_RATE = 1.0
+    owner, admin = UserFactory(groups=['owners']), UserFactory(is_staff=True)
+    reservation = ReservationFactory(location=LocationFactory(owner=owner))
+    client = APIClient()
+    day = date.today() + timedelta(days=1)
+    for _ in range(3):
+        client.get(f'/api/locations/{reservation.location_id}/available-slots/?date={day}')
+        client.get('/api/owner/dashboard/', headers=bearer(owner))
+
+    assert client.get('/api/querylog/', headers=bearer(owner)).status_code == 403
+    data = client.get('/api/querylog/?limit=50', headers=bearer(admin)).data
+    views = {row['view'] for row in data['by_total']}
+    assert {'LocationViewSet.available_slots', 'OwnerDashboardView'} <= views
+    dashboard = [row for row in data['by_total'] if row['view'] == 'OwnerDashboardView']
+    assert all(row['count'] % 3 == 0 and row['p99_ms'] <= row['max_ms'] for row in dashboard)
+
+    out = StringIO()
+    call_command('querylog', '--json', '--limit', '5', stdout=out)
+    assert len(json.loads(out.getvalue())['by_p99']) == 5
+
+def test_table_is_bounded(settings):
+    settings.RESERVAS_QUERYLOG_MAX_ENTRIES = 3
+    querylog.record('view', [('SELECT 1 FROM big', 0.5)])
+    querylog.record('view', [(f'SELECT * FROM t{n}', 0.001) for n in range(10)])
+    table = querylog.snapshot()
+    assert len(table) == 3
+    assert any(entry['example'] == 'SELECT 1 FROM big' for entry in table.values())
+
+def test_fingerprint_collapses_repeated_union_all():
+    select = 'SELECT "id" FROM "reservas_location" WHERE "geohash" >= %s AND "geohash" < %s'
+    two, _ = querylog.fingerprint(' UNION ALL '.join([select] * 2))
+    five, normalized = querylog.fingerprint(' UNION ALL '.join([select] * 5))
+    assert two == five
+    assert normalized.endswith('< ? UNION ALL ...')
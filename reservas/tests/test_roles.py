@@ -0,0 +1,52 @@
+import pytest
+from django.contrib.auth.models import Group
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from reservas.tests.factories import UserFactory, LocationFactory
+
+def login(user):
+    client = APIClient()
+    response = client.post('/api/auth/login/', {'username': user.username, 'password': 'password123'}, format='json')
+    assert response.status_code == 200, response.data
+    return response.data['access']
+
+@pytest.mark.django_db
+def test_login_token_carries_role_and_skips_group_queries():
+    owner = UserFactory(groups=['owners'])
+    LocationFactory(owner=owner)
+    access = login(owner)
+    assert AccessToken(access)['role'] == 'owner'
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+    with CaptureQueriesContext(connection) as context:
+        assert client.get('/api/owner/dashboard/').status_code == 200
+        assert client.get('/api/locations/').status_code == 200
+
+    assert not [query['sql'] for query in context.captured_queries if 'auth_group' in query['sql']]
+
+@pytest.mark.django_db
+def test_user_type_returns_all_groups_and_role():
+    user = UserFactory(groups=['owners', 'customers', 'staff-financeiro'])
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {login(user)}')
+
+    response = client.get('/api/auth/user-type/')
+    assert sorted(response.data['groups']) == ['customers', 'owners', 'staff-financeiro']
+    assert response.data['role'] == 'owner'
+
+@pytest.mark.django_db
+def test_group_change_invalidates_role_claim():
+    user = UserFactory(groups=['customers'])
+    access = login(user)
+
+    # O usuário vira owner depois do login: a claim antiga não vale mais
+    user.groups.set([Group.objects.get_or_create(name='owners')[0]])
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+    response = client.get('/api/auth/user-type/')
+    assert response.data['role'] == 'owner'
+    assert client.get('/api/owner/dashboard/').status_code == 200
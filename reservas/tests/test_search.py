@@ -0,0 +1,61 @@
+import pytest
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from reservas.models import Location
+from reservas.tests.factories import UserFactory, LocationFactory
+from reservas.tests.test_query_plans import full_table_scans
+
+@pytest.mark.django_db
+def test_search_ranks_name_matches_first_and_follows_writes():
+    in_address = LocationFactory(name='Salão', address='Rua da Quadra, 10')
+    in_name = LocationFactory(name='Quadra Coberta', address='Av. Central')
+    LocationFactory(name='Piscina', address='Rua 2')
+    client = APIClient()
+
+    names = [row['name'] for row in client.get('/api/locations/search/?q=quadra').data['results']]
+    assert names == ['Quadra Coberta', 'Salão']
+
+    # Acentos e prefixos: "sal" encontra "Salão"
+    assert [row['id'] for row in client.get('/api/locations/search/?q=sal').data['results']] == [in_address.id]
+
+    in_name.name = 'Campo de Futebol'
+    in_name.save()
+    Location.objects.filter(id=in_address.id).update(address='Rua 3')
+    assert client.get('/api/locations/search/?q=quadra').data['results'] == []
+    assert client.get('/api/locations/search/?q=futebol').data['results'][0]['id'] == in_name.id
+
+@pytest.mark.django_db
+def test_search_range_filters_facets_and_pagination():
+    for price, duration in ((30, 2), (50, 2), (80, 4), (120, 6)):
+        LocationFactory(name=f'Quadra {price}', price_per_hour=Decimal(price), max_duration=duration)
+    LocationFactory(name='Quadra inativa', price_per_hour=Decimal(40), is_active=False)
+    client = APIClient()
+
+    data = client.get('/api/locations/search/?q=quadra&min_price=40&max_price=100&facets=1&page_size=1').data
+    assert [row['name'] for row in data['results']] == ['Quadra 50']
+    assert data['facets'] == {'price_per_hour': {'min': '50.00', 'max': '80.00'}, 'max_duration': {'2': 1, '4': 1}}
+    second = client.get(data['next']).data
+    assert second['previous'] is not None
+    assert [row['name'] for row in second['results']] == ['Quadra 80']
+
+    data = client.get('/api/locations/search/?min_duration=4&opens_by=08:00').data
+    assert sorted(row['name'] for row in data['results']) == ['Quadra 120', 'Quadra 80']
+    assert client.get('/api/locations/search/?min_price=abc').status_code == 400
+
+@pytest.mark.django_db
+def test_search_owner_scope_and_index_usage():
+    owner = UserFactory(groups=['owners'])
+    LocationFactory(owner=owner, name='Quadra do owner', is_active=False)
+    LocationFactory(name='Quadra pública')
+    client = APIClient()
+    client.force_authenticate(owner)
+    assert [row['name'] for row in client.get('/api/locations/search/?q=quadra').data['results']] == ['Quadra do owner']
+
+    with CaptureQueriesContext(connection) as ctx:
+        APIClient().get('/api/locations/search/?q=quadra&min_price=10')
+    search_sql = [query['sql'] for query in ctx.captured_queries if 'reservas_location_fts' in query['sql']]
+    assert search_sql
+    for sql in search_sql:
+        assert not full_table_scans(sql)
@@ -38,4 +38,44 @@ def test_reservation_serializer_validates_time_conflict():
     
     with pytest.raises(ValidationError) as excinfo:
         serializer.is_valid(raise_exception=True)
-    assert "Conflito com outra reserva" in str(excinfo.value.detail)
\ No newline at end of file
+    assert "Conflito com outra reserva" in str(excinfo.value.detail)
+
+@pytest.mark.django_db
+def test_reservation_create_rechecks_conflicts_inside_transaction():
+    from datetime import date, time, timedelta
+    from reservas.models import Payment, Reservation
+
+    location = LocationFactory(operating_hours_start='08:00', operating_hours_end='23:30')
+    tomorrow = date.today() + timedelta(days=1)
+    data = {
+        "location": location.id,
+        "date": tomorrow.isoformat(),
+        "start_time": "10:00",
+        "end_time": "12:00",
+        "payment_method": "pix"
+    }
+    serializer = ReservationCreateSerializer(data=data, context={'request': type('obj', (), {'user': UserFactory()})})
+    assert serializer.is_valid(), serializer.errors
+
+    # Outra requisição reserva o mesmo horário entre o validate e o save
+    ReservationFactory(location=location, date=tomorrow, start_time=time(11, 0), end_time=time(13, 0), status='pendente')
+
+    with pytest.raises(ValidationError):
+        serializer.save()
+    assert Reservation.objects.filter(location=location).count() == 1
+    assert not Payment.objects.exists()
+
+@pytest.mark.django_db
+def test_reservation_price_counts_minutes():
+    from datetime import date, timedelta
+    from decimal import Decimal
+    from reservas.models import Payment
+
+    location = LocationFactory(price_per_hour=Decimal('50.00'), operating_hours_start='08:00', operating_hours_end='20:00')
+    tomorrow = date.today() + timedelta(days=1)
+    request = type('obj', (), {'user': UserFactory()})
+    for start, end, expected in (('10:00', '10:30', '25.00'), ('10:30', '11:15', '37.50'), ('14:00', '16:00', '100.00')):
+        data = {"location": location.id, "date": tomorrow.isoformat(), "start_time": start, "end_time": end, "payment_method": "pix"}
+        serializer = ReservationCreateSerializer(data=data, context={'request': request})
+        assert serializer.is_valid(), serializer.errors
+        assert Payment.objects.get(reservation=serializer.save()).valor == Decimal(expected)
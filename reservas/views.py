@@ -1,17 +1,41 @@
 from rest_framework import generics, viewsets, status, permissions
 from .serializers import UserRegistrationSerializer, LocationSerializer, LocationCreateSerializer
-from rest_framework.permissions import IsAuthenticatedOrReadOnly, AllowAny, IsAuthenticated
+from rest_framework.permissions import IsAuthenticatedOrReadOnly, AllowAny, IsAuthenticated, IsAdminUser
 from .models import Location, Reservation, Payment, LocationImage
 from .permissions import IsOwnerOrReadOnly, IsReservationOwnerOrReadOnly, IsOwner
+from .occupancy import get_occupancy, mask_to_hours
+from .pagination import KeysetPagination, RankedPagination
+from .search import SearchQueryError, search_facets, search_locations
+from .geo import GeoQueryError, nearby, parse_near
+from .fieldsets import FieldsetError, parse_fieldset, wants
+from .roles import get_role, is_owner
+from .dashboard import dashboard_summary
+from .metrics import render_metrics
+from .profiling import profile_path
+from . import querylog
+from .cache import availability_version, cache_stats, list_version, location_data_version, read_through
+from .conditional import not_modified, set_validators, validators
+from .availability import (
+    AvailabilityQueryError, availability_by_day, encode_slots, free_locations, operating_hours, parse_date_range,
+    parse_encoding, parse_slot_minutes, parse_window, slot_starts
+)
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from .serializers import ReservationSerializer, ReservationCreateSerializer, PaymentSerializer, LocationImageSerializer
+from rest_framework.exceptions import NotFound, ParseError
+from .serializers import ReservationSerializer, ReservationCreateSerializer, PaymentSerializer, LocationImageSerializer, LocationImageBatchSerializer
+from .projections import ReservationValues
+from .renderers import FastJSONRenderer
+from rest_framework.renderers import BrowsableAPIRenderer
+from .exports import FORMATS as EXPORT_FORMATS, astream, export_querysets, parse_export_filters, stream_export
 from rest_framework.views import APIView
 from django.utils.timezone import now, make_aware
 from datetime import date, datetime, timedelta, time
-from django.db.models import Count
+from django.conf import settings
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from django.shortcuts import render
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, HttpResponse, HttpResponseForbidden, StreamingHttpResponse
+import hmac
 from django.contrib.auth.decorators import login_required
 
 def login_view(request):
@@ -40,11 +64,104 @@ class RegisterView(generics.CreateAPIView):
     serializer_class = UserRegistrationSerializer
     permission_classes = [AllowAny]
 
+def day_availability(location, slot_minutes, occupancy):
+    """Corpo do available-slots de um dia a partir de get_occupancy() (também usado pelo handler ASGI)"""
+    agenda, occupied_mask, total_reservations = occupancy
+    reserved_slots = set(mask_to_hours(occupied_mask))
+    
+    # Gerar horários disponíveis dentro do horário de funcionamento
+    operating_slots = operating_hours(location)
+    start_operating, end_operating = operating_slots.start, operating_slots.stop
+    free_starts = agenda.free_slots(slot_starts(location, slot_minutes), slot_minutes)
+    available_slots = encode_slots(free_starts, slot_minutes, 'slots')
+
+    # Debug: adicionar informações úteis na resposta
+    debug_info = {
+        "total_reservations": total_reservations,
+        "reserved_hours": sorted(list(reserved_slots)),
+        "operating_range": f"{start_operating}:00 - {end_operating-1}:00"
+    }
+
+    return {
+        "available_slots": available_slots,
+        "debug": debug_info,  # Remover depois dos testes
+        "message": "Nenhum horário disponível hoje." if not available_slots else f"{len(available_slots)} horários disponíveis."
+    }
+
+def cache_scope(user):
+    # Owners veem os próprios locais; os demais, os ativos: a resposta depende só deste escopo
+    return f'owner:{user.id}' if is_owner(user) else 'public'
+
+def can_view(user, location):
+    """Mesma regra do LocationViewSet.get_queryset, sobre {'owner_id', 'is_active'} guardado no cache"""
+    if is_owner(user):
+        return location['owner_id'] == user.id
+    return location['is_active']
+
+def request_fieldset(request, serializer_class):
+    """?fields= / ?omit= da requisição sobre os campos do serializer (None = todos)"""
+    try:
+        return parse_fieldset(request.query_params, serializer_class.Meta.fields)
+    except FieldsetError as exc:
+        raise ParseError(str(exc))
+
+# Campos do ReservationSerializer que leem o local (select_related('location'))
+RESERVATION_LOCATION_FIELDS = (
+    'location_name', 'location_address', 'location_description', 'local_cancelado',
+    'location_images', 'location_image_variants',
+)
+
+def reservation_joins(queryset, fieldset):
+    """Join e prefetch só para os campos do local que vão sair"""
+    if wants(fieldset, *RESERVATION_LOCATION_FIELDS):
+        queryset = queryset.select_related('location')
+    if wants(fieldset, 'location_images', 'location_image_variants'):
+        queryset = queryset.prefetch_related('location__images')
+    return queryset
+
+def fast_serialization(request):
+    """Listagem de reservas por .values() + orjson: ?fast=1|0 na requisição, senão RESERVAS_FAST_SERIALIZATION"""
+    value = request.query_params.get('fast')
+    if value is None:
+        return settings.RESERVAS_FAST_SERIALIZATION
+    return value.lower() in ('1', 'true')
+
+def keyset_columns(view):
+    """Colunas da ordenação keyset da view: o cursor precisa delas mesmo fora do fieldset"""
+    return tuple(field.lstrip('-') for field in view.keyset_ordering)
+
+def near_page(request, queryset, near, context):
+    """Página de ?near=lat,lng&radius= ordenada por distância, com distance_km (também usado pelo handler ASGI)"""
+    latitude, longitude, radius = near
+    paginator = RankedPagination()
+    page = paginator.paginate_queryset(nearby(queryset, latitude, longitude, radius), request)
+    # Só as linhas da página saem do banco, na ordem da distância
+    if wants(context.get('fieldset'), 'images', 'image_variants'):
+        queryset = queryset.prefetch_related('images')
+    rows = queryset.in_bulk([location_id for _, location_id in page])
+    data = LocationSerializer([rows[location_id] for _, location_id in page], many=True, context=context).data
+    for item, (distance, _) in zip(data, page):
+        item['distance_km'] = round(distance, 3)
+    return paginator.get_paginated_response(data).data
+
 class LocationViewSet(viewsets.ModelViewSet):
     queryset = Location.objects.filter(is_active=True)
     permission_classes = [IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
     serializer_class = LocationSerializer
     parser_classes = [MultiPartParser, FormParser, JSONParser]
+    pagination_class = KeysetPagination
+    keyset_ordering = ('created_at', 'id')
+    fieldset = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.action in ('list', 'retrieve', 'search', 'free'):
+            self.fieldset = request_fieldset(request, LocationSerializer)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fieldset'] = self.fieldset
+        return context
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -55,18 +172,25 @@ class LocationViewSet(viewsets.ModelViewSet):
         serializer.save()
 
     def get_queryset(self):
-        if self.request.user.is_authenticated and self.request.user.groups.filter(name='owners').exists():
-            return Location.objects.filter(owner=self.request.user)
-        return Location.objects.filter(is_active=True)
+        if is_owner(self.request.user):
+            queryset = Location.objects.filter(owner=self.request.user)
+        else:
+            queryset = Location.objects.filter(is_active=True)
+        if self.action in ('list', 'retrieve', 'update', 'partial_update', 'search', 'free') and wants(
+            self.fieldset, 'images', 'image_variants'
+        ):
+            # Imagens de todos os locais da página em uma consulta só
+            queryset = queryset.prefetch_related('images')
+        return queryset
     
     @action(detail=True, methods=['get'], url_path='available-slots')
     def available_slots(self, request, pk=None): 
-        try:
-            location = self.get_object()
-        except Location.DoesNotExist:
-            return Response({"detail": "Local não encontrado."}, status=404)
+        return self._conditional(request, availability_version, lambda: self._available_slots(request))
 
+    def _available_slots(self, request):
         date_str = request.query_params.get('date')
+        if not date_str and 'from' in request.query_params:
+            return self._available_slots_range([self.get_object()], request)
         if not date_str:
             return Response({"detail": "Data não fornecida."}, status=400)
 
@@ -74,47 +198,143 @@ class LocationViewSet(viewsets.ModelViewSet):
             query_date = datetime.strptime(date_str, "%Y-%m-%d").date()
         except ValueError:
             return Response({"detail": "Formato de data inválido. Use YYYY-MM-DD."}, status=400)
-        
-        # Buscar reservas ativas (confirmadas e pendentes) para o local e data específica
-        existing_reservations = Reservation.objects.filter(
-            location=location, 
-            date=query_date
-        ).exclude(status='cancelled')  # Exclui apenas as canceladas
-        
-        reserved_slots = set()
-        for res in existing_reservations:
-            # Marcar todos os horários entre start_time e end_time como ocupados
-            start_hour = res.start_time.hour
-            end_hour = res.end_time.hour
-            
-            # Importante: incluir TODAS as horas do período da reserva
-            # Se reserva é de 15:00 até 22:00, ocupar slots: 15, 16, 17, 18, 19, 20, 21
-            reserved_slots.update(range(start_hour, end_hour))
-        
-        # Considerar horário de funcionamento do local
-        start_operating = location.operating_hours_start.hour
-        end_operating = location.operating_hours_end.hour
-        
-        # Incluir a última hora se o local funciona até ela
-        # Ex: se funciona até 23:00, deve mostrar slot 23:00
-        if location.operating_hours_end.minute >= 0:
-            end_operating += 1
-        
-        # Gerar horários disponíveis dentro do horário de funcionamento
-        operating_slots = range(start_operating, end_operating)
-        available_slots = [f"{h:02d}:00" for h in operating_slots if h not in reserved_slots]
 
-        # Debug: adicionar informações úteis na resposta
-        debug_info = {
-            "total_reservations": len(existing_reservations),
-            "reserved_hours": sorted(list(reserved_slots)),
-            "operating_range": f"{start_operating}:00 - {end_operating-1}:00"
-        }
+        try:
+            slot_minutes = parse_slot_minutes(request.query_params)
+        except AvailabilityQueryError as exc:
+            return Response({"detail": str(exc)}, status=400)
+
+        return Response(self._cached_for_location(
+            'availability', availability_version, (query_date, slot_minutes),
+            lambda location: self._day_availability(location, query_date, slot_minutes),
+        ))
+
+    def _day_availability(self, location, query_date, slot_minutes):
+        # Ocupação pré-calculada (reservas confirmadas e pendentes) para o local e data específica
+        return day_availability(location, slot_minutes, get_occupancy(location.id, query_date))
+
+    def list(self, request, *args, **kwargs):
+        try:
+            near = parse_near(request.query_params)
+        except GeoQueryError as exc:
+            return Response({"detail": str(exc)}, status=400)
+        version, parts = list_version(), (self._cache_scope(), request.build_absolute_uri())
+        etag, last_modified = validators([version], *parts)
+        response = not_modified(request, etag, last_modified)
+        if response is None:
+            if near:
+                builder = lambda: near_page(request, self.get_queryset(), near, self.get_serializer_context())
+            else:
+                builder = lambda: super(LocationViewSet, self).list(request, *args, **kwargs).data
+            response = Response(read_through('locations', version, parts, builder))
+        return set_validators(response, etag, last_modified)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional(request, location_data_version, lambda: Response(self._cached_for_location(
+            'location', location_data_version, (request.build_absolute_uri('/'), self.fieldset),
+            lambda location: self.get_serializer(location).data,
+        )))
+
+    def _location_id(self):
+        try:
+            return int(self.kwargs[self.lookup_url_kwarg or self.lookup_field])
+        except (KeyError, ValueError):
+            return None
+
+    def _cache_scope(self):
+        return cache_scope(self.request.user)
+
+    def _conditional(self, request, version, respond):
+        """GET condicional de um local: 304 antes de montar o corpo se o ETag/Last-Modified do cliente ainda vale"""
+        location_id = self._location_id()
+        if location_id is None:
+            return respond()
+        etag, last_modified = validators([version(location_id)], self._cache_scope(), request.build_absolute_uri())
+        response = not_modified(request, etag, last_modified) or respond()
+        if response.status_code in (200, 304):
+            set_validators(response, etag, last_modified)
+        return response
+
+    def _cached_for_location(self, namespace, version, parts, build):
+        """Leitura read-through de dados de um local; nos acertos a visibilidade é conferida sem ir ao banco"""
+        location_id = self._location_id()
+        if location_id is None:
+            return build(self.get_object())
+
+        def builder():
+            location = self.get_object()
+            return {'owner_id': location.owner_id, 'is_active': location.is_active, 'data': build(location)}
+
+        # O id entra na chave: a versão sozinha não separa os locais (duas versões criadas no mesmo tick)
+        payload = read_through(namespace, version(location_id), (location_id, *parts), builder)
+        if not self._can_view(payload):
+            raise NotFound("Local não encontrado.")
+        return payload['data']
 
+    def _can_view(self, location):
+        return can_view(self.request.user, location)
+
+    @action(detail=False, methods=['get'], url_path='free')
+    def free(self, request):
+        # Locais ativos livres em ?date= entre ?start= e ?end= (HH:MM), numa consulta só
+        try:
+            day, start, end = parse_window(request.query_params)
+        except AvailabilityQueryError as exc:
+            return Response({"detail": str(exc)}, status=400)
+        queryset = free_locations(self.get_queryset().filter(is_active=True), day, start, end)
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+    @action(detail=False, methods=['get'], url_path='search')
+    def search(self, request):
+        # Busca textual (?q=) + faixas de preço/duração/horário, ordenada por relevância
+        parts = (self._cache_scope(), request.build_absolute_uri())
+        try:
+            data = read_through('search', list_version(), parts, lambda: self._search(request))
+        except SearchQueryError as exc:
+            return Response({"detail": str(exc)}, status=400)
+        return Response(data)
+
+    def _search(self, request):
+        queryset = self.get_queryset()
+        paginator = RankedPagination()
+        page = paginator.paginate_queryset(search_locations(queryset, request.query_params), request, view=self)
+        data = paginator.get_paginated_response(self.get_serializer(page, many=True).data).data
+        if request.query_params.get('facets') in ('1', 'true'):
+            data['facets'] = search_facets(queryset, request.query_params)
+        return data
+
+    @action(detail=False, methods=['get'], url_path='available-slots', url_name='available-slots-bulk')
+    def available_slots_bulk(self, request):
+        # Disponibilidade de vários locais (?locations=1,2,3) em um intervalo de datas
+        try:
+            ids = {int(pk) for pk in request.query_params.get('locations', '').split(',') if pk}
+        except ValueError:
+            return Response({"detail": "Lista de locais inválida."}, status=400)
+        if not ids:
+            return Response({"detail": "Informe os locais em ?locations=1,2,3."}, status=400)
+        if len(ids) > settings.RESERVAS_MAX_BULK_LOCATIONS:
+            return Response(
+                {"detail": f"No máximo {settings.RESERVAS_MAX_BULK_LOCATIONS} locais por consulta."}, status=400
+            )
+        locations = self.filter_queryset(self.get_queryset()).filter(id__in=ids)
+        return self._available_slots_range(list(locations), request)
+
+    def _available_slots_range(self, locations, request):
+        try:
+            start, end = parse_date_range(request.query_params)
+            encoding = parse_encoding(request.query_params)
+            slot_minutes = parse_slot_minutes(request.query_params)
+        except AvailabilityQueryError as exc:
+            return Response({"detail": str(exc)}, status=400)
+
+        availability = availability_by_day(locations, start, end, encoding, slot_minutes)
         return Response({
-            "available_slots": available_slots,
-            "debug": debug_info,  # Remover depois dos testes
-            "message": "Nenhum horário disponível hoje." if not available_slots else f"{len(available_slots)} horários disponíveis."
+            "from": start.isoformat(),
+            "to": end.isoformat(),
+            "encoding": encoding,
+            "slot_minutes": slot_minutes,
+            "locations": {str(location_id): days for location_id, days in availability.items()},
         })
     
     @action(detail=True, methods=['patch'], url_path='cancel')
@@ -139,6 +359,24 @@ class LocationImageUploadView(generics.CreateAPIView):
         location = Location.objects.get(id=location_id, owner=self.request.user)
         serializer.save(location=location)
 
+class LocationImageBatchUploadView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        # Recusa pelo Content-Length antes de ler o corpo: nada além do limite vai para o disco
+        try:
+            content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            content_length = 0
+        if content_length > settings.RESERVAS_MAX_UPLOAD_SIZE:
+            return Response({"detail": "Upload acima do tamanho máximo permitido."}, status=413)
+
+        serializer = LocationImageBatchSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        images = serializer.save()
+        return Response(LocationImageSerializer(images, many=True, context={'request': request}).data, status=201)
+
 class LocationImageDeleteView(generics.DestroyAPIView):
     queryset = LocationImage.objects.all()
     permission_classes = [permissions.IsAuthenticated]
@@ -151,21 +389,46 @@ class ReservationViewSet(viewsets.ModelViewSet):
     queryset = Reservation.objects.all()
     permission_classes = [IsAuthenticated, IsReservationOwnerOrReadOnly]
     parser_classes = [MultiPartParser, FormParser, JSONParser]
+    pagination_class = KeysetPagination
+    # orjson para o caminho rápido da listagem (mesmos bytes do JSONRenderer)
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+    # Mesma ordem do índice (user, -date, -start_time); o id fecha o empate
+    keyset_ordering = ('-date', '-start_time', 'id')
+    fieldset = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.action in ('list', 'retrieve'):
+            self.fieldset = request_fieldset(request, ReservationSerializer)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fieldset'] = self.fieldset
+        return context
 
     def get_queryset(self):
         user = self.request.user
-        if user.groups.filter(name='owners').exists():
+        if is_owner(user):
             # Owners veem reservas dos seus locais
-            return Reservation.objects.filter(location__owner=user)
+            queryset = Reservation.objects.filter(location__owner=user)
         else:
             # Customers veem suas reservas
-            return Reservation.objects.filter(user=user)
+            queryset = Reservation.objects.filter(user=user)
+        return reservation_joins(queryset, self.fieldset)
 
     def get_serializer_class(self):
         if self.action == 'create':
             return ReservationCreateSerializer
         return ReservationSerializer
 
+    def list(self, request, *args, **kwargs):
+        if not fast_serialization(request):
+            return super().list(request, *args, **kwargs)
+        # Caminho rápido opcional: página a partir de .values(), mesmo JSON do ReservationSerializer
+        values = ReservationValues(context=self.get_serializer_context())
+        page = self.paginate_queryset(values.project(self.filter_queryset(self.get_queryset()), keyset_columns(self)))
+        return self.get_paginated_response(values.serialize(page))
+
     @action(detail=True, methods=['patch'], url_path='cancel')
     def cancel_reservation(self, request, pk=None):
         reservation = self.get_object()
@@ -207,44 +470,91 @@ class OwnerDashboardView(APIView):
     permission_classes = [IsAuthenticated, IsOwner]
 
     def get(self, request):
-        user = request.user
-        locations = Location.objects.filter(owner=user)
-
-        total_locations = locations.count()
-
-        total_reservations = Reservation.objects.filter(location__in=locations).count()
-
-        upcoming_reservations = Reservation.objects.filter(
-            location__in=locations,
-            date__gte=date.today(),
-            status='confirmed'
-        ).count()
+        # Contadores mantidos pelos signals de Reservation (ver reservas.dashboard)
+        return Response(dashboard_summary(request.user))
+    
+class OwnerExportView(APIView):
+    """Histórico de reservas e pagamentos dos locais do owner em CSV ou NDJSON, em streaming (reservas.exports)"""
+    permission_classes = [IsAuthenticated, IsOwner]
 
-        reservations_per_location = Reservation.objects.filter(
-            location__in=locations
-        ).values('location__name').annotate(count=Count('id'))
+    def get(self, request, export_format):
+        try:
+            start, end, location_id = parse_export_filters(request.query_params)
+        except AvailabilityQueryError as exc:
+            raise ParseError(str(exc))
+        chunks = stream_export(
+            export_querysets(request.user, start, end, location_id), export_format, settings.RESERVAS_EXPORT_CHUNK_SIZE
+        )
+        if isinstance(request._request, ASGIRequest):
+            chunks = astream(chunks)
+        response = StreamingHttpResponse(chunks, content_type=EXPORT_FORMATS[export_format])
+        response['Content-Disposition'] = f'attachment; filename="reservas-{date.today()}.{export_format}"'
+        # Proxies (nginx) repassam os blocos assim que chegam
+        response['X-Accel-Buffering'] = 'no'
+        return response
 
-        return Response({
-            'total_locations': total_locations,
-            'total_reservations': total_reservations,
-            'upcoming_reservations': upcoming_reservations,
-            'reservations_per_location': reservations_per_location,
-        })
-    
 class CustomerReservationsView(APIView):
     permission_classes = [IsAuthenticated]
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+    keyset_ordering = ('-date', '-start_time', 'id')
 
     def get(self, request):
-        reservations = Reservation.objects.filter(user=request.user).order_by('-date', '-start_time')
-        serializer = ReservationSerializer(reservations, many=True)
-        return Response(serializer.data)
+        fieldset = request_fieldset(request, ReservationSerializer)
+        reservations = Reservation.objects.filter(user=request.user)
+        paginator = KeysetPagination()
+        if fast_serialization(request):
+            values = ReservationValues(context={'fieldset': fieldset})
+            page = paginator.paginate_queryset(values.project(reservations, keyset_columns(self)), request, view=self)
+            return paginator.get_paginated_response(values.serialize(page))
+        page = paginator.paginate_queryset(reservation_joins(reservations, fieldset), request, view=self)
+        serializer = ReservationSerializer(page, many=True, context={'fieldset': fieldset})
+        return paginator.get_paginated_response(serializer.data)
 
 class UserTypeView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
         groups = request.user.groups.values_list('name', flat=True)
-        return Response({"groups": list(groups)})
+        return Response({"groups": list(groups), "role": get_role(request.user)})
+
+class CacheStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(cache_stats())
+
+class QueryLogView(APIView):
+    """Top-N do log amostrado de consultas (reservas.querylog), somado entre os processos"""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), 200)
+        except ValueError:
+            raise ParseError("limit deve ser um número inteiro.")
+        return Response(querylog.top(limit))
+
+class ProfileDownloadView(APIView):
+    """Perfil salvo pelo ProfilingMiddleware (nome do cabeçalho X-Profile)"""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, name):
+        path = profile_path(name)
+        if path is None:
+            raise NotFound("Perfil não encontrado.")
+        content_type = 'text/plain; charset=utf-8' if path.suffix == '.folded' else 'application/octet-stream'
+        return FileResponse(path.open('rb'), as_attachment=True, filename=name, content_type=content_type)
+
+def metrics_view(request):
+    """Métricas deste processo no formato texto do Prometheus.
+
+    Exige `Authorization: Bearer <RESERVAS_METRICS_TOKEN>`; sem token configurado fica fechado
+    (atrás de um proxy local todo REMOTE_ADDR é 127.0.0.1, então o endereço não serve de critério).
+    """
+    token = settings.RESERVAS_METRICS_TOKEN
+    if not token or not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponseForbidden()
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 class PaymentCreateView(generics.CreateAPIView):
     queryset = Payment.objects.all()